@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+'''
+Name: build_df_benchmark.py
+Contact(s): Mallory Row
+Abstract: This script times global_det_atmos_util.build_df on synthetic
+          365-day SL1L2 TMP/Z2 condensed stat files for two models,
+          with missing dates, duplicate lines for some dates, and mixed
+          K/F units. The first call filters the condensed files and
+          writes the filtered files; later calls only read them. The
+          result is checked for one row per model and valid date, with
+          missing dates empty and every temperature converted to F.
+          Given REFERENCE_USH_DIR, a global_det ush directory of another
+          version (e.g. a checkout of an earlier commit), that version is
+          timed on the same files, and its result from reading the
+          current version's filtered files is compared. The reference
+          writes its own filtered files only for timing, since its sort
+          may order the duplicate lines for a date differently.
+Usage: python build_df_benchmark.py USH_DIR [REFERENCE_USH_DIR]
+       e.g. python dev/benchmarks/build_df_benchmark.py ush/global_det
+'''
+
+import os
+import sys
+import time
+import logging
+import datetime
+import tempfile
+import importlib.util
+import numpy as np
+
+if len(sys.argv) not in [2, 3]:
+    print("Usage: "+os.path.basename(__file__)
+          +" USH_DIR [REFERENCE_USH_DIR]")
+    sys.exit(1)
+
+NDAYS = 365
+NREPEAT = 5
+MODEL_LIST = ['gfs', 'ecmwf']
+HEADER_COLS = [
+    'VERSION', 'MODEL', 'DESC', 'FCST_LEAD', 'FCST_VALID_BEG',
+    'FCST_VALID_END', 'OBS_LEAD', 'OBS_VALID_BEG', 'OBS_VALID_END',
+    'FCST_VAR', 'FCST_UNITS', 'FCST_LEV', 'OBS_VAR', 'OBS_UNITS', 'OBS_LEV',
+    'OBTYPE', 'VX_MASK', 'INTERP_MTHD', 'INTERP_PNTS', 'FCST_THRESH',
+    'OBS_THRESH', 'COV_THRESH', 'ALPHA', 'LINE_TYPE'
+]
+STAT_COLS = ['TOTAL', 'FBAR', 'OBAR', 'FOBAR', 'FFBAR', 'OOBAR', 'MAE']
+
+def load_gda_util(ush_dir, module_name):
+    """! Load global_det_atmos_util from a ush directory
+
+         Args:
+             ush_dir     - global_det ush directory (string)
+             module_name - name to load the module as (string)
+
+         Returns:
+             gda_util - global_det_atmos_util (module)
+    """
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(ush_dir, 'global_det_atmos_util.py')
+    )
+    gda_util = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gda_util)
+    return gda_util
+
+def write_met_table_file(met_root):
+    """! Write the MET SL1L2 line type columns build_df reads
+
+         Args:
+             met_root - MET root directory (string)
+
+         Returns:
+    """
+    table_dir = os.path.join(met_root, 'share', 'met', 'table_files')
+    os.makedirs(table_dir, exist_ok=True)
+    with open(os.path.join(table_dir, 'met_header_columns_V11.0.txt'),
+              'w') as tf:
+        tf.write('V11.0 : STAT : SL1L2 : '
+                 +' '.join(HEADER_COLS+STAT_COLS)+'\n')
+
+def write_condensed_stat_files(input_dir, met_format_valid_dates, seed=0):
+    """! Write a shuffled condensed SL1L2 TMP/Z2 stat file for each
+         model, leaving out every 17th date, repeating every 29th
+         date, and writing every 5th date in F
+
+         Args:
+             input_dir              - directory to write in (string)
+             met_format_valid_dates - list of valid dates formatted
+                                      like they are in MET stat files
+             seed                   - random seed (integer)
+
+         Returns:
+    """
+    rng = np.random.default_rng(seed)
+    for model in MODEL_LIST:
+        line_list = []
+        for d, valid_date in enumerate(met_format_valid_dates):
+            if d % 17 == 3:
+                continue
+            units = 'F' if d % 5 == 0 else 'K'
+            for repeat in range(2 if d % 29 == 0 else 1):
+                line_list.append(' '.join(
+                    ['V11.0', model, 'G004', '240000', valid_date,
+                     valid_date, '000000', valid_date, valid_date, 'TMP',
+                     units, 'Z2', 'TMP', units, 'Z2', 'ADPSFC', 'CONUS',
+                     'BILIN', '4', 'NA', 'NA', 'NA', 'NA', 'SL1L2']
+                    + [f"{value:.5f}" for value in rng.normal(280, 5, 7)]
+                ))
+        rng.shuffle(line_list)
+        with open(os.path.join(input_dir, f"condensed_stats_{model}_sl1l2_"
+                               +'tmp_z2_conus.stat'), 'w') as cf:
+            cf.write(' '.join(HEADER_COLS+STAT_COLS)+'\n')
+            cf.write('\n'.join(line_list)+'\n')
+
+def time_build_df(gda_util, build_df_args, output_dir):
+    """! Time the first build_df call, which writes the filtered
+         files, and the fastest of NREPEAT later calls
+
+         Args:
+             gda_util      - global_det_atmos_util (module)
+             build_df_args - build_df arguments after job_group (tuple)
+             output_dir    - directory to write filtered files in
+                             (string)
+
+         Returns:
+             df          - build_df result (DataFrame)
+             first_time  - first call time (seconds)
+             repeat_time - fastest later call time (seconds)
+    """
+    os.makedirs(output_dir)
+    build_df_args = (build_df_args[:2] + (output_dir,) + build_df_args[3:])
+    start = time.perf_counter()
+    df = gda_util.build_df('make_plots', *build_df_args)
+    first_time = time.perf_counter() - start
+    repeat_time_list = []
+    for repeat in range(NREPEAT):
+        start = time.perf_counter()
+        df = gda_util.build_df('make_plots', *build_df_args)
+        repeat_time_list.append(time.perf_counter() - start)
+    return df, first_time, min(repeat_time_list)
+
+logger = logging.getLogger(os.path.basename(__file__))
+dates = [datetime.datetime(2023,1,1,12) + datetime.timedelta(days=d)
+         for d in range(NDAYS)]
+met_format_valid_dates = [date.strftime('%Y%m%d_%H%M%S') for date in dates]
+model_info_dict = {
+    f"model{m+1}": {'name': model, 'plot_name': model, 'obs_name': 'ADPSFC'}
+    for m, model in enumerate(MODEL_LIST)
+}
+ush_dir_list = [os.path.abspath(ush_dir) for ush_dir in sys.argv[1:]]
+with tempfile.TemporaryDirectory() as tmp_dir:
+    met_root = os.path.join(tmp_dir, 'met')
+    input_dir = os.path.join(tmp_dir, 'input')
+    os.makedirs(input_dir)
+    write_met_table_file(met_root)
+    write_condensed_stat_files(input_dir, met_format_valid_dates)
+    build_df_args = (
+        logger, input_dir, None, model_info_dict,
+        {'root': met_root, 'version': '11.0.1'}, 'TMP', 'Z2', 'NA',
+        'TMP', 'Z2', 'NA', 'SL1L2', 'G004', 'CONUS', 'BILIN', '4', 'VALID',
+        dates, met_format_valid_dates, '24'
+    )
+    print(f"{'version':>10} {'first call (s)':>15} {'later calls (s)':>16}")
+    for u, ush_dir in enumerate(ush_dir_list):
+        version = 'reference' if u == 1 else 'current'
+        gda_util = load_gda_util(ush_dir, f"gda_util_{version}")
+        version_df, first_time, repeat_time = time_build_df(
+            gda_util, build_df_args,
+            os.path.join(tmp_dir, f"output_{version}")
+        )
+        if version == 'current':
+            df = version_df
+        else:
+            df_reference = gda_util.build_df(
+                'make_plots',
+                *(build_df_args[:2] + (os.path.join(tmp_dir,
+                                                    'output_current'),)
+                  + build_df_args[3:])
+            )
+        print(f"{version:>10} {first_time:>15.2f} {repeat_time:>16.2f}")
+missing_date_list = [
+    valid_date for d, valid_date in enumerate(met_format_valid_dates)
+    if d % 17 == 3
+]
+if len(df) != len(MODEL_LIST)*NDAYS \
+        or df.index.get_level_values('valid_dates').isin(
+            missing_date_list
+        ).sum() != df['FCST_UNITS'].isna().sum() \
+        or not (df['FCST_UNITS'].dropna() == 'F').all():
+    print("FATAL ERROR: build_df did not make one row per model and valid "
+          +"date in F, with only the missing dates empty")
+    sys.exit(1)
+if len(ush_dir_list) == 2:
+    for col in df.columns:
+        if col in STAT_COLS:
+            cols_match = np.allclose(df[col].astype(float),
+                                     df_reference[col].astype(float),
+                                     rtol=1e-12, equal_nan=True)
+        else:
+            cols_match = (
+                (df[col] == df_reference[col])
+                | (df[col].isna() & df_reference[col].isna())
+            ).all()
+        if not df.index.equals(df_reference.index) or not cols_match:
+            print(f"FATAL ERROR: build_df differs from the reference "
+                  +f"in {col}")
+            sys.exit(1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+'''
+Name: equalize_samples_benchmark.py
+Contact(s): Marcel Caron
+Abstract: This script times plot_util.equalize_samples on synthetic
+          lead average frames (MODEL x LEAD_HOURS x VALID, with 5% of
+          the rows and some OBS_LEV values missing) from about 1e3 to
+          1e6 rows. Up to CHECK_MAX_ROWS rows, the result is also
+          checked against the row-by-row membership test
+          equalize_samples used before, which is timed alongside.
+Usage: python equalize_samples_benchmark.py USH_DIR [MAX_ROWS]
+       e.g. python dev/benchmarks/equalize_samples_benchmark.py \
+                ush/analyses 1000000
+'''
+
+import os
+import sys
+import time
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+
+if len(sys.argv) not in [2, 3]:
+    print("Usage: "+os.path.basename(__file__)+" USH_DIR [MAX_ROWS]")
+    sys.exit(1)
+os.environ['USH_DIR'] = os.path.abspath(sys.argv[1])
+sys.path.insert(0, os.environ['USH_DIR'])
+import plot_util
+
+MAX_ROWS = int(sys.argv[2]) if len(sys.argv) == 3 else 1000000
+CHECK_MAX_ROWS = 20000
+MODEL_LIST = ['GFS', 'ECMWF', 'CMC']
+LEAD_HOURS_LIST = list(range(0, 241, 6))
+GROUP_BY = ['MODEL', 'LEAD_HOURS']
+
+def make_lead_average_df(nvalid, seed=0):
+    """! Make a synthetic lead average frame
+
+         Args:
+             nvalid - number of valid times per model and lead (integer)
+             seed   - random seed (integer)
+
+         Returns:
+             df - frame of MODEL, LEAD_HOURS, VALID, OBS_LEV,
+                  and a statistic (DataFrame)
+    """
+    rng = np.random.default_rng(seed)
+    valid_list = [
+        datetime.datetime(2023,1,1) + datetime.timedelta(hours=6*v)
+        for v in range(nvalid)
+    ]
+    model, lead, valid = [
+        a.ravel() for a in np.meshgrid(
+            MODEL_LIST, LEAD_HOURS_LIST, valid_list, indexing='ij'
+        )
+    ]
+    df = pd.DataFrame({
+        'MODEL': model, 'LEAD_HOURS': lead, 'VALID': valid,
+        'OBS_LEV': np.full(model.size, 'P500', dtype=object),
+        'FBAR': rng.random(model.size)
+    })
+    df.loc[rng.random(len(df)) < 0.01, 'OBS_LEV'] = np.nan
+    return df[rng.random(len(df)) >= 0.05].reset_index(drop=True)
+
+def equalize_samples_rowwise(df, group_by):
+    """! Select the equalized rows with the row-by-row membership
+         test equalize_samples used before
+
+         Args:
+             df       - frame to equalize (DataFrame)
+             group_by - columns to group by (list of strings)
+
+         Returns:
+             df_equalized - equalized frame (DataFrame)
+    """
+    cols_to_check = [
+        key for key in ['LEAD_HOURS', 'VALID', 'INIT', 'FCST_THRESH_SYMBOL',
+                        'FCST_THRESH_VALUE', 'OBS_LEV']
+        if key in df.keys()
+    ]
+    df_groups = df.groupby(group_by)
+    indexes = []
+    unique_indep_vars = np.unique(np.array(list(df_groups.groups.keys())).T[1])
+    for unique_indep_var in unique_indep_vars:
+        dfs = [
+            df_groups.get_group(name)[cols_to_check]
+            for name in list(df_groups.groups.keys())
+            if str(name[1]) == str(unique_indep_var)
+        ]
+        for i, dfs_i in enumerate(dfs):
+            if i == 0:
+                df_merged = dfs_i
+            else:
+                df_merged = df_merged.merge(dfs_i, how='inner',
+                                            indicator=False)
+        match_these = df_merged.drop_duplicates()
+        for dfs_i in dfs:
+            for idx, row in dfs_i.iterrows():
+                if (row.to_numpy()[1:].tolist()
+                        in match_these.to_numpy()[:,1:].tolist()):
+                    indexes.append(idx)
+    df_equalized = df.loc[indexes]
+    return df_equalized.loc[
+        df_equalized[cols_to_check+['MODEL']].drop_duplicates().index
+    ]
+
+logger = logging.getLogger(os.path.basename(__file__))
+print(f"{'rows':>10} {'equalized':>10} {'time (s)':>9} "
+      + f"{'row-by-row (s)':>15}")
+nvalid = 8
+while True:
+    df = make_lead_average_df(nvalid)
+    if len(df) > MAX_ROWS*1.1:
+        break
+    start = time.perf_counter()
+    df_equalized, data_are_equalized = plot_util.equalize_samples(
+        logger, df, GROUP_BY
+    )
+    elapsed = time.perf_counter() - start
+    rowwise_elapsed = ''
+    if len(df) <= CHECK_MAX_ROWS:
+        start = time.perf_counter()
+        df_rowwise = equalize_samples_rowwise(df, GROUP_BY)
+        rowwise_elapsed = f"{time.perf_counter() - start:.2f}"
+        if not df_equalized.sort_index().equals(df_rowwise.sort_index()):
+            print(f"FATAL ERROR: equalize_samples differs from the "
+                  + f"row-by-row test for {len(df)} rows")
+            sys.exit(1)
+    print(f"{len(df):>10} {len(df_equalized):>10} {elapsed:>9.2f} "
+          + f"{rowwise_elapsed:>15}")
+    nvalid*=10
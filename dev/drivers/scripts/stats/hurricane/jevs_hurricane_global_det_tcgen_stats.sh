@@ -3,7 +3,7 @@
 #PBS -j oe
 #PBS -A ENSTRACK-DEV
 #PBS -q dev
-#PBS -l select=1:ncpus=2:mem=4GB
+#PBS -l select=1:ncpus=9:mem=10GB
 ##PBS -l place=vscatter:exclhost,select=1:ncpus=128:ompthreads=1
 #PBS -l walltime=00:30:00
 #PBS -l debug=true
@@ -49,6 +49,9 @@ export DATAROOT=/lfs/h2/emc/stmp/$USER
 export COMOUT=/lfs/h2/emc/vpppg/noscrub/$USER/$NET/$evs_ver_2d
 export KEEPDATA=YES
 
+# Number of basin/model TCGen jobs to run at once
+export TCGEN_NPROC=9
+
 # CALL executable job script here
 $HOMEevs/jobs/JEVS_HURRICANE_STATS
 
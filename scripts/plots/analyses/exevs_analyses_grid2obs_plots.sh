@@ -83,6 +83,75 @@ while [ $DATE -ge $ENDDATE ]; do
 
 done
 
+# Read the stat files through the stat cache when STAT_CACHE_DIR is set
+# and pyarrow is available; otherwise prune the stats archive once for
+# every region/analysis/variable plotted below so each plot can skip its
+# own pruning
+
+if [ -n "$STAT_CACHE_DIR" ]; then
+   if python -c "import pyarrow" > /dev/null 2>&1; then
+      mkdir -p $STAT_CACHE_DIR
+   else
+      echo "WARNING: pyarrow is not available; pruning the stat files instead of using the stat cache"
+      unset STAT_CACHE_DIR
+   fi
+fi
+
+if [ -z "$STAT_CACHE_DIR" ]; then
+export PRUNE_MANIFEST=$PRUNEDIR/prune_manifest.txt
+> $PRUNE_MANIFEST
+for region in CONUS CONUS_East CONUS_West CONUS_Central CONUS_South Alaska Hawaii PuertoRico Guam
+do
+	for anl in rtma urma rtma_ru
+	do
+		for var in TMP2m DPT2m WIND10m GUSTsfc
+		do
+			echo "grid2obs conus_sfc SL1L2 $var $region ${anl}_anl,${anl}_ges BILIN" >> $PRUNE_MANIFEST
+		done
+		for var in VISsfc HGTcldceil TCDC
+		do
+			echo "grid2obs conus_sfc CTC $var $region ${anl}_anl,${anl}_ges BILIN" >> $PRUNE_MANIFEST
+		done
+	done
+done
+
+USH_DIR=$USHevs/analyses LOG_LEVEL=INFO PRUNE_DIR=$PRUNEDIR \
+STAT_OUTPUT_BASE_DIR=$STATDIR \
+STAT_OUTPUT_BASE_TEMPLATE="${NET}.stats.{MODEL}.${RUN}.${VERIF_CASE}.v{valid?fmt=%Y%m%d}.stat" \
+DATE_TYPE=INIT EVAL_PERIOD=TEST VALID_BEG=$PDYm31 VALID_END=$VDATE \
+INIT_BEG=$PDYm31 INIT_END=$VDATE FCST_LEAD=00 \
+python $USHevs/analyses/prune_stat_files_batch.py
+export err=$?; err_chk
+export SKIP_PRUNE=True
+fi
+
+# Render every plot below in one long-lived python process; each
+# py_plotting.config hands its plot to this server through plot_client.py
+
+# Start the plot server on a short socket path, as AF_UNIX socket
+# paths are limited to 108 bytes, and export PLOT_SERVER_SOCKET only
+# once the server is listening; otherwise each plot runs directly
+plot_server_dir=$(mktemp -d /tmp/evsps.XXXXXX)
+plot_server_socket=$plot_server_dir/plot_server.sock
+if [ ${#plot_server_socket} -lt 108 ]; then
+    USH_DIR=$USHevs/analyses python $USHevs/analyses/plot_server.py --socket $plot_server_socket > $LOGDIR/plot_server.out 2>&1 &
+    plot_server_pid=$!
+    nwait=0
+    while [ ! -S $plot_server_socket ] && kill -0 $plot_server_pid 2>/dev/null && [ $nwait -lt 300 ]; do
+        sleep 0.1
+        nwait=$((nwait+1))
+    done
+fi
+if [ -S $plot_server_socket ]; then
+    export PLOT_SERVER_SOCKET=$plot_server_socket
+else
+    echo "WARNING: Plot server did not start on $plot_server_socket; running each plot directly"
+    unset PLOT_SERVER_SOCKET
+    if [ -n "$plot_server_pid" ]; then
+        kill $plot_server_pid 2>/dev/null || true
+    fi
+fi
+
 # Create plot for each region
 
 for region in CONUS CONUS_East CONUS_West CONUS_Central CONUS_South Alaska Hawaii PuertoRico Guam
@@ -345,6 +414,13 @@ fi
 done
 done
 
+python $USHevs/analyses/plot_client.py --shutdown
+if [ -n "$plot_server_pid" ]; then
+    wait $plot_server_pid || echo "WARNING: Plot server exited with code $?"
+fi
+unset PLOT_SERVER_SOCKET
+rm -rf $plot_server_dir
+
 log_dir="$LOGDIR"
 if [ -d $log_dir ]; then
    log_file_count=$(find $log_dir -type f | wc -l)
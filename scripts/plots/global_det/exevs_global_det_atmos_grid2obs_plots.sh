@@ -39,43 +39,31 @@ export err=$?; err_chk
 python $USHevs/global_det/global_det_atmos_get_data_files.py
 export err=$?; err_chk
 
-# Create and run job scripts for condense_stats, filter_stats, make_plots, and tar_images
-for group in condense_stats filter_stats make_plots tar_images; do
+# Create job scripts for condense_stats, filter_stats, and make_plots
+for group in condense_stats filter_stats make_plots; do
     export JOB_GROUP=$group
-    echo "Creating and running jobs for grid-to-obs plots: ${JOB_GROUP}"
+    echo "Creating jobs for grid-to-obs plots: ${JOB_GROUP}"
     python $USHevs/global_det/global_det_atmos_plots_grid2obs_create_job_scripts.py
     export err=$?; err_chk
     chmod u+x ${VERIF_CASE}_${STEP}/plot_job_scripts/$group/*
-    nc=1
-    if [ $USE_CFP = YES ]; then
-        group_ncount_poe=$(ls -l  ${VERIF_CASE}_${STEP}/plot_job_scripts/$group/poe* |wc -l)
-        while [ $nc -le $group_ncount_poe ]; do
-            poe_script=$DATA/${VERIF_CASE}_${STEP}/plot_job_scripts/$group/poe_jobs${nc}
-            chmod 775 $poe_script
-            export MP_PGMMODEL=mpmd
-            export MP_CMDFILE=${poe_script}
-            if [ $machine = WCOSS2 ]; then
-                nselect=$(cat $PBS_NODEFILE | wc -l)
-                nnp=$(($nselect * $nproc))
-                launcher="mpiexec -np ${nnp} -ppn ${nproc} --cpu-bind verbose,depth cfp"
-            elif [ $machine = HERA -o $machine = ORION -o $machine = S4 -o $machine = JET ]; then
-                export SLURM_KILL_BAD_EXIT=0
-                launcher="srun --export=ALL --multi-prog"
-            fi
-            $launcher $MP_CMDFILE
-            export err=$?; err_chk
-            nc=$((nc+1))
-        done
-    else
-        group_ncount_job=$(ls -l  ${VERIF_CASE}_${STEP}/plot_job_scripts/$group/job* |wc -l)
-        while [ $nc -le $group_ncount_job ]; do
-            $DATA/${VERIF_CASE}_${STEP}/plot_job_scripts/$group/job${nc}
-            export err=$?; err_chk
-            nc=$((nc+1))
-        done
-    fi
 done
 
+# Run condense_stats, filter_stats, and make_plots jobs together, each
+# starting once the jobs writing its input have finished
+echo "Running jobs for grid-to-obs plots: condense_stats filter_stats make_plots"
+python $USHevs/global_det/global_det_atmos_plots_run_job_scripts.py condense_stats filter_stats make_plots
+export err=$?; err_chk
+
+# Create and run tar_images jobs, which are set from the image directories
+# made above
+export JOB_GROUP=tar_images
+echo "Creating and running jobs for grid-to-obs plots: ${JOB_GROUP}"
+python $USHevs/global_det/global_det_atmos_plots_grid2obs_create_job_scripts.py
+export err=$?; err_chk
+chmod u+x ${VERIF_CASE}_${STEP}/plot_job_scripts/$JOB_GROUP/*
+python $USHevs/global_det/global_det_atmos_plots_run_job_scripts.py $JOB_GROUP
+export err=$?; err_chk
+
 # Cat the plotting log files
 log_dir=$DATA/${VERIF_CASE}_${STEP}/plot_output/logs
 log_file_count=$(find $log_dir -type f |wc -l)
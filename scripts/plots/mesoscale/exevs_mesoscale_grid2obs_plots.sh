@@ -74,10 +74,40 @@ if [ $USE_CFP = YES ]; then
         nc=$((nc+1))
     done
 else
+    # Run the serial jobs' plots in one long-lived python process
+    # Start the plot server on a short socket path, as AF_UNIX socket
+    # paths are limited to 108 bytes, and export PLOT_SERVER_SOCKET only
+    # once the server is listening; otherwise each plot runs directly
+    plot_server_dir=$(mktemp -d /tmp/evsps.XXXXXX)
+    plot_server_socket=$plot_server_dir/plot_server.sock
+    if [ ${#plot_server_socket} -lt 108 ]; then
+        USH_DIR=$USHevs/mesoscale python $USHevs/mesoscale/plot_server.py --socket $plot_server_socket &
+        plot_server_pid=$!
+        nwait=0
+        while [ ! -S $plot_server_socket ] && kill -0 $plot_server_pid 2>/dev/null && [ $nwait -lt 300 ]; do
+            sleep 0.1
+            nwait=$((nwait+1))
+        done
+    fi
+    if [ -S $plot_server_socket ]; then
+        export PLOT_SERVER_SOCKET=$plot_server_socket
+    else
+        echo "WARNING: Plot server did not start on $plot_server_socket; running each plot directly"
+        unset PLOT_SERVER_SOCKET
+        if [ -n "$plot_server_pid" ]; then
+            kill $plot_server_pid 2>/dev/null || true
+        fi
+    fi
     while [ $nc -le $ncount_job ]; do
         ${DATA}/${VERIF_CASE}/${STEP}/plotting_job_scripts/job${nc}
         nc=$((nc+1))
     done
+    python $USHevs/mesoscale/plot_client.py --shutdown
+    if [ -n "$plot_server_pid" ]; then
+        wait $plot_server_pid || echo "WARNING: Plot server exited with code $?"
+    fi
+    unset PLOT_SERVER_SOCKET
+    rm -rf $plot_server_dir
 fi
 
 # Tar and Copy output files to EVS COMOUT directory
@@ -0,0 +1,92 @@
+'''
+Name: test_prune_stat_files.py
+Abstract: Checks the MET .stat pruning helpers that each component keeps
+          in its own ush/<component>/prune_stat_files.py. The helpers are
+          compared across the copies so they cannot drift, and each copy
+          is run against the same small .stat files.
+'''
+
+import ast
+import io
+import itertools
+import os
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPONENTS = [
+    'analyses', 'aqm', 'cam', 'mesoscale', 'rtofs', 'glwu', 'nwps',
+    'nfcens', 'global_det', 'global_ens'
+]
+SHARED_HELPERS = [
+    'MET_STAT_HEADER_COLS', 'read_stat_file_header', 'prune_stat_file'
+]
+
+HEADER = ('VERSION MODEL DESC FCST_LEAD FCST_VALID_BEG FCST_VALID_END '
+          'OBS_LEAD OBS_VALID_BEG OBS_VALID_END FCST_VAR FCST_UNITS FCST_LEV '
+          'OBS_VAR OBS_UNITS OBS_LEV OBTYPE VX_MASK INTERP_MTHD INTERP_PNTS '
+          'FCST_THRESH OBS_THRESH COV_THRESH ALPHA LINE_TYPE\n')
+
+
+def stat_line(model, vx_mask, line_type):
+    return (f'V11.1.0 {model} NA 240000 20240101_000000 20240101_000000 '
+            f'000000 20240101_000000 20240101_000000 TMP K Z2 TMP K Z2 '
+            f'ADPSFC {vx_mask} BILIN 4 NA NA NA NA {line_type} 1 2 3\n')
+
+
+STAT_LINES = [
+    stat_line('GFS', 'CONUS', 'SL1L2'),
+    stat_line('GFS', 'CONUS_East', 'SL1L2'),
+    stat_line('GFS', 'CONUS', 'VL1L2'),
+    stat_line('NAM', 'CONUS', 'SL1L2'),
+]
+COLUMN_FILTERS = {
+    'MODEL': ['GFS'], 'VX_MASK': ['CONUS'], 'LINE_TYPE': ['SL1L2']
+}
+
+
+def load_shared_helpers(component):
+    '''Return the source of each shared helper in a component's copy and
+       the helpers themselves, without importing the rest of the module'''
+    path = os.path.join(REPO_DIR, 'ush', component, 'prune_stat_files.py')
+    with open(path, 'r', encoding='UTF-8') as f:
+        source = f.read()
+    nodes = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef):
+            name = node.name
+        elif (isinstance(node, ast.Assign)
+                and isinstance(node.targets[0], ast.Name)):
+            name = node.targets[0].id
+        else:
+            continue
+        if name in SHARED_HELPERS:
+            nodes[name] = ast.get_source_segment(source, node)
+    namespace = {'itertools': itertools}
+    exec('\n\n'.join(nodes[name] for name in SHARED_HELPERS
+                     if name in nodes), namespace)
+    return nodes, namespace
+
+
+@pytest.mark.parametrize('component', COMPONENTS)
+def test_helpers_match_across_components(component):
+    reference, _ = load_shared_helpers(COMPONENTS[0])
+    nodes, _ = load_shared_helpers(component)
+    for name in SHARED_HELPERS:
+        assert nodes.get(name) == reference[name], (
+            f"{name} in ush/{component}/prune_stat_files.py differs from "
+            f"ush/{COMPONENTS[0]}/prune_stat_files.py"
+        )
+
+
+@pytest.mark.parametrize('component', COMPONENTS)
+@pytest.mark.parametrize('with_header', [True, False])
+def test_prune_stat_file(tmp_path, component, with_header):
+    _, helpers = load_shared_helpers(component)
+    met_stat_file = tmp_path / 'point_stat.stat'
+    met_stat_file.write_text(
+        (HEADER if with_header else '') + ''.join(STAT_LINES)
+    )
+    pmsf = io.StringIO()
+    helpers['prune_stat_file'](str(met_stat_file), pmsf, COLUMN_FILTERS)
+    assert pmsf.getvalue() == STAT_LINES[0]
@@ -14,14 +14,24 @@ import os
 import sys
 import shutil
 import uuid
+import functools
 import numpy as np
 import pandas as pd
 from datetime import timedelta as td
+from collections import OrderedDict
 
 SETTINGS_DIR = os.environ['USH_DIR']
 sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
-from prune_stat_files import prune_data
+from prune_stat_files import (
+    prune_data, prune_data_batch, daterange, expand_met_stat_files
+)
 import plot_util
+import stat_cache
+
+# Results of get_preprocessed_data(), kept in memory when one process renders
+# many plots (see plot_server.py).  Disabled unless a cache size is set.
+preprocessed_data_cache = OrderedDict()
+preprocessed_data_cache_size = 0
 
 
 # =================== FUNCTIONS =========================
@@ -52,10 +62,31 @@ def get_valid_range(logger, date_type, date_range, date_hours, fleads):
         raise ValueError(e)
     return valid_range
 
+def get_skip_prune():
+    # SKIP_PRUNE is set by jobs that ran run_prune_data_batch() beforehand
+    return str(os.environ.get('SKIP_PRUNE', 'False')).lower() in [
+        'true', '1', 't', 'y', 'yes'
+    ]
+
 def run_prune_data(logger, stats_dir, prune_dir, output_base_template, verif_case, 
                    verif_type, line_type, valid_range, eval_period, var_name, 
                    fcst_var_names, model_list, domain):
     model_list = [str(model) for model in model_list]
+    if get_skip_prune():
+        pruned_data_dir = os.path.join(
+            prune_dir,
+            (
+                str(line_type).upper()+'_'+str(var_name).upper()+'_'
+                +str(domain)+'_'+str(eval_period).upper()
+            )
+        )
+        if os.path.isdir(pruned_data_dir):
+            logger.info(f"SKIP_PRUNE is set. Using pruned data in"
+                        + f" {pruned_data_dir}")
+            return pruned_data_dir
+        logger.warning(f"SKIP_PRUNE is set but {pruned_data_dir} does not"
+                       + f" exist.")
+        logger.warning("Pruning stat files for this plot ...")
     tmp_dir = 'tmp'+str(uuid.uuid4().hex)
     pruned_data_dir = os.path.join(
         prune_dir,
@@ -92,6 +123,45 @@ def run_prune_data(logger, stats_dir, prune_dir, output_base_template, verif_cas
         raise OSError(e1+"\n"+e2)
     return pruned_data_dir
 
+def run_prune_data_batch(logger, stats_dir, prune_dir, output_base_template, 
+                         valid_range, eval_period, prune_requests):
+    # prune_requests: list of dicts with keys verif_case, verif_type, 
+    # line_type, var_name, fcst_var_names, model_list, domain, and interp
+    if not os.path.isdir(stats_dir):
+        e1 = f"{stats_dir} does not exist."
+        e2 = f"Create and populate {stats_dir} and retry."
+        logger.error(e1)
+        logger.error(e2)
+        raise OSError(e1+"\n"+e2)
+    if not len(os.listdir(stats_dir)):
+        e1 = f"{stats_dir} exists but is empty."
+        e2 = f"Populate {stats_dir} and retry."
+        logger.error(e1)
+        logger.error(e2)
+        raise OSError(e1+"\n"+e2)
+    logger.info(f"Looking for stat files in {stats_dir} using the"
+                + f" template: {output_base_template}")
+    prune_data_batch(
+        stats_dir, prune_dir, output_base_template, valid_range, 
+        str(eval_period).upper(),
+        [
+            {
+                'RUN_case': str(request['verif_case']).lower(),
+                'RUN_type': str(request['verif_type']).lower(),
+                'line_type': str(request['line_type']).upper(),
+                'vx_mask': str(request['domain']),
+                'var_name': str(request['var_name']).upper(),
+                'fcst_var_names': [
+                    str(fcst_var_name) 
+                    for fcst_var_name in request['fcst_var_names']
+                ],
+                'model_list': [str(model) for model in request['model_list']],
+                'interp': str(request['interp']),
+            }
+            for request in prune_requests
+        ]
+    )
+
 def check_empty(df, logger, called_from):
     if df.empty:
         logger.warning(f"Called from {called_from}:")
@@ -176,6 +246,83 @@ def create_df(logger, stats_dir, pruned_data_dir, line_type, date_range,
         logger.error("Quitting ...")
         sys.exit(0)
 
+def get_stat_cache_dir(logger):
+    # STAT_CACHE_DIR turns on the columnar stat cache (see stat_cache.py)
+    cache_dir = os.environ.get('STAT_CACHE_DIR', '')
+    if not cache_dir:
+        return None
+    if not stat_cache.cache_available():
+        logger.warning(f"STAT_CACHE_DIR is set but pyarrow is not available."
+                       + f" Pruning stat files instead ...")
+        return None
+    return cache_dir
+
+def create_df_from_stat_cache(logger, stats_dir, cache_dir, 
+                              output_base_template, verif_case, verif_type, 
+                              line_type, valid_range, eval_period, var_name, 
+                              fcst_var_names, model_list, domain, met_version):
+    model_list = [str(model) for model in model_list]
+    if not os.path.isdir(stats_dir) or not len(os.listdir(stats_dir)):
+        e1 = f"{stats_dir} does not exist or is empty."
+        e2 = f"Create and populate {stats_dir} and retry."
+        logger.error(e1)
+        logger.error(e2)
+        raise OSError(e1+"\n"+e2)
+    logger.info(f"Looking for stat files in {stats_dir} using the"
+                + f" template: {output_base_template}")
+    RUN_case = str(verif_case).lower()
+    RUN_type = str(verif_type).lower()
+    line_type = str(line_type).upper()
+    var_name = str(var_name).upper()
+    eval_period = str(eval_period).upper()
+    for model in model_list:
+        met_stat_files = []
+        for valid in daterange(valid_range[0], valid_range[1], td(days=1)):
+            met_stat_files = expand_met_stat_files(
+                met_stat_files, stats_dir, output_base_template, RUN_case, 
+                RUN_type, line_type, str(domain), var_name, model, 
+                eval_period, valid
+            )
+        if len(met_stat_files) == 0:
+            logger.warning(
+                f"No stat files for {str(model)} were found in {stats_dir}."
+            )
+            logger.warning("Continuing ...")
+            continue
+        # Same filters as prune_data()
+        column_filters = {
+            'MODEL': [model],
+            'VX_MASK': [str(domain)],
+            'FCST_VAR': [str(fcst_var_name) for fcst_var_name in fcst_var_names],
+        }
+        if RUN_type == 'anom' and 'HGT' in var_name:
+            column_filters['INTERP_MTHD'] = [os.environ['INTERP']]
+        logger.debug(f"Creating dataframe for {str(model)} using the stat"
+                     + f" cache in {cache_dir}")
+        df_tmp = stat_cache.read_stat_cache(
+            logger, met_stat_files, cache_dir, met_version, line_type, 
+            column_filters
+        )
+        if df_tmp is None:
+            continue
+        try:
+            df = pd.concat([df, df_tmp])
+        except UnboundLocalError as e:
+            df = df_tmp
+    try:
+        if check_empty(df, logger, 'create_df_from_stat_cache'):
+            return None
+        else:
+            df.reset_index(drop=True, inplace=True)
+            return df
+    except UnboundLocalError as e:
+        logger.error(e)
+        logger.error(
+            "Nonexistent dataframe. Check the logfile for more details."
+        )
+        logger.error("Quitting ...")
+        sys.exit(0)
+
 def filter_by_level_type(df, logger, verif_type):
     if df is None:
         return None
@@ -277,6 +424,31 @@ def filter_by_hour(df, logger, date_type, date_hours):
     else:
         return df
 
+def set_preprocessed_data_cache_size(cache_size):
+    global preprocessed_data_cache_size
+    preprocessed_data_cache_size = cache_size
+    while len(preprocessed_data_cache) > cache_size:
+        preprocessed_data_cache.popitem(last=False)
+
+def cache_preprocessed_data(func):
+    @functools.wraps(func)
+    def wrapper(logger, *args, **kwargs):
+        if preprocessed_data_cache_size < 1:
+            return func(logger, *args, **kwargs)
+        cache_key = repr((args, sorted(kwargs.items())))
+        if cache_key in preprocessed_data_cache:
+            preprocessed_data_cache.move_to_end(cache_key)
+            logger.info("Using preprocessed data already held in memory")
+        else:
+            preprocessed_data_cache[cache_key] = func(logger, *args, **kwargs)
+            if len(preprocessed_data_cache) > preprocessed_data_cache_size:
+                preprocessed_data_cache.popitem(last=False)
+        df = preprocessed_data_cache[cache_key]
+        # Callers modify the dataframe they get back
+        return None if df is None else df.copy()
+    return wrapper
+
+@cache_preprocessed_data
 def get_preprocessed_data(logger, stats_dir, prune_dir, output_base_template, 
                           verif_case, verif_type, line_type, date_type, 
                           date_range, eval_period, date_hours, fleads, 
@@ -285,15 +457,24 @@ def get_preprocessed_data(logger, stats_dir, prune_dir, output_base_template,
     valid_range = get_valid_range(
         logger, date_type, date_range, date_hours, fleads
     )
-    pruned_data_dir = run_prune_data(
-        logger, stats_dir, prune_dir, output_base_template, verif_case, verif_type, 
-        line_type, valid_range, eval_period, var_name, fcst_var_names, model_list, 
-        domain
-    )
-    df = create_df(
-        logger, stats_dir, pruned_data_dir, line_type, date_range, model_list,
-        met_version, clear_prune_dir
-    )
+    cache_dir = get_stat_cache_dir(logger)
+    if cache_dir:
+        df = create_df_from_stat_cache(
+            logger, stats_dir, cache_dir, output_base_template, verif_case, 
+            verif_type, line_type, valid_range, eval_period, var_name, 
+            fcst_var_names, model_list, domain, met_version
+        )
+    else:
+        pruned_data_dir = run_prune_data(
+            logger, stats_dir, prune_dir, output_base_template, verif_case, 
+            verif_type, line_type, valid_range, eval_period, var_name, 
+            fcst_var_names, model_list, domain
+        )
+        # Pruned data from a batch run is shared by other plots, so keep it
+        df = create_df(
+            logger, stats_dir, pruned_data_dir, line_type, date_range, 
+            model_list, met_version, clear_prune_dir and not get_skip_prune()
+        )
     df = filter_by_level_type(df, logger, verif_type)
     df = filter_by_var_name(df, logger, fcst_var_names, obs_var_names)
     df = filter_by_interp(df, logger, interp)
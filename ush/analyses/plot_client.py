@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+###############################################################################
+#
+# Name:          plot_client.py
+# Contact(s):    Marcel Caron
+# Title:         Thin client for plot_server.py
+# Abstract:      Sends one plotting script and the current environment to
+#                the plot server listening on PLOT_SERVER_SOCKET, prints the
+#                script's output, and exits with its return code.  If
+#                PLOT_SERVER_SOCKET is unset or no server answers, the
+#                script is run directly, exactly as before.  The ex-script
+#                only exports PLOT_SERVER_SOCKET once the server is
+#                listening, so the client makes one connection attempt and
+#                falls back at once when the socket is missing or refused:
+#
+#                python plot_client.py lead_average.py
+#                python plot_client.py --shutdown
+#
+#                Only the standard library is imported so the client starts
+#                quickly.
+#
+###############################################################################
+
+import os
+import sys
+import json
+import socket
+
+# Seconds to wait for the plot server to accept the connection
+CONNECT_TIMEOUT = 1
+
+
+# =================== FUNCTIONS =========================
+
+def connect(socket_path):
+    if not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(CONNECT_TIMEOUT)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+    # Plots can take minutes, so only the connection is timed
+    client.settimeout(None)
+    return client
+
+def send_request(socket_path, plot_request):
+    client = connect(socket_path)
+    if client is None:
+        return None
+    with client, client.makefile('rwb') as stream:
+        stream.write(json.dumps(plot_request).encode('utf-8') + b'\n')
+        stream.flush()
+        reply = stream.readline()
+    if not reply:
+        return None
+    return json.loads(reply)
+
+def main(argv):
+    socket_path = os.environ.get('PLOT_SERVER_SOCKET', '')
+    if argv == ['--shutdown']:
+        if socket_path and os.path.exists(socket_path):
+            send_request(socket_path, {'shutdown': True})
+        return 0
+    if len(argv) != 1:
+        print("Usage: plot_client.py SCRIPT | plot_client.py --shutdown")
+        return 2
+    script = argv[0]
+    if not os.path.isabs(script):
+        script = os.path.join(os.environ['USH_DIR'], script)
+    if socket_path:
+        reply = send_request(socket_path, {
+            'script': script,
+            'env': dict(os.environ),
+            'cwd': os.getcwd(),
+        })
+        if reply is not None:
+            sys.stdout.write(reply['output'])
+            sys.stdout.flush()
+            return reply['returncode']
+        print(f"WARNING: No plot server answered on {socket_path}."
+              + f" Running {script} directly.")
+        sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable, script])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
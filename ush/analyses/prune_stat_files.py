@@ -10,7 +10,7 @@ Abstract: This script is run by all scripts in EMC_verif-global/scripts/.
 '''
 
 import glob
-import subprocess
+import itertools
 import os
 import re
 import sys
@@ -26,6 +26,46 @@ def daterange(start, end, td):
       yield curr
       curr+=td
 
+# MET .stat header columns, used when a file is missing its header line
+MET_STAT_HEADER_COLS = [
+   'VERSION', 'MODEL', 'DESC', 'FCST_LEAD', 'FCST_VALID_BEG',
+   'FCST_VALID_END', 'OBS_LEAD', 'OBS_VALID_BEG', 'OBS_VALID_END',
+   'FCST_VAR', 'FCST_UNITS', 'FCST_LEV', 'OBS_VAR', 'OBS_UNITS', 'OBS_LEV',
+   'OBTYPE', 'VX_MASK', 'INTERP_MTHD', 'INTERP_PNTS', 'FCST_THRESH',
+   'OBS_THRESH', 'COV_THRESH', 'ALPHA', 'LINE_TYPE'
+]
+
+def read_stat_file_header(msf):
+   '''Return the header columns of an open MET .stat file and an iterator
+      over the lines that follow the header'''
+   first_line = msf.readline()
+   header_cols = first_line.split()
+   if header_cols[:1] == ['VERSION']:
+      return header_cols, msf
+   return MET_STAT_HEADER_COLS, itertools.chain([first_line], msf)
+
+def prune_stat_file(met_stat_file, pmsf, column_filters):
+   '''Stream one MET .stat file and write to the open file object pmsf
+      every line whose header columns each hold one of the accepted
+      values. Columns are compared whole, so e.g. a CONUS filter does
+      not keep CONUS_East lines.
+
+      column_filters: dict of {MET header column name: accepted values}
+   '''
+   with open(met_stat_file, 'r', encoding='UTF-8') as msf:
+      header_cols, lines = read_stat_file_header(msf)
+      col_tests = [
+         (header_cols.index(col_name), set(accepted))
+         for col_name, accepted in column_filters.items()
+      ]
+      max_idx = max(idx for idx, accepted in col_tests)
+      for line in lines:
+         cols = line.split(None, max_idx+1)
+         if len(cols) <= max_idx:
+            continue
+         if all(cols[idx] in accepted for idx, accepted in col_tests):
+            pmsf.write(line if line.endswith('\n') else line+'\n')
+
 def expand_met_stat_files(met_stat_files, data_dir, output_base_template, RUN_case, 
                           RUN_type, line_type, vx_mask, var_name, model, 
                           eval_period, valid):
@@ -79,39 +119,135 @@ def prune_data(data_dir, prune_dir, tmp_dir, output_base_template, valid_range,
          continue
       with open(met_stat_files[0]) as msf:
          met_header_cols = msf.readline()
-      all_grep_output = ''
+      column_filters = {
+         'MODEL': [model],
+         'VX_MASK': [vx_mask],
+         'FCST_VAR': [name.strip() for name in fcst_var_names],
+         'LINE_TYPE': [line_type],
+      }
       if RUN_type == 'anom' and 'HGT' in var_name:
          print("Pruning "+data_dir+" files for model "+model+", vx_mask "
                +vx_mask+", variable "+'/'.join(fcst_var_names)+", line_type "+line_type
                +", interp "+os.environ['INTERP'])
-         filter_cmd = (
-            ' | grep " '+vx_mask
-            +' " | grep "'+'\|'.join(fcst_var_names)
-            +'" | grep " '+line_type
-            +' " | grep " '+os.environ['INTERP']+' "'
-         )
+         column_filters['INTERP_MTHD'] = [os.environ['INTERP']]
       else:
          print("Pruning "+data_dir+" files for model "+model+", vx_mask "
                +vx_mask+", variable "+'/'.join(fcst_var_names)+", line_type "+line_type)
-         filter_cmd = (
-            ' | grep " '+vx_mask
-            +' " | grep "'+'\|'.join(fcst_var_names)
-            +'" | grep " '+line_type+' "'
-         )
       # Prune the MET .stat files and write to new file
-      for met_stat_file in met_stat_files:
-         ps = subprocess.run('grep -R "'+model+'" '+met_stat_file+filter_cmd,
-                               shell=True, stdout=subprocess.PIPE,
-                               stderr=subprocess.STDOUT, encoding='UTF-8')
-         grep_output = ps.stdout
-         all_grep_output = all_grep_output+grep_output
       pruned_met_stat_file = os.path.join(pruned_data_dir,
                                           model+'.stat')
-      try:
-         with open(pruned_met_stat_file, 'w') as pmsf:
-            pmsf.write(met_header_cols+all_grep_output)
-      except OSError:
-         #print(met_header_cols)
-         #print(all_grep_output)
-         raise
+      with open(pruned_met_stat_file, 'w') as pmsf:
+         pmsf.write(met_header_cols)
+         for met_stat_file in met_stat_files:
+            prune_stat_file(met_stat_file, pmsf, column_filters)
+   print("END: "+os.path.basename(__file__))
+
+def prune_data_batch(data_dir, prune_dir, output_base_template, valid_range,
+                     eval_period, prune_requests):
+   '''Prune the MET .stat files for many plotting jobs in one pass.
+
+      Each source .stat file is read once and every line is routed to all
+      of the pruned files it matches, written as
+      prune_dir/<line_type>_<var_name>_<vx_mask>_<eval_period>/<model>.stat.
+      The plotting jobs can then read these files with pruning skipped.
+
+      prune_requests: list of dicts with keys RUN_case, RUN_type,
+                      line_type, vx_mask, var_name, fcst_var_names,
+                      model_list and interp
+   '''
+   print("BEGIN: "+os.path.basename(__file__))
+   # Map each source file to the filters of the pruned files it feeds
+   routes = {}
+   pruned_files = {}
+   for request in prune_requests:
+      RUN_case = request['RUN_case']
+      RUN_type = request['RUN_type']
+      line_type = request['line_type']
+      vx_mask = request['vx_mask']
+      var_name = request['var_name']
+      fcst_var_names = request['fcst_var_names']
+      pruned_data_dir = os.path.join(
+         prune_dir, line_type+'_'+var_name+'_'+vx_mask+'_'+eval_period
+      )
+      if not os.path.exists(pruned_data_dir):
+         os.makedirs(pruned_data_dir)
+      for model in request['model_list']:
+         pruned_met_stat_file = os.path.join(pruned_data_dir,
+                                             model+'.stat')
+         if pruned_met_stat_file in pruned_files:
+            continue
+         met_stat_files = []
+         for valid in daterange(valid_range[0], valid_range[1], td(days=1)):
+            met_stat_files = expand_met_stat_files(
+               met_stat_files, data_dir, output_base_template, RUN_case, 
+               RUN_type, line_type, vx_mask, var_name, model, eval_period, 
+               valid
+            ) 
+         if len(met_stat_files) == 0:
+            continue
+         column_filters = {
+            'MODEL': [model],
+            'VX_MASK': [vx_mask],
+            'FCST_VAR': [name.strip() for name in fcst_var_names],
+            'LINE_TYPE': [line_type],
+         }
+         if RUN_type == 'anom' and 'HGT' in var_name:
+            column_filters['INTERP_MTHD'] = [request['interp']]
+         # Lines are kept per source file so each pruned file follows the 
+         # order of its own source files
+         chunks = {met_stat_file: [] for met_stat_file in met_stat_files}
+         pruned_files[pruned_met_stat_file] = (met_stat_files[0], chunks)
+         for met_stat_file, chunk in chunks.items():
+            routes.setdefault(met_stat_file, []).append(
+               (column_filters, chunk)
+            )
+   print("Pruning "+data_dir+" files for "+str(len(pruned_files))
+         +" pruned files from "+str(len(routes))+" source files")
+   # Read each source file once, routing lines on MODEL, VX_MASK and 
+   # LINE_TYPE before testing the remaining columns
+   for met_stat_file, file_routes in routes.items():
+      with open(met_stat_file, 'r', encoding='UTF-8') as msf:
+         header_cols, lines = read_stat_file_header(msf)
+         key_idx = [
+            header_cols.index(col_name) 
+            for col_name in ['MODEL', 'VX_MASK', 'LINE_TYPE']
+         ]
+         dispatch = {}
+         for column_filters, chunk in file_routes:
+            key = (
+               column_filters['MODEL'][0], column_filters['VX_MASK'][0], 
+               column_filters['LINE_TYPE'][0]
+            )
+            col_tests = [
+               (header_cols.index(col_name), set(accepted))
+               for col_name, accepted in column_filters.items()
+               if col_name not in ['MODEL', 'VX_MASK', 'LINE_TYPE']
+            ]
+            dispatch.setdefault(key, []).append((col_tests, chunk))
+         max_idx = max(
+            key_idx + [
+               idx for targets in dispatch.values() 
+               for col_tests, chunk in targets for idx, accepted in col_tests
+            ]
+         )
+         for line in lines:
+            cols = line.split(None, max_idx+1)
+            if len(cols) <= max_idx:
+               continue
+            targets = dispatch.get(tuple(cols[idx] for idx in key_idx))
+            if targets is None:
+               continue
+            if not line.endswith('\n'):
+               line = line+'\n'
+            for col_tests, chunk in targets:
+               if all(cols[idx] in accepted for idx, accepted in col_tests):
+                  chunk.append(line)
+   # Write the pruned files
+   for pruned_met_stat_file, (header_file, chunks) in pruned_files.items():
+      with open(header_file) as msf:
+         met_header_cols = msf.readline()
+      with open(pruned_met_stat_file, 'w') as pmsf:
+         pmsf.write(met_header_cols)
+         for chunk in chunks.values():
+            pmsf.writelines(chunk)
    print("END: "+os.path.basename(__file__))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+###############################################################################
+#
+# Name:          prune_stat_files_batch.py
+# Contact(s):    Marcel Caron
+# Abstract:      Prunes the MET .stat files for a whole list of plotting jobs
+#                in a single pass over the stats archive.  Each line of the
+#                file named by PRUNE_MANIFEST requests one pruned output:
+#
+#                VERIF_CASE VERIF_TYPE LINE_TYPE var_name VX_MASK MODELS INTERP
+#
+#                where MODELS is comma-separated without spaces.  Pruned
+#                files are written to
+#                PRUNE_DIR/<LINE_TYPE>_<var_name>_<VX_MASK>_<EVAL_PERIOD>/,
+#                and plotting jobs then read them with SKIP_PRUNE=True.
+#
+###############################################################################
+
+import os
+import sys
+import logging
+from datetime import datetime, timedelta as td
+
+SETTINGS_DIR = os.environ['USH_DIR']
+sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
+from settings import Presets, Reference
+import df_preprocessing
+from check_variables import *
+
+presets = Presets()
+reference = Reference()
+
+
+# =================== FUNCTIONS =========================
+
+def read_prune_manifest(logger, manifest):
+    prune_requests = []
+    with open(manifest, 'r') as mf:
+        for line in mf:
+            cols = line.split()
+            if not cols or cols[0].startswith('#'):
+                continue
+            if len(cols) != 7:
+                e = (f"Expected 7 columns in the prune manifest but found"
+                     + f" {len(cols)}: {line.strip()}")
+                logger.error(e)
+                raise ValueError(e)
+            verif_case, verif_type, line_type, var_name, domain, models, interp = cols
+            verif_casetype = f"{verif_case.lower()}_{verif_type.lower()}"
+            try:
+                var_specs = (
+                    reference.case_type[verif_casetype][line_type.upper()]
+                    ['var_dict'][var_name]
+                )
+            except KeyError:
+                logger.warning(f"No settings found for {verif_casetype},"
+                               + f" {line_type}, {var_name}. Skipping ...")
+                continue
+            prune_requests.append({
+                'verif_case': verif_case,
+                'verif_type': verif_type,
+                'line_type': line_type,
+                'var_name': var_name,
+                'fcst_var_names': var_specs['fcst_var_names'],
+                'model_list': models.split(','),
+                'domain': domain,
+                'interp': interp,
+            })
+    return prune_requests
+
+def main():
+    logger = logging.getLogger(__file__)
+    logger.setLevel(LOG_LEVEL)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(
+        '%(asctime)s (%(filename)s:%(lineno)d) %(levelname)s: %(message)s',
+        '%m/%d %H:%M:%S'
+    ))
+    logger.addHandler(stream_handler)
+
+    if str(EVAL_PERIOD).upper() == 'TEST':
+        valid_beg = VALID_BEG
+        valid_end = VALID_END
+        init_beg = INIT_BEG
+        init_end = INIT_END
+    else:
+        valid_beg = presets.date_presets[EVAL_PERIOD]['valid_beg']
+        valid_end = presets.date_presets[EVAL_PERIOD]['valid_end']
+        init_beg = presets.date_presets[EVAL_PERIOD]['init_beg']
+        init_end = presets.date_presets[EVAL_PERIOD]['init_end']
+    if str(DATE_TYPE).upper() == 'VALID':
+        date_beg, date_end = valid_beg, valid_end
+    else:
+        date_beg, date_end = init_beg, init_end
+    date_range = (
+        datetime.strptime(date_beg, '%Y%m%d'),
+        datetime.strptime(date_end, '%Y%m%d')+td(days=1)-td(milliseconds=1)
+    )
+    # Prune for every hour of the day so any plot in the batch is covered
+    valid_range = df_preprocessing.get_valid_range(
+        logger, DATE_TYPE, date_range, list(range(24)), FLEADS
+    )
+    prune_requests = read_prune_manifest(logger, PRUNE_MANIFEST)
+    logger.info(f"Pruning for {len(prune_requests)} requests listed in"
+                + f" {PRUNE_MANIFEST}")
+    df_preprocessing.run_prune_data_batch(
+        logger, STATS_DIR, PRUNE_DIR, OUTPUT_BASE_TEMPLATE, valid_range,
+        EVAL_PERIOD, prune_requests
+    )
+
+
+if __name__ == "__main__":
+    print("\n=================== CHECKING CONFIG VARIABLES =====================\n")
+    LOG_LEVEL = check_LOG_LEVEL(os.environ['LOG_LEVEL'])
+    STAT_OUTPUT_BASE_DIR = check_STAT_OUTPUT_BASE_DIR(os.environ['STAT_OUTPUT_BASE_DIR'])
+    STATS_DIR = STAT_OUTPUT_BASE_DIR
+    PRUNE_DIR = check_PRUNE_DIR(os.environ['PRUNE_DIR'])
+    DATE_TYPE = check_DATE_TYPE(os.environ['DATE_TYPE'])
+    EVAL_PERIOD = check_EVAL_PERIOD(os.environ['EVAL_PERIOD'])
+    VALID_BEG = check_VALID_BEG(os.environ['VALID_BEG'], DATE_TYPE, EVAL_PERIOD)
+    VALID_END = check_VALID_END(os.environ['VALID_END'], DATE_TYPE, EVAL_PERIOD)
+    INIT_BEG = check_INIT_BEG(os.environ['INIT_BEG'], DATE_TYPE, EVAL_PERIOD)
+    INIT_END = check_INIT_END(os.environ['INIT_END'], DATE_TYPE, EVAL_PERIOD)
+    FLEADS = check_FCST_LEAD(os.environ['FCST_LEAD']).replace(' ','').split(',')
+    PRUNE_MANIFEST = os.environ['PRUNE_MANIFEST']
+    OUTPUT_BASE_TEMPLATE = os.environ['STAT_OUTPUT_BASE_TEMPLATE']
+    print("\n===================================================================\n")
+
+    LOG_LEVEL = str(LOG_LEVEL)
+    FLEADS = [int(flead) for flead in FLEADS]
+    main()
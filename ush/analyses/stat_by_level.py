@@ -26,14 +26,13 @@ import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
-import matplotlib.image as mpimg
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from datetime import datetime, timedelta as td
 
 SETTINGS_DIR = os.environ['USH_DIR']
 sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
 from settings import Toggle, Templates, Paths, Presets, ModelSpecs, Reference
-from plotter import Plotter
+from plotter import Plotter, read_logo
 from prune_stat_files import prune_data
 import plot_util
 import df_preprocessing
@@ -947,7 +946,7 @@ def plot_stat_by_level(df: pd.DataFrame, logger: logging.Logger,
     # Logos
     if plot_logo_left:
         if os.path.exists(path_logo_left):
-            left_logo_arr = mpimg.imread(path_logo_left)
+            left_logo_arr = read_logo(path_logo_left)
             left_image_box = OffsetImage(left_logo_arr, zoom=zoom_logo_left*0.9)
             ab_left = AnnotationBbox(
                 left_image_box, xy=(0.,1.), xycoords='axes fraction',
@@ -962,7 +961,7 @@ def plot_stat_by_level(df: pd.DataFrame, logger: logging.Logger,
             )
     if plot_logo_right:
         if os.path.exists(path_logo_right):
-            right_logo_arr = mpimg.imread(path_logo_right)
+            right_logo_arr = read_logo(path_logo_right)
             if sample_equalization:
                 right_image_box = OffsetImage(right_logo_arr, zoom=zoom_logo_right*0.65)
                 ab_right = AnnotationBbox(
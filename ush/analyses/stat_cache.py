@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+###############################################################################
+#
+# Name:          stat_cache.py
+# Contact(s):    Marcel Caron
+# Abstract:      Persistent columnar cache of MET .stat files.  Each source
+#                .stat file is parsed once into a Parquet file keyed on the
+#                source path, size, and modification time.  Header columns
+#                are stored as categoricals and line type columns as float64,
+#                with one row group per line type, so readers load only the
+#                columns and row groups they need.  Requires pyarrow.
+#
+###############################################################################
+
+import os
+import io
+import sys
+import uuid
+import hashlib
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+SETTINGS_DIR = os.environ['USH_DIR']
+sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
+import plot_util
+
+# Increment to invalidate existing cache files when the layout changes
+CACHE_VERSION = '1'
+
+
+# =================== FUNCTIONS =========================
+
+def cache_available():
+    return pq is not None
+
+def get_cache_path(cache_dir, met_stat_file):
+    path_hash = hashlib.sha1(
+        os.path.abspath(met_stat_file).encode('utf-8')
+    ).hexdigest()[:16]
+    return os.path.join(
+        cache_dir, f"{os.path.basename(met_stat_file)}.{path_hash}.parquet"
+    )
+
+def get_source_key(met_stat_file, met_version):
+    met_stat_file_stat = os.stat(met_stat_file)
+    return {
+        b'evs_cache_version': CACHE_VERSION.encode(),
+        b'evs_source_path': os.path.abspath(met_stat_file).encode(),
+        b'evs_source_size': str(met_stat_file_stat.st_size).encode(),
+        b'evs_source_mtime_ns': str(met_stat_file_stat.st_mtime_ns).encode(),
+        b'evs_met_version': str(met_version).encode(),
+    }
+
+def is_cache_current(cache_path, source_key):
+    if not os.path.isfile(cache_path):
+        return False
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return all(metadata.get(k) == v for k, v in source_key.items())
+
+def build_cache_entry(logger, met_stat_file, cache_path, met_version,
+                      source_key):
+    df_og_colnames = plot_util.get_stat_file_base_columns(met_version)
+    line_type_idx = len(df_og_colnames)-1
+    lines_by_line_type = {}
+    with open(met_stat_file, 'r') as msf:
+        for line in msf:
+            cols = line.split(None, line_type_idx+1)
+            if len(cols) <= line_type_idx or cols[0] == 'VERSION':
+                continue
+            lines_by_line_type.setdefault(cols[line_type_idx], []).append(line)
+    line_type_colnames = {}
+    for line_type in lines_by_line_type:
+        try:
+            line_type_colnames[line_type] = (
+                plot_util.get_stat_file_line_type_columns(
+                    logger, met_version, line_type
+                )
+            )
+        except UnboundLocalError:
+            logger.debug(f"Line type {line_type} is not cached from"
+                         + f" {met_stat_file}")
+    df_line_type_colnames = []
+    for colnames in line_type_colnames.values():
+        df_line_type_colnames += [
+            col_name for col_name in colnames
+            if col_name not in df_line_type_colnames
+        ]
+    schema = pa.schema(
+        [
+            (col_name, pa.dictionary(pa.int32(), pa.string()))
+            for col_name in df_og_colnames
+        ] + [
+            (col_name, pa.float64()) for col_name in df_line_type_colnames
+        ],
+        metadata=source_key
+    )
+    # Write to a temporary file first so concurrent plot jobs never read a
+    # partial cache file
+    tmp_cache_path = f"{cache_path}.tmp{uuid.uuid4().hex}"
+    with pq.ParquetWriter(tmp_cache_path, schema) as writer:
+        for line_type, colnames in line_type_colnames.items():
+            df_tmp = pd.read_csv(
+                io.StringIO(''.join(lines_by_line_type[line_type])),
+                sep=r'\s+', header=None,
+                names=list(df_og_colnames)+list(colnames), dtype=str
+            )
+            for col_name in colnames:
+                df_tmp[col_name] = df_tmp[col_name].astype(float)
+            df_tmp = df_tmp.reindex(
+                columns=list(df_og_colnames)+df_line_type_colnames
+            )
+            writer.write_table(
+                pa.Table.from_pandas(
+                    df_tmp, schema=schema, preserve_index=False
+                )
+            )
+    os.replace(tmp_cache_path, cache_path)
+    logger.debug(f"Cached {met_stat_file} in {cache_path}")
+
+def read_stat_cache(logger, met_stat_files, cache_dir, met_version, line_type,
+                    column_filters):
+    """! Read the rows of one line type from a list of MET .stat files,
+         building or refreshing their cache entries as needed
+
+         Args:
+            met_stat_files - list of source .stat file paths
+            cache_dir      - directory holding the cache files
+            met_version    - string of MET version number
+            line_type      - string of the line type to read
+            column_filters - dict of {header column name: accepted values}
+         Returns:
+            df             - dataframe of the matching rows, with header
+                             columns as strings and line type columns as
+                             floats, or None if no rows matched
+    """
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+    df_og_colnames = plot_util.get_stat_file_base_columns(met_version)
+    df_line_type_colnames = plot_util.get_stat_file_line_type_columns(
+        logger, met_version, str(line_type).upper()
+    )
+    columns = list(df_og_colnames)+list(df_line_type_colnames)
+    filters = [('LINE_TYPE', '=', str(line_type).upper())] + [
+        (col_name, 'in', list(accepted))
+        for col_name, accepted in column_filters.items()
+    ]
+    frames = []
+    for met_stat_file in met_stat_files:
+        cache_path = get_cache_path(cache_dir, met_stat_file)
+        source_key = get_source_key(met_stat_file, met_version)
+        if not is_cache_current(cache_path, source_key):
+            build_cache_entry(
+                logger, met_stat_file, cache_path, met_version, source_key
+            )
+        schema_names = pq.read_schema(cache_path).names
+        if not all(col_name in schema_names for col_name in columns):
+            continue
+        table = pq.read_table(cache_path, columns=columns, filters=filters)
+        if table.num_rows:
+            frames.append(table.to_pandas())
+    if not frames:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    # Plotting code expects plain string columns, e.g. for groupby
+    for col_name in df_og_colnames:
+        df[col_name] = df[col_name].astype(object)
+    return df
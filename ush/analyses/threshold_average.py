@@ -26,7 +26,6 @@ import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
-import matplotlib.image as mpimg
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from datetime import datetime, timedelta as td
 from decimal import Decimal
@@ -34,7 +33,7 @@ from decimal import Decimal
 SETTINGS_DIR = os.environ['USH_DIR']
 sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
 from settings import Toggle, Templates, Paths, Presets, ModelSpecs, Reference
-from plotter import Plotter
+from plotter import Plotter, read_logo
 from prune_stat_files import prune_data
 import plot_util
 import df_preprocessing
@@ -851,7 +850,7 @@ def plot_threshold_average(df: pd.DataFrame, logger: logging.Logger,
     # Logos
     if plot_logo_left:
         if os.path.exists(path_logo_left):
-            left_logo_arr = mpimg.imread(path_logo_left)
+            left_logo_arr = read_logo(path_logo_left)
             left_image_box = OffsetImage(left_logo_arr, zoom=zoom_logo_left)
             ab_left = AnnotationBbox(
                 left_image_box, xy=(0.,1.), xycoords='axes fraction',
@@ -866,7 +865,7 @@ def plot_threshold_average(df: pd.DataFrame, logger: logging.Logger,
             )
     if plot_logo_right:
         if os.path.exists(path_logo_right):
-            right_logo_arr = mpimg.imread(path_logo_right)
+            right_logo_arr = read_logo(path_logo_right)
             right_image_box = OffsetImage(right_logo_arr, zoom=zoom_logo_right)
             ab_right = AnnotationBbox(
                 right_image_box, xy=(1.,1.), xycoords='axes fraction',
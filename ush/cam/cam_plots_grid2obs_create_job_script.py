@@ -130,7 +130,7 @@ elif STEP == 'plots':
     else:
         job_cmd_list_iterative.append(
             f'python '
-            + f'{USH_DIR}/{PLOT_TYPE}.py'
+            + f'{USH_DIR}/plot_client.py {USH_DIR}/{PLOT_TYPE}.py'
         )
         job_cmd_list_iterative.append(
             f"python -c "
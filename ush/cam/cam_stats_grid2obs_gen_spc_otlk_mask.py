@@ -12,7 +12,6 @@ from datetime import datetime, timedelta as td
 import os
 import sys
 import requests
-import numpy as np
 import cam_util as cutil
 
 VDATE = os.environ['VDATE']
@@ -101,22 +100,12 @@ for OTLK in OTLKs:
     os.environ['NEST_INPUT_TEMPLATE'] = NEST_INPUT_TEMPLATE
     if os.path.isfile(os.path.join(EVSINspcotlk,NEST_INPUT_TEMPLATE)):
         try:
-            N_REC = cutil.run_shell_command([
-                'gis_dump_dbf', 
-                os.path.join(EVSINspcotlk,f"spc_otlk.{VDATE}/{SHP_FILE}.dbf"), 
-                '|', 'grep', 'n_records', '|', 'cut', '-d\'=\'', '-f2', '|', 'tr', 
-                '-d', '\' \''
-            ], capture_output=True)
-            print(f"Processing {N_REC} records.")
-            if int(N_REC) > 0:
-                for REC in np.arange(int(N_REC)):
-                    NAME = cutil.run_shell_command([
-                        'gis_dump_dbf', 
-                        os.path.join(EVSINspcotlk,f"spc_otlk.{VDATE}/{SHP_FILE}.dbf"), 
-                        '|', 'egrep', '-A', '5', f'"^Record {REC}"', '|', 'tail',
-                        '-1', '|', 'cut', '-d\'"\'', '-f2'
-                    ], capture_output=True)
-                    NAME = NAME.replace('\n','')
+            RECORDS = cutil.get_shapefile_record_names(
+                os.path.join(EVSINspcotlk,NEST_INPUT_TEMPLATE)
+            )
+            print(f"Processing {len(RECORDS)} records.")
+            if len(RECORDS) > 0:
+                for REC, NAME in RECORDS:
                     print(f"Processing Record #{REC}: {NAME}")
                     MASK_FNAME = f"spc_otlk_d{DAY}_{OTLK}_{NAME}_v{V1DATE}{V1HOUR}-{V2DATE}{V2HOUR}_for{VHOUR}Z"
                     if int(DAY) == 3:
@@ -134,7 +123,7 @@ for OTLK in OTLKs:
             else:
                 print(f"No day {DAY} outlook areas were issued at {OTLK}Z on {IDATE}")
                 continue
-        except IOError as e:
+        except (IOError, ValueError) as e:
             print(f"FATAL ERROR: {e}")
             print(f"The following file was deleted or corrupted while trying "
                   + f"to open it: {os.path.join(EVSINspcotlk,NEST_INPUT_TEMPLATE)}")
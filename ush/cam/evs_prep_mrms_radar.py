@@ -3,6 +3,8 @@
 # Name of Script: evs_prep_mrms_radar.py
 # Contact(s):     Marcel G. Caron (marcel.caron@noaa.gov)
 # Purpose of Script: Copy and unzip MRMS radar files that are closest to top of hour
+#                    vhr may list several valid hours (space- or comma-separated);
+#                    each product directory is listed once for all of them
 # History Log:
 #   2020:       Initial script assembled and run in dev
 #   12/22/2022: Initial script modified to follow NCO standards
@@ -10,20 +12,41 @@
 
 import sys, os, shutil, subprocess
 import datetime
-import re, csv, glob
+import re, csv
 import bisect
+import gzip
 import numpy as np
 
 
 valid_date = os.environ['VDATE'] 
-vhr = os.environ['vhr']
+vhrs = re.split(r'[\s,]+', os.environ['vhr'].strip())
 
 YYYY = int(valid_date[0:4])
 MM   = int(valid_date[4:6])
 DD   = int(valid_date[6:8])
-HH   = int(vhr)
 
-valid = datetime.datetime(YYYY,MM,DD,HH,0,0)
+valids = [datetime.datetime(YYYY,MM,DD,int(vhr),0,0) for vhr in vhrs]
+
+
+# Return the gzipped MRMS files in a product directory whose names start
+# with file_prefix, as sorted lists of their timestamps and names
+def get_mrms_file_index(prod_dir, file_prefix):
+    file_index = []
+    if os.path.isdir(prod_dir):
+        with os.scandir(prod_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.startswith(file_prefix) \
+                        and dir_entry.name.endswith('.gz'):
+                    try:
+                        file_index.append((
+                            datetime.datetime.strptime(dir_entry.name[-24:-9],
+                                                       '%Y%m%d-%H%M%S'),
+                            dir_entry.name
+                        ))
+                    except ValueError:
+                        continue
+    file_index.sort()
+    return [x[0] for x in file_index], [x[1] for x in file_index]
 
 
 domains = ['conus','alaska']
@@ -47,8 +70,6 @@ for domain in domains:
 
     for MRMS_PRODUCT in MRMS_PRODUCTS:
 
-        print('Copying and unzipping '+valid.strftime('%Y%m%d%H')+' MRMS '+MRMS_PRODUCT+' data')
-
         if MRMS_PRODUCT == 'MergedReflectivityQCComposite':
             level = '_00.50_'
         elif MRMS_PRODUCT == 'MergedReflectivityQComposite':
@@ -65,31 +86,39 @@ for domain in domains:
             output_file_head = MRMS_PRODUCT
 
 
-        # Sort list of files for each MRMS product
-        search_path = MRMS_PROD_DIR+'/'+MRMS_PRODUCT+'/'+input_file_head+'*.gz'
-        file_list = [f for f in glob.glob(search_path)]
-        time_list = [file_list[x][-24:-9] for x in range(len(file_list))]
-        int_list = [int(time_list[x][0:8]+time_list[x][9:15]) for x in range(len(time_list))]
-        int_list.sort()
-        datetime_list = [datetime.datetime.strptime(str(x),"%Y%m%d%H%M%S") for x in int_list]
- 
-        # Find the MRMS file closest to the valid time
-        i = bisect.bisect_left(datetime_list,valid)
-        closest_timestamp = min(datetime_list[max(0, i-1): i+2], key=lambda date: abs(valid - date))
+        # Sorted list of files for each MRMS product, used for all valid hours
+        datetime_list, filename_list = get_mrms_file_index(
+            MRMS_PROD_DIR+'/'+MRMS_PRODUCT, input_file_head+level
+        )
+
+        for valid in valids:
+
+            print('Copying and unzipping '+valid.strftime('%Y%m%d%H')+' MRMS '+MRMS_PRODUCT+' data')
 
-        # Check to make sure closest file is within +/- 15 mins of top of the hour
-        # Copy and rename the file for future ease
-        difference = abs(closest_timestamp - valid)
-        if difference.total_seconds() <= 900:
+            # Find the MRMS file closest to the valid time
+            i = bisect.bisect_left(datetime_list,valid)
+            closest_i = min(range(max(0, i-1), min(len(datetime_list), i+1)),
+                            key=lambda x: abs(valid - datetime_list[x]),
+                            default=None)
 
-            filename1 = input_file_head+level+closest_timestamp.strftime('%Y%m%d-%H%M%S')+'.grib2.gz'
-            filename2 = output_file_head+level+valid.strftime('%Y%m%d-%H')+'0000.grib2.gz'
+            # Check to make sure closest file is within +/- 15 mins of top of the hour
+            # Unzip the file straight to its new name for future ease
+            if closest_i is not None \
+                    and abs(datetime_list[closest_i] - valid).total_seconds() <= 900:
 
-            os.system('cp '+MRMS_PROD_DIR+'/'+MRMS_PRODUCT+'/'+filename1+' '+TMP_DIR+'/'+filename2)
-            os.system('gunzip '+TMP_DIR+'/'+filename2)
-        else:
-            print('No '+MRMS_PRODUCT+' file found within 15 minutes of '+valid.strftime('%HZ %m/%d/%Y')+'. Skipping this time.')
+                filename1 = filename_list[closest_i]
+                filename2 = output_file_head+level+valid.strftime('%Y%m%d-%H')+'0000.grib2'
 
+                try:
+                    with gzip.open(MRMS_PROD_DIR+'/'+MRMS_PRODUCT+'/'+filename1, 'rb') as f_in, \
+                            open(TMP_DIR+'/'+filename2, 'wb') as f_out:
+                        shutil.copyfileobj(f_in, f_out, 1024*1024)
+                except (OSError, EOFError) as e:
+                    print('WARNING: Could not unzip '+MRMS_PROD_DIR+'/'+MRMS_PRODUCT+'/'+filename1+': '+str(e))
+                    if os.path.exists(TMP_DIR+'/'+filename2):
+                        os.remove(TMP_DIR+'/'+filename2)
+            else:
+                print('No '+MRMS_PRODUCT+' file found within 15 minutes of '+valid.strftime('%HZ %m/%d/%Y')+'. Skipping this time.')
 
 
 exit()
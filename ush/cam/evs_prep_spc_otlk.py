@@ -13,7 +13,6 @@ import sys, os, shutil, subprocess
 import datetime
 import re, csv, glob
 import bisect
-import numpy as np
 import cam_util as cutil
 
 
@@ -85,32 +84,21 @@ for DAY in range(1,4):
             SHP_FILE = f'day{DAY}otlk_{OTLK_DATE}_{OTLK}_cat' 
             os.environ['SHP_FILE'] = SHP_FILE
 
-            # Check the number of records in the shapefile
-            if os.path.isfile(os.path.join(OTLK_DIR,f'{SHP_FILE}.dbf')):
-                N_REC = cutil.run_shell_command([
-                        'gis_dump_dbf', 
-                        os.path.join(OTLK_DIR,f'{SHP_FILE}.dbf'), 
-                        '|', 'grep', 'n_records', 
-                        '|', 'cut', '-d\'=\'', '-f2', 
-                        '|', 'tr', '-d', '\' \''], 
-                        capture_output=True)
+            # Read the record names in the shapefile
+            if os.path.isfile(os.path.join(OTLK_DIR,f'{SHP_FILE}.dbf')) \
+                    and os.path.isfile(os.path.join(OTLK_DIR,f'{SHP_FILE}.shp')):
+                RECORDS = cutil.get_shapefile_record_names(
+                    os.path.join(OTLK_DIR,f'{SHP_FILE}.shp')
+                )
             else:
-                N_REC = 0
+                RECORDS = []
 
             # Process each record in the shapefile 
-            if int(N_REC) > 0:
-                print(f'Processing {N_REC} records.')
-                for REC in np.arange(int(N_REC)):
+            if len(RECORDS) > 0:
+                print(f'Processing {len(RECORDS)} records.')
+                for REC, NAME in RECORDS:
                     for VERIF_GRID in VERIF_GRIDS:
  
-                        NAME = cutil.run_shell_command([
-                               'gis_dump_dbf', 
-                               os.path.join(OTLK_DIR,f'{SHP_FILE}.dbf'),
-                               '|', 'egrep', '-A', '5', f'"^Record {REC}"',
-                               '|', 'tail','-1',
-                               '|', 'cut', '-d\'"\'', '-f2'],
-                               capture_output=True)
-                        NAME = NAME.replace('\n','')
                         regexp="^[^:. ()]*$"
                         if not re.match(regexp, NAME):
                             print(f'NOTE: Record name ({NAME}) '
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+###############################################################################
+#
+# Name:          plot_server.py
+# Contact(s):    Marcel Caron
+# Title:         Long-lived plotting process
+# Abstract:      Renders many plot requests in one Python process so that
+#                matplotlib, pandas, settings.py, logo images, and
+#                preprocessed dataframes are loaded once rather than once
+#                per plot.  Each request names a plotting script in USH_DIR
+#                (e.g., lead_average.py) and the environment variables that
+#                script normally reads, so the scripts themselves are
+#                unchanged.  Two modes are available:
+#
+#                python plot_server.py MANIFEST
+#                    Render every request in a JSON (or YAML) manifest, in
+#                    sequence or across PLOT_SERVER_NPROC worker processes.
+#                    The manifest looks like
+#                    {"env": {...shared...},
+#                     "requests": [{"script": "lead_average.py",
+#                                   "env": {...}}, ...]}
+#
+#                python plot_server.py --socket PATH
+#                    Serve requests sent by plot_client.py over a UNIX socket
+#                    until a client sends --shutdown.
+#
+###############################################################################
+
+import os
+import sys
+import io
+import json
+import runpy
+import socket
+import logging
+import traceback
+import contextlib
+import multiprocessing
+try:
+    import yaml
+except ImportError:
+    yaml = None
+# Everything the plotting scripts import is loaded once here and reused by
+# every request
+import matplotlib
+matplotlib.use('agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+SETTINGS_DIR = os.environ['USH_DIR']
+sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
+import settings
+import plotter
+import plot_util
+import df_preprocessing
+import check_variables
+
+# Number of preprocessed dataframes each process keeps in memory
+PREPROCESSED_DATA_CACHE_SIZE = 32
+
+
+# =================== FUNCTIONS =========================
+
+def read_plot_manifest(manifest):
+    with open(manifest, 'r') as mf:
+        if manifest.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError(
+                    f"PyYAML is required to read {manifest}"
+                )
+            manifest_dict = yaml.safe_load(mf)
+        else:
+            manifest_dict = json.load(mf)
+    shared_env = {
+        str(k): str(v) for k, v in manifest_dict.get('env', {}).items()
+    }
+    plot_requests = []
+    for plot_request in manifest_dict['requests']:
+        env = dict(shared_env)
+        env.update({
+            str(k): str(v) for k, v in plot_request.get('env', {}).items()
+        })
+        plot_requests.append({
+            'script': plot_request['script'],
+            'env': env,
+            'cwd': plot_request.get('cwd', os.getcwd()),
+        })
+    return plot_requests
+
+def render_plot_request(plot_request, base_env=None):
+    """! Run one plotting script in this process
+
+         Args:
+            plot_request - dict with the script name, the environment
+                           variables the script reads, and optionally the
+                           working directory
+            base_env     - dict of environment variables underlying the
+                           request's own; if None, the request's 'env'
+                           replaces the whole environment
+         Returns:
+            returncode   - 0 on success, otherwise the script's exit code
+            output       - string of everything the script printed
+    """
+    script = plot_request['script']
+    if not os.path.isabs(script):
+        script = os.path.join(os.path.abspath(SETTINGS_DIR), script)
+    saved_env = dict(os.environ)
+    saved_path = list(sys.path)
+    saved_cwd = os.getcwd()
+    saved_loggers = set(logging.root.manager.loggerDict)
+    output = io.StringIO()
+    returncode = 0
+    os.environ.clear()
+    if base_env is not None:
+        os.environ.update(base_env)
+    os.environ.update(plot_request['env'])
+    try:
+        os.chdir(plot_request.get('cwd', saved_cwd))
+        with contextlib.redirect_stdout(output), \
+                contextlib.redirect_stderr(output), \
+                matplotlib.rc_context():
+            try:
+                runpy.run_path(script, run_name='__main__')
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    returncode = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                returncode = 1
+    finally:
+        plt.close('all')
+        # Plotting scripts attach a file handler to a new logger on every
+        # run; close them so log files are flushed and not left open
+        for logger_name in (
+                set(logging.root.manager.loggerDict) - saved_loggers):
+            logger = logging.getLogger(logger_name)
+            for handler in list(logger.handlers):
+                handler.close()
+                logger.removeHandler(handler)
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        os.environ.clear()
+        os.environ.update(saved_env)
+    return returncode, output.getvalue()
+
+def render_manifest_request(plot_request):
+    returncode, output = render_plot_request(
+        plot_request, base_env=dict(os.environ)
+    )
+    return plot_request['script'], returncode, output
+
+def run_manifest(manifest, nproc):
+    plot_requests = read_plot_manifest(manifest)
+    print(f"Rendering {len(plot_requests)} plot requests from {manifest}"
+          + f" with {nproc} process(es)")
+    if nproc > 1:
+        # Workers are forked after the imports above, so each starts warm
+        with multiprocessing.get_context('fork').Pool(nproc) as pool:
+            results = list(pool.imap(render_manifest_request, plot_requests))
+    else:
+        results = [
+            render_manifest_request(plot_request)
+            for plot_request in plot_requests
+        ]
+    nfailed = 0
+    for script, returncode, output in results:
+        sys.stdout.write(output)
+        if returncode != 0:
+            nfailed+=1
+            print(f"ERROR: {script} exited with code {returncode}")
+    print(f"Rendered {len(results)-nfailed} of {len(results)} plot requests")
+    return 1 if nfailed else 0
+
+def serve(socket_path):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Bind under a temporary name so socket_path only appears once the
+    # server is listening; the ex-script waits for it before exporting
+    # PLOT_SERVER_SOCKET
+    server.bind(socket_path+'.tmp')
+    server.listen()
+    os.rename(socket_path+'.tmp', socket_path)
+    print(f"Plot server listening on {socket_path}")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile('rwb') as stream:
+                plot_request = json.loads(stream.readline())
+                if plot_request.get('shutdown'):
+                    stream.write(b'{"returncode": 0, "output": ""}\n')
+                    stream.flush()
+                    break
+                returncode, output = render_plot_request(plot_request)
+                print(f"{plot_request['script']} exited with code"
+                      + f" {returncode}")
+                stream.write(json.dumps({
+                    'returncode': returncode, 'output': output
+                }).encode('utf-8') + b'\n')
+                stream.flush()
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    print("Plot server shut down")
+    return 0
+
+def main(argv):
+    df_preprocessing.set_preprocessed_data_cache_size(
+        PREPROCESSED_DATA_CACHE_SIZE
+    )
+    if len(argv) == 2 and argv[0] == '--socket':
+        return serve(argv[1])
+    if len(argv) == 1:
+        nproc = int(os.environ.get('PLOT_SERVER_NPROC', '1'))
+        return run_manifest(argv[0], nproc)
+    print("Usage: plot_server.py MANIFEST | plot_server.py --socket PATH")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
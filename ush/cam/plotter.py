@@ -7,12 +7,20 @@
 #
 # =============================================================================
 
+import functools
 import matplotlib.pyplot as plt
+import matplotlib.image as mpimg
 from matplotlib.collections import PatchCollection
 from matplotlib.patches import Rectangle, PathPatch
 from matplotlib.path import Path
 import numpy as np
 
+@functools.lru_cache(maxsize=None)
+def read_logo(path_logo):
+    # Logos are read once per process, which matters when one process
+    # renders many plots (see plot_server.py)
+    return mpimg.imread(path_logo)
+
 class Plotter():
     def __init__(self, font_weight='bold',  axis_title_weight='bold',  
                 axis_title_size=15,         axis_offset=False,
@@ -754,7 +754,8 @@ elif STEP == 'plots' :
                 )
             if not os.path.exists(dest_model_date_stat_file):
                 if gda_util.check_file_exists_size(
-                        source_model_date_stat_file
+                        source_model_date_stat_file,
+                        use_path_index=True
                 ):
                     print("Linking "+source_model_date_stat_file+" to "
                           +dest_model_date_stat_file)
@@ -835,7 +836,8 @@ elif STEP == 'plots' :
                 )
                 if not os.path.exists(dest_model_fhr_pcp_combine_file):
                     if gda_util.check_file_exists_size(
-                            source_model_fhr_pcp_combine_file
+                            source_model_fhr_pcp_combine_file,
+                            use_path_index=True
                     ):
                         print("Linking "+source_model_fhr_pcp_combine_file+" "
                               +"to "+dest_model_fhr_pcp_combine_file)
@@ -873,4 +875,7 @@ elif STEP == 'plots' :
                 os.symlink(source_nohrsc_file,
                            dest_nohrsc_file)
 
+print(f"Path index: {gda_util.path_index_count_dict['hits']} hits, "
+      +f"{gda_util.path_index_count_dict['misses']} misses")
+
 print("END: "+os.path.basename(__file__))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+'''
+Name: global_det_atmos_plots_base_map.py
+Contact(s): Mallory Row (mallory.row@noaa.gov)
+Abstract: This script keeps the static layers of spatial map graphics
+          (figure, logos, map projection and map features) in memory.
+          They are drawn once per projection, extent, and feature set,
+          and each map after that only draws its own data. Grid
+          coordinates are projected once per grid and projection and
+          kept in .npy files, so data is contoured in map coordinates.
+'''
+
+import os
+import functools
+import hashlib
+import numpy as np
+import matplotlib
+import matplotlib.image
+import matplotlib.gridspec as gridspec
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+
+# Map features drawn over the data: (feature name, scale)
+default_feature_list = [('coastline', '50m'), ('borders', '50m'),
+                        ('states', '50m')]
+cartopy_feature_dict = {
+    'coastline': cfeature.COASTLINE,
+    'borders': cfeature.BORDERS,
+    'states': cfeature.STATES,
+    'lakes': cfeature.LAKES,
+    'land': cfeature.LAND,
+    'ocean': cfeature.OCEAN
+}
+base_map_dict = {}
+projected_grid_dict = {}
+
+@functools.lru_cache(maxsize=None)
+def get_logo_image(logo_path):
+    """! Read a logo image once
+
+         Args:
+             logo_path - path to logo image (string)
+
+         Returns:
+             logo_img_array - logo image (array)
+    """
+    return matplotlib.image.imread(logo_path)
+
+@functools.lru_cache(maxsize=None)
+def get_colormap_norm(colorlist, clevs, cmap_over_color):
+    """! Make the colormap and norm for a set of contour levels once
+
+         Args:
+             colorlist       - contour colors (tuple of strings)
+             clevs           - contour levels (tuple of floats)
+             cmap_over_color - color above the last level (string)
+
+         Returns:
+             cmap - colormap (ListedColormap)
+             norm - norm for cmap (BoundaryNorm)
+    """
+    cmap = matplotlib.colors.ListedColormap(list(colorlist))
+    cmap.set_over(cmap_over_color)
+    norm = matplotlib.colors.BoundaryNorm(list(clevs), cmap.N)
+    return cmap, norm
+
+def get_projected_grid(lon, lat, proj, central_lon, map_bounds,
+                       grid_cache_dir=None):
+    """! Get the map projection coordinates of the part of a grid
+         that covers the map, projecting them once per grid and
+         projection
+
+         Args:
+             lon            - grid longitudes (2D array)
+             lat            - grid latitudes (2D array)
+             proj           - map projection (cartopy projection)
+             central_lon    - projection central longitude (float)
+             map_bounds     - longitude (relative to central_lon) and
+                              latitude bounds of the map
+                              (list of floats)
+             grid_cache_dir - directory to keep projected grid
+                              .npy files in (string or None)
+
+         Returns:
+             projected_grid - x and y projection coordinates
+                              (2D arrays) and the grid slices they
+                              are for (tuple of slices), or None if
+                              that part of the grid crosses the edge
+                              of the projection
+    """
+    lon = np.ma.getdata(lon).astype(np.float64)
+    lat = np.ma.getdata(lat).astype(np.float64)
+    grid_hash = hashlib.sha1(lon.tobytes())
+    grid_hash.update(lat.tobytes())
+    grid_hash.update(
+        f"{lon.shape}{proj.proj4_init}{list(map_bounds)}".encode('utf-8')
+    )
+    grid_key = grid_hash.hexdigest()
+    if grid_key in projected_grid_dict:
+        return projected_grid_dict[grid_key]
+    projected_grid = None
+    # Longitudes relative to the projection central longitude
+    dlon = ((lon - central_lon + 180.) % 360.) - 180.
+    on_map = ((dlon >= map_bounds[0] - 2.) & (dlon <= map_bounds[1] + 2.)
+              & (lat >= map_bounds[2] - 2.) & (lat <= map_bounds[3] + 2.))
+    if lon.ndim == 2 and on_map.any():
+        on_map_rows = np.flatnonzero(on_map.any(axis=1))
+        on_map_cols = np.flatnonzero(on_map.any(axis=0))
+        grid_crop = (slice(on_map_rows[0], on_map_rows[-1]+1),
+                     slice(on_map_cols[0], on_map_cols[-1]+1))
+        if np.abs(dlon[grid_crop]).max() < 150.:
+            if grid_cache_dir is not None:
+                grid_cache_file = os.path.join(
+                    grid_cache_dir, f"projected_grid_{grid_key}.npy"
+                )
+            else:
+                grid_cache_file = None
+            if grid_cache_file is not None \
+                    and os.path.exists(grid_cache_file):
+                xy = np.load(grid_cache_file, mmap_mode='r')
+            else:
+                xyz = proj.transform_points(ccrs.PlateCarree(),
+                                            lon[grid_crop], lat[grid_crop])
+                xy = np.stack([xyz[:,:,0], xyz[:,:,1]])
+                if not np.isfinite(xy).all():
+                    xy = None
+                elif grid_cache_file is not None:
+                    if not os.path.exists(grid_cache_dir):
+                        os.makedirs(grid_cache_dir, exist_ok=True)
+                    # Write to a temporary file first so other jobs
+                    # never read a partial file
+                    tmp_grid_cache_file = (
+                        grid_cache_file.replace('.npy', f".{os.getpid()}.npy")
+                    )
+                    np.save(tmp_grid_cache_file, xy)
+                    os.replace(tmp_grid_cache_file, grid_cache_file)
+                    xy = np.load(grid_cache_file, mmap_mode='r')
+            if xy is not None:
+                projected_grid = (xy[0], xy[1], grid_crop)
+    projected_grid_dict[grid_key] = projected_grid
+    return projected_grid
+
+def get_base_map(fig_size, extent, central_lon, central_lat, logo_list,
+                 feature_list=default_feature_list):
+    """! Get the base map for a projection, extent, and feature set,
+         making it on first use
+
+         Args:
+             fig_size     - figure size (tuple of floats)
+             extent       - map extent, lon/lat (list of floats)
+             central_lon  - projection central longitude (float)
+             central_lat  - projection central latitude (float)
+             logo_list    - logos to put on the figure
+                            (list of tuples of path, x pixel location,
+                             y pixel location, alpha)
+             feature_list - map features to draw
+                            (list of tuples of feature name, scale)
+
+         Returns:
+             base_map - base map (BaseMap)
+    """
+    base_map_key = (tuple(fig_size), tuple(extent), central_lon,
+                    central_lat, tuple(logo_list), tuple(feature_list))
+    if base_map_key not in base_map_dict:
+        base_map_dict[base_map_key] = BaseMap(
+            fig_size, extent, central_lon, central_lat, logo_list,
+            feature_list
+        )
+    return base_map_dict[base_map_key]
+
+class BaseMap:
+    """
+    Keep the static layers of a spatial map graphic
+    """
+
+    def __init__(self, fig_size, extent, central_lon, central_lat,
+                 logo_list, feature_list):
+        """! Initalize BaseMap class, drawing the static layers
+
+             Args:
+                 fig_size     - figure size (tuple of floats)
+                 extent       - map extent, lon/lat (list of floats)
+                 central_lon  - projection central longitude (float)
+                 central_lat  - projection central latitude (float)
+                 logo_list    - logos to put on the figure
+                                (list of tuples of path, x pixel location,
+                                 y pixel location, alpha)
+                 feature_list - map features to draw
+                                (list of tuples of feature name, scale)
+
+             Returns:
+        """
+        self.central_lon = central_lon
+        self.fig = Figure(figsize=fig_size)
+        FigureCanvasAgg(self.fig)
+        self.gs = gridspec.GridSpec(1,1, bottom=0.125, top=0.85,
+                                    hspace=0, wspace=0)
+        under_artist_list = [self.fig.patch]
+        for logo_path, logo_xpixel_loc, logo_ypixel_loc, logo_alpha \
+                in logo_list:
+            under_artist_list.append(self.fig.figimage(
+                get_logo_image(logo_path), logo_xpixel_loc, logo_ypixel_loc,
+                zorder=1, alpha=logo_alpha
+            ))
+        self.proj = ccrs.LambertConformal(central_longitude=central_lon,
+                                          central_latitude=central_lat,
+                                          false_easting=0.0,
+                                          false_northing=0.0,
+                                          globe=None)
+        self.ax = self.fig.add_subplot(self.gs[0], projection=self.proj)
+        self.ax.set_extent(extent)
+        # Longitude (relative to central_lon) and latitude bounds of
+        # the map, from points along its edges
+        x0, x1, y0, y1 = self.ax.get_extent()
+        edge_frac = np.linspace(0., 1., 101)
+        edge_x = np.concatenate([x0 + (x1-x0)*edge_frac, np.full(101, x1),
+                                 x1 - (x1-x0)*edge_frac, np.full(101, x0)])
+        edge_y = np.concatenate([np.full(101, y0), y0 + (y1-y0)*edge_frac,
+                                 np.full(101, y1), y1 - (y1-y0)*edge_frac])
+        edge_lonlat = ccrs.PlateCarree().transform_points(self.proj,
+                                                          edge_x, edge_y)
+        edge_dlon = ((edge_lonlat[:,0] - central_lon + 180.) % 360.) - 180.
+        self.map_bounds = [edge_dlon.min(), edge_dlon.max(),
+                           edge_lonlat[:,1].min(), edge_lonlat[:,1].max()]
+        under_artist_list.append(self.ax.patch)
+        over_artist_list = list(self.ax.spines.values())
+        for feature_name, feature_scale in feature_list:
+            over_artist_list.append(self.ax.add_feature(
+                cartopy_feature_dict[feature_name].with_scale(feature_scale),
+                zorder=2, linewidth=1
+            ))
+        self.title = self.fig.suptitle('')
+        # Draw what goes under the data, then what goes over it
+        # on a transparent figure
+        for artist in over_artist_list:
+            artist.set_visible(False)
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in over_artist_list:
+            artist.set_visible(True)
+        for artist in under_artist_list:
+            artist.set_visible(False)
+        self.fig.canvas.draw()
+        overlay = (np.asarray(self.fig.canvas.buffer_rgba())
+                   .astype(np.float32) / 255.)
+        self.overlay_alpha = overlay[:,:,3:]
+        self.overlay_rgb = overlay[:,:,:3] * self.overlay_alpha
+        for artist in under_artist_list:
+            artist.set_visible(True)
+
+    def set_title(self, plot_title):
+        """! Set the figure title for the next map
+
+             Args:
+                 plot_title - figure title (string)
+
+             Returns:
+        """
+        self.title.set_text(plot_title)
+
+    def contourf(self, lon, lat, data, grid_cache_dir=None, **kwargs):
+        """! Fill contour data on the map, in map projection
+             coordinates when the grid can be projected
+
+             Args:
+                 lon            - grid longitudes (2D array)
+                 lat            - grid latitudes (2D array)
+                 data           - data to contour (2D array)
+                 grid_cache_dir - directory to keep projected grid
+                                  .npy files in (string or None)
+                 **kwargs       - contourf keyword arguments
+
+             Returns:
+                 CF - filled contours (QuadContourSet)
+        """
+        projected_grid = get_projected_grid(
+            lon, lat, self.proj, self.central_lon, self.map_bounds,
+            grid_cache_dir=grid_cache_dir
+        )
+        if projected_grid is None:
+            return self.ax.contourf(lon, lat, data,
+                                    transform=ccrs.PlateCarree(), **kwargs)
+        x, y, grid_crop = projected_grid
+        return self.ax.contourf(x, y, data[grid_crop],
+                                transform=self.ax.transData, **kwargs)
+
+    def save(self, image_name, data_artist_list):
+        """! Draw the data over the static layers, save the image,
+             and then remove the data
+
+             Args:
+                 image_name       - path to save image as (string)
+                 data_artist_list - artists of this map's data, like
+                                    contours and colorbar axes (list)
+
+             Returns:
+        """
+        self.fig.canvas.restore_region(self.background)
+        for data_artist in data_artist_list:
+            if isinstance(data_artist, matplotlib.artist.Artist):
+                self.fig.draw_artist(data_artist)
+            else:
+                for collection in data_artist.collections:
+                    self.fig.draw_artist(collection)
+        self.fig.draw_artist(self.title)
+        image = (np.asarray(self.fig.canvas.buffer_rgba())
+                 .astype(np.float32) / 255.)
+        image[:,:,:3] = (self.overlay_rgb
+                         + (image[:,:,:3] * (1. - self.overlay_alpha)))
+        matplotlib.image.imsave(
+            image_name, np.round(image * 255.).astype(np.uint8),
+            dpi=self.fig.dpi
+        )
+        # Remove the colorbar axes before the data they belong to
+        for data_artist in data_artist_list[::-1]:
+            data_artist.remove()
@@ -10,11 +10,9 @@ Run By: scripts/plots/global_det/exevs_global_det_atmos_grid2obs_plots.sh
 
 import sys
 import os
-import glob
 import datetime
 import itertools
 import numpy as np
-import subprocess
 import copy
 import global_det_atmos_util as gda_util
 
@@ -924,65 +922,4 @@ for verif_type in VERIF_CASE_STEP_type_list:
                 job.write('export err=$?; err_chk'+'\n')
                 job.close()
 
-# If running USE_CFP, create POE scripts
-if USE_CFP == 'YES':
-    job_files = glob.glob(os.path.join(JOB_GROUP_jobs_dir, 'job*'))
-    njob_files = len(job_files)
-    if njob_files == 0:
-        print("NOTE: No job files created in "+JOB_GROUP_jobs_dir)
-    poe_files = glob.glob(os.path.join(JOB_GROUP_jobs_dir, 'poe*'))
-    npoe_files = len(poe_files)
-    if npoe_files > 0:
-        for poe_file in poe_files:
-            os.remove(poe_file)
-    njob, iproc, node = 1, 0, 1
-    while njob <= njob_files:
-        job = 'job'+str(njob)
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            if iproc >= int(nproc):
-                poe_file.close()
-                iproc = 0
-                node+=1
-        poe_filename = os.path.join(JOB_GROUP_jobs_dir,
-                                    'poe_jobs'+str(node))
-        poe_file = open(poe_filename, 'a')
-        iproc+=1
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            poe_file.write(
-                str(iproc-1)+' '
-                +os.path.join(JOB_GROUP_jobs_dir,job)+'\n'
-            )
-        else:
-            poe_file.write(
-                os.path.join(JOB_GROUP_jobs_dir, job)+'\n'
-            )
-        poe_file.close()
-        njob+=1
-    # If at final record and have not reached the
-    # final processor then write echo's to
-    # poe script for remaining processors
-    poe_filename = os.path.join(JOB_GROUP_jobs_dir,
-                                f"poe_jobs{str(node)}")
-    poe_file = open(poe_filename, 'a')
-    if machine == 'WCOSS2':
-        nselect = subprocess.run(
-            f"cat {PBS_NODEFILE} | wc -l",
-            shell=True, capture_output=True, encoding="utf8"
-        ).stdout.replace('\n', '')
-        nnp = int(nselect) * int(nproc)
-    else:
-        nnp = nproc
-    iproc+=1
-    while iproc <= int(nnp):
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            poe_file.write(
-                f"{str(iproc-1)} /bin/echo {str(iproc)}\n"
-            )
-        else:
-            poe_file.write(
-                f"/bin/echo {str(iproc)}\n"
-            )
-        iproc+=1
-    poe_file.close()
-
 print("END: "+os.path.basename(__file__))
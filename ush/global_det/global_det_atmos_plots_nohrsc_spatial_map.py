@@ -13,18 +13,16 @@ import numpy as np
 import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import os
 import logging
 import sys
 import datetime
 import subprocess
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 from cartopy.mpl.ticker import LongitudeFormatter, LatitudeFormatter
 from cartopy import config
 import global_det_atmos_util as gda_util
 from global_det_atmos_plots_specs import PlotSpecs
+from global_det_atmos_plots_base_map import get_base_map, get_colormap_norm
 
 class NOHRSCSpatialMap:
     """
@@ -77,16 +75,16 @@ class NOHRSCSpatialMap:
                         '#092694', '#fffc96', '#ffc400', '#ff8700', '#db1f00',
                         '#9d1300', '#690900', '#360200', '#ccccff', '#9f8cd8',
                         '#7c52a5', '#561c72']
-        cmap_under_color_in = '#ffffff'
         cmap_over_color_in = '#2e0533'
         clevs_m = [0.1, 0.5, 1, 2, 3, 4, 5, 10, 15, 20, 25, 35, 50]
         colorlist_m = ['#a8e7e9', '#70e4ea', '#69b5d5', '#669ce5', '#5065d0',
                         '#4739ce', '#561ec1', '#7300be', '#b705c6', '#970983',
                         '#a01c60', '#c03b60', '#924b4a']
-        cmap_under_color_m = '#ffffff'
         cmap_over_color_m = '#5d2c2e'
         # Set Cartopy shapefile location
         config['data_dir'] = config['repo_data_dir']
+        # Set where to keep grids projected to map coordinates
+        grid_cache_dir = os.path.join(self.input_dir, 'projected_grids')
         # Convert NOHRSC grib2 to netCDF and read in data
         self.logger.info(f"Reading in NOHRSC file from {self.input_dir}")
         nohrsc_grib2_file = os.path.join(
@@ -167,68 +165,30 @@ class NOHRSCSpatialMap:
                 .strftime('%d%b%Y %H')+'Z to '
                 +valid_date_dt.strftime('%d%b%Y %H')+'Z'
             )
-            plot_left_logo_path = os.path.join(self.logo_dir, 'noaa.png')
-            if os.path.exists(plot_left_logo_path):
-                plot_left_logo = True
-                left_logo_img_array = matplotlib.image.imread(
-                    plot_left_logo_path
-                )
-                left_logo_xpixel_loc,left_logo_ypixel_loc,left_logo_alpha = (
-                    plot_specs_nsm.get_logo_location(
-                        'left', plot_specs_nsm.fig_size[0],
-                         plot_specs_nsm.fig_size[1],
-                         plt.rcParams['figure.dpi']
-                    )
-                )
-            else:
-                plot_left_logo = False
-                self.logger.debug(f"{plot_left_logo_path} does not exist")
-            plot_right_logo_path = os.path.join(self.logo_dir, 'nws.png')
-            if os.path.exists(plot_right_logo_path):
-                plot_right_logo = True
-                right_logo_img_array = matplotlib.image.imread(
-                    plot_right_logo_path
-                )
-                right_logo_xpixel_loc,right_logo_ypixel_loc,right_logo_alpha = (
-                    plot_specs_nsm.get_logo_location(
-                        'right', plot_specs_nsm.fig_size[0],
-                        plot_specs_nsm.fig_size[1],
-                        plt.rcParams['figure.dpi']
+            logo_list = []
+            for logo_position, logo_name in [('left', 'noaa.png'),
+                                             ('right', 'nws.png')]:
+                logo_path = os.path.join(self.logo_dir, logo_name)
+                if os.path.exists(logo_path):
+                    logo_list.append(
+                        (logo_path,)
+                        + plot_specs_nsm.get_logo_location(
+                            logo_position, plot_specs_nsm.fig_size[0],
+                            plot_specs_nsm.fig_size[1],
+                            plt.rcParams['figure.dpi']
+                        )
                     )
-                )
-            else:
-                plot_right_logo = False
-                self.logger.debug(f"{plot_right_logo_path} does not exist")
+                else:
+                    self.logger.debug(f"{logo_path} does not exist")
             if var_units == 'inches':
                 clevs = clevs_in
-                cmap = matplotlib.colors.ListedColormap(colorlist_in)
-                cmap_under_color = cmap_under_color_in
-                cmap_over_color = cmap_over_color_in
+                cmap, norm = get_colormap_norm(
+                    tuple(colorlist_in), tuple(clevs_in), cmap_over_color_in
+                )
             elif var_units == 'm':
                 clevs = clevs_m
-                cmap = matplotlib.colors.ListedColormap(colorlist_m)
-                cmap_under_color = cmap_under_color_m
-                cmap_over_color = cmap_over_color_m
-            norm = matplotlib.colors.BoundaryNorm(clevs, cmap.N)
-            # Make plot
-            self.logger.info(f"Making plot")
-            fig = plt.figure(figsize=(plot_specs_nsm.fig_size[0],
-                                      plot_specs_nsm.fig_size[1]))
-            gs_hspace, gs_wspace = 0, 0
-            gs_bottom, gs_top = 0.125, 0.85
-            gs = gridspec.GridSpec(1,1, bottom=gs_bottom, top=gs_top,
-                                   hspace=gs_hspace, wspace=gs_wspace)
-            fig.suptitle(plot_title)
-            if plot_left_logo:
-                left_logo_img = fig.figimage(
-                    left_logo_img_array, left_logo_xpixel_loc,
-                    left_logo_ypixel_loc, zorder=1, alpha=right_logo_alpha
-                )
-                left_logo_img.set_visible(True)
-            if plot_right_logo:
-                right_logo_img = fig.figimage(
-                    right_logo_img_array, right_logo_xpixel_loc,
-                    right_logo_ypixel_loc, zorder=1, alpha=right_logo_alpha
+                cmap, norm = get_colormap_norm(
+                    tuple(colorlist_m), tuple(clevs_m), cmap_over_color_m
                 )
             if self.plot_info_dict['vx_mask'] == 'conus':
                 extent = [-124,-70,18.0,50.0]
@@ -238,25 +198,17 @@ class NOHRSCSpatialMap:
                 extent = [-180,-110,45.0,75.0]
                 central_lon = -145
                 central_lat = 60
-            myproj=ccrs.LambertConformal(central_longitude=central_lon,
-                                         central_latitude=central_lat,
-                                         false_easting=0.0,
-                                         false_northing=0.0,
-                                         globe=None)
-            ax1 = fig.add_subplot(gs[0], projection=myproj)
-            ax1.set_extent(extent)
-            ax1.add_feature(cfeature.COASTLINE.with_scale('50m'),
-                            zorder=2, linewidth=1)
-            ax1.add_feature(cfeature.BORDERS.with_scale('50m'),
-                            zorder=2, linewidth=1)
-            ax1.add_feature(cfeature.STATES.with_scale('50m'),
-                            zorder=2, linewidth=1)
-            CF1 = ax1.contourf(x, y, nohrsc_ASNOW_surface,
-                               transform=ccrs.PlateCarree(),
-                               levels=clevs, norm=norm,
-                               cmap=cmap, extend='max')
-            CF1.cmap.set_over(cmap_under_color)
-            CF1.cmap.set_over(cmap_over_color)
+            # Make plot, reusing the map features already drawn
+            # for this region
+            self.logger.info(f"Making plot")
+            base_map = get_base_map(plot_specs_nsm.fig_size, extent,
+                                    central_lon, central_lat, logo_list)
+            fig, gs = base_map.fig, base_map.gs
+            base_map.set_title(plot_title)
+            CF1 = base_map.contourf(x, y, nohrsc_ASNOW_surface,
+                                    grid_cache_dir=grid_cache_dir,
+                                    levels=clevs, norm=norm,
+                                    cmap=cmap, extend='max')
             cbar_left = gs.get_grid_positions(fig)[2][0]
             cbar_width = (gs.get_grid_positions(fig)[3][-1]
                           - gs.get_grid_positions(fig)[2][0])
@@ -283,9 +235,7 @@ class NOHRSCSpatialMap:
                     )
             cbar.ax.set_xticklabels(cbar_tick_labels_list)
             self.logger.info(f"Saving image as {DATA_png_name}")
-            plt.savefig(DATA_png_name)
-            plt.clf()
-            plt.close('all')
+            base_map.save(DATA_png_name, [CF1, cbar_ax])
             gda_util.copy_file(DATA_png_name, COMOUT_png_name)
         DATA_gif_name = DATA_png_name.replace('.png', '.gif')
         COMOUT_gif_name = COMOUT_png_name.replace('.png', '.gif')
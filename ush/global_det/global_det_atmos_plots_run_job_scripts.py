@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+'''
+Name: global_det_atmos_plots_run_job_scripts.py
+Contact(s): Mallory Row (mallory.row@noaa.gov)
+Abstract: This runs the plotting job scripts of the job groups given
+          as arguments, in order, as one set of tasks. Each job
+          starts as soon as the jobs that write its input have
+          finished, rather than after the whole job group before it,
+          and jobs on the longest chain of remaining work start first.
+          On WCOSS2, jobs are also run on the other nodes in
+          PBS_NODEFILE.
+Run By: scripts/plots/global_det/exevs_global_det_atmos_grid2grid_plots.sh
+        scripts/plots/global_det/exevs_global_det_atmos_grid2obs_plots.sh
+'''
+
+import sys
+import os
+import glob
+import socket
+import fcntl
+import global_det_atmos_util as gda_util
+
+print("BEGIN: "+os.path.basename(__file__))
+
+# Read in environment variables
+DATA = os.environ['DATA']
+VERIF_CASE = os.environ['VERIF_CASE']
+STEP = os.environ['STEP']
+machine = os.environ['machine']
+USE_CFP = os.environ['USE_CFP']
+nproc = os.environ['nproc']
+NDAYS = str(os.environ['NDAYS'])
+PBS_NODEFILE = os.environ.get('PBS_NODEFILE', '')
+POE_RUNTIME_HISTORY_DIR = os.environ.get(
+    'POE_RUNTIME_HISTORY_DIR', os.path.join(DATA, 'runtime_history')
+)
+VERIF_CASE_STEP = VERIF_CASE+'_'+STEP
+
+job_group_list = sys.argv[1:]
+plot_job_scripts_dir = os.path.join(DATA, VERIF_CASE_STEP, 'plot_job_scripts')
+signature_env_vars = ['VERIF_TYPE', 'JOB_GROUP', 'job_name', 'plot',
+                      'line_type', 'stat', 'fcst_var_name']
+
+# Get job scripts
+job_group_env_dict = {}
+for job_group in job_group_list:
+    job_group_env_dict[job_group] = {}
+    job_files = sorted(
+        glob.glob(os.path.join(plot_job_scripts_dir, job_group, 'job*')),
+        key=lambda job_file: int(os.path.basename(job_file)[3:])
+    )
+    if len(job_files) == 0:
+        print("NOTE: No job files in "
+              +os.path.join(plot_job_scripts_dir, job_group))
+    for job_file in job_files:
+        job_group_env_dict[job_group][job_file] = (
+            gda_util.get_job_script_env(job_file)
+        )
+job_deps_dict = gda_util.get_plot_job_dependencies(job_group_list,
+                                                   job_group_env_dict)
+
+# Estimate each job's run time from the run time history of its job group,
+# then prioritize jobs by the longest chain of work starting with them
+job_cost_dict = {}
+job_signature_dict = {}
+job_runtime_history_file_dict = {}
+for job_group in job_group_list:
+    runtime_history_file = os.path.join(
+        POE_RUNTIME_HISTORY_DIR,
+        f"{VERIF_CASE}_{STEP}_{job_group}_last{NDAYS}days.txt"
+    )
+    gda_util.trim_job_runtime_history(runtime_history_file)
+    job_files = list(job_group_env_dict[job_group])
+    job_signatures = [
+        gda_util.get_job_signature(job_file, signature_env_vars,
+                                   'model_list')
+        for job_file in job_files
+    ]
+    job_costs = gda_util.get_job_costs(
+        job_signatures, gda_util.get_job_runtimes(runtime_history_file)
+    )
+    for job_file, job_signature, job_cost in zip(job_files, job_signatures,
+                                                 job_costs):
+        job_cost_dict[job_file] = job_cost
+        job_signature_dict[job_file] = job_signature
+        job_runtime_history_file_dict[job_file] = runtime_history_file
+job_dependents_dict = {job_file: [] for job_file in job_cost_dict}
+for job_file, job_deps in job_deps_dict.items():
+    for dep_job_file in job_deps:
+        job_dependents_dict[dep_job_file].append(job_file)
+job_priority_dict = {}
+# Job groups are in run order, so every dependent is seen first in reverse
+for job_file in list(job_cost_dict)[::-1]:
+    job_priority_dict[job_file] = job_cost_dict[job_file] + max(
+        [job_priority_dict[dependent_job_file]
+         for dependent_job_file in job_dependents_dict[job_file]],
+        default=0
+    )
+
+# Get the hosts to run on
+host_list = []
+remote_launcher = ''
+if USE_CFP == 'YES' and machine == 'WCOSS2' and os.path.exists(PBS_NODEFILE):
+    this_host = socket.gethostname().split('.')[0]
+    with open(PBS_NODEFILE, 'r') as pnf:
+        for line in pnf:
+            host = line.strip()
+            if host and host.split('.')[0] != this_host \
+                    and host not in host_list:
+                host_list.append(host)
+    remote_launcher = 'mpiexec -n 1 -ppn 1 --hosts {host}'
+if USE_CFP == 'YES':
+    nproc_per_host = int(nproc)
+else:
+    nproc_per_host = 1
+    host_list = []
+
+# Run jobs
+task_log_file = os.path.join(
+    DATA, VERIF_CASE_STEP, 'plot_output', 'logs',
+    f"task_log_{'_'.join(job_group_list)}.txt"
+)
+gda_util.make_dir(os.path.dirname(task_log_file))
+job_task_dict = {
+    job_file: os.path.relpath(job_file, plot_job_scripts_dir)
+    for job_file in job_cost_dict
+}
+print(f"Running {len(job_task_dict)} jobs for {', '.join(job_group_list)} "
+      +f"with {nproc_per_host} at a time on {1+len(host_list)} host(s)")
+job_result_dict = gda_util.run_task_dag(
+    {job_task_dict[job_file]: [job_file] for job_file in job_task_dict},
+    {job_task_dict[job_file]: [job_task_dict[dep_job_file]
+                               for dep_job_file in job_deps_dict[job_file]]
+     for job_file in job_task_dict},
+    {job_task_dict[job_file]: job_priority_dict[job_file]
+     for job_file in job_task_dict},
+    nproc_per_host, task_log_file, host_list=host_list,
+    remote_launcher=remote_launcher
+)
+
+# Record run times of successful jobs
+failed_job_list = []
+skipped_job_list = []
+for job_file, job_task in job_task_dict.items():
+    job_result = job_result_dict.get(job_task)
+    if job_result is None:
+        skipped_job_list.append(job_task)
+    elif job_result['status'] != 0:
+        failed_job_list.append(job_task)
+    else:
+        runtime_history_file = job_runtime_history_file_dict[job_file]
+        gda_util.make_dir(os.path.dirname(runtime_history_file))
+        with open(runtime_history_file, 'a') as rhf:
+            fcntl.flock(rhf, fcntl.LOCK_EX)
+            rhf.write(f"{job_signature_dict[job_file]}\t"
+                      +f"{int(round(job_result['seconds']))}\n")
+# Jobs are only skipped when a job they depend on failed
+if len(failed_job_list) != 0:
+    print(f"FATAL ERROR: {len(failed_job_list)} jobs failed: "
+          +', '.join(failed_job_list))
+    if len(skipped_job_list) != 0:
+        print(f"FATAL ERROR: {len(skipped_job_list)} jobs were skipped "
+              +"because a job they depend on failed: "
+              +', '.join(skipped_job_list))
+    sys.exit(1)
+
+print("END: "+os.path.basename(__file__))
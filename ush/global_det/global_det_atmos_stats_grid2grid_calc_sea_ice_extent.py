@@ -18,32 +18,95 @@ import global_det_atmos_util as gda_util
 
 print("Python Script:\t" + repr(sys.argv[0]))
 
-def iceArea(lon1,lat1,ice1):
+def get_grid_geometry(lon, lat, grid, hemisphere, bounding_lat):
+    """! Get the grid rows in the hemisphere and the grid cell
+         surface areas, read from the cache if they have already
+         been computed for the grid and hemisphere
+
+         Args:
+             lon          - 2-D longitudes (array)
+             lat          - 2-D latitudes (array)
+             grid         - grid name, e.g. G219 (string)
+             hemisphere   - nh or sh (string)
+             bounding_lat - latitude bounding the
+                            hemisphere (float)
+
+         Returns:
+             keep_rows - rows with a latitude in the
+                         hemisphere (boolean array)
+             cell_area - surface areas in km**2 of the
+                         grid cells in the kept rows, less
+                         the last row and column (array)
     """
-    Compute the cell side dimensions (Vincenty) and the cell surface areas.
-    This assumes the ice has already been masked and subsampled as needed
-    returns ice_extent, ice_area, surface_area = iceArea(lon,lat,ice)
-    surface_area is the computed grid areas in km**2)
+    cache_file_prefix = f"{grid}_{hemisphere}_"
+    for cache_dir in [FIX_CACHE_DIR, DATA_CACHE_DIR]:
+        keep_rows_file = os.path.join(cache_dir,
+                                      cache_file_prefix+'keep_rows.npy')
+        cell_area_file = os.path.join(cache_dir,
+                                      cache_file_prefix+'cell_area.npy')
+        if os.path.exists(keep_rows_file) and os.path.exists(cell_area_file):
+            keep_rows = np.load(keep_rows_file)
+            cell_area = np.load(cell_area_file)
+            if keep_rows.shape == (lat.shape[0],) \
+                    and cell_area.shape == (keep_rows.sum()-1,
+                                            lat.shape[1]-1):
+                print(f"Using cached grid geometry from {cache_dir}")
+                return keep_rows, cell_area
+    if hemisphere == 'nh':
+        keep_rows = np.asarray(lat>=bounding_lat).any(axis=1)
+    elif hemisphere == 'sh':
+        keep_rows = np.asarray(lat<=bounding_lat).any(axis=1)
+    # Compute the cell side dimensions (Vincenty) and the cell
+    # surface areas
+    lon = np.ma.getdata(lon[keep_rows])
+    lat = np.ma.getdata(lat[keep_rows])
+    g = Geod(ellps='WGS84')
+    _,_,xdist = g.inv(lon, lat, np.roll(lon,-1,axis=1),
+                      np.roll(lat,-1,axis=1))
+    _,_,ydist = g.inv(lon, lat, np.roll(lon,-1,axis=0),
+                      np.roll(lat,-1,axis=0))
+    cell_area = (xdist/1000.)[:-1,:-1] * (ydist/1000.)[:-1,:-1]
+    try:
+        gda_util.make_dir(DATA_CACHE_DIR)
+        np.save(os.path.join(DATA_CACHE_DIR,
+                             cache_file_prefix+'keep_rows.npy'), keep_rows)
+        np.save(os.path.join(DATA_CACHE_DIR,
+                             cache_file_prefix+'cell_area.npy'), cell_area)
+    except OSError as e:
+        print(f"NOTE: Could not cache grid geometry in {DATA_CACHE_DIR}: {e}")
+    return keep_rows, cell_area
+
+def iceExtent(ice, keep_rows, cell_area):
+    """! Compute the sea-ice extent, the surface area of the grid
+         cells with 15-100% ice concentration
+
+         Args:
+             ice       - ice concentration in percent, 2-D or
+                         stacked 3-D (n, y, x) (masked array)
+             keep_rows - rows with a latitude in the
+                         hemisphere (boolean array)
+             cell_area - surface areas in km**2 of the
+                         grid cells in the kept rows, less
+                         the last row and column (array)
+
+         Returns:
+             ice_extent - sea-ice extent in km**2, one
+                          per 2-D field (float or array)
     """
-    lon=lon1.copy()
-    lat=lat1.copy()
-    ice=ice1.copy()
-    g=Geod(ellps='WGS84')
-    _,_,xdist=g.inv(lon,lat,np.roll(lon,-1,axis=1),np.roll(lat,-1,axis=1))
-    _,_,ydist=g.inv(lon,lat,np.roll(lon,-1,axis=0),np.roll(lat,-1,axis=0))
-    xdist=np.ma.array(xdist,mask=ice.mask)/1000.
-    ydist=np.ma.array(ydist,mask=ice.mask)/1000.
-    xdist=xdist[:-1,:-1]
-    ydist=ydist[:-1,:-1]
-    ice=ice[:-1,:-1]     # just to match the roll
-    extent=xdist*ydist   # extent is surface area only
-    area=xdist*ydist*ice # ice area is actual ice cover (area * concentration)
-    return extent.flatten().sum(), area.flatten().sum(), extent
+    ice = ice[...,keep_rows,:][...,:-1,:-1]
+    ice_in_cell = (~np.ma.getmaskarray(ice)
+                   & (np.ma.getdata(ice) >= 15)
+                   & (np.ma.getdata(ice) <= 100))
+    # Sum each field's cell areas as one row, in the same order as
+    # a sum over the flattened field
+    return np.where(ice_in_cell, cell_area, 0.).reshape(
+        ice_in_cell.shape[:-2]+(-1,)
+    ).sum(axis=-1)
 
 # Check for needed environment variables
 env_var_list = ['MODEL', 'DATE', 'valid_hr_start', 'valid_hr_end',
                 'fhr_list', 'hemisphere', 'grid', 'DATA', 'VERIF_CASE', 'STEP',
-                'RUN']
+                'RUN', 'FIXevs']
 for env_var in env_var_list:
     if not env_var in os.environ:
         print("FATAL ERROR: "+repr(sys.argv[0])
@@ -60,6 +123,13 @@ DATA = os.environ['DATA']
 VERIF_CASE = os.environ['VERIF_CASE']
 STEP = os.environ['STEP']
 RUN = os.environ['RUN']
+FIXevs = os.environ['FIXevs']
+
+# Set grid geometry cache directories, precomputed in FIXevs
+# or computed once in DATA
+FIX_CACHE_DIR = os.path.join(FIXevs, 'cache', 'sea_ice_grid_geometry')
+DATA_CACHE_DIR = os.path.join(DATA, VERIF_CASE+'_'+STEP, 'cache',
+                              'sea_ice_grid_geometry')
 
 # Set date info
 DATE_start_dt = datetime.datetime.strptime(DATE+valid_hr_start, '%Y%m%d%H')
@@ -125,40 +195,25 @@ if gda_util.check_file_exists_size(obs_file):
     obs_lat_in = obs.variables['lat'][:]
     obs_lon_in = obs.variables['lon'][:]
     obs_ICEC = obs.variables['ice_conc'][:]
+    obs.close()
     if obs_lat_in.ndim == 1 and obs_lon_in.ndim == 1:
         obs_lon, obs_lat = np.meshgrid(obs_lon_in, obs_lat_in)
     else:
         obs_lon = obs_lon_in
         obs_lat = obs_lat_in
-    if hemisphere == 'nh':
-        obs_lat_masked = np.ma.masked_invalid(
-            np.where(obs_lat>=bounding_lat, obs_lat, np.nan)
-        )
-    elif hemisphere == 'sh':
-        obs_lat_masked = np.ma.masked_invalid(
-            np.where(obs_lat<=bounding_lat, obs_lat, np.nan)
-        )
-    drop_idx_list = []
-    for r in range(len(obs_lat_masked[:,0])):
-        if obs_lat_masked[r,:].mask.all():
-            drop_idx_list.append(r)
-    obs_lat = np.delete(obs_lat, drop_idx_list, axis=0)
-    obs_lon = np.delete(obs_lon, drop_idx_list, axis=0)
-    obs_ice = np.delete(obs_ICEC, drop_idx_list, axis=0)
-    obs_ice = np.ma.masked_greater(
-        np.ma.masked_less(np.ma.masked_invalid(obs_ice),15)
-    ,100)
-    obs_extent, obs_area, obs_surface_area = (
-        iceArea(obs_lon, obs_lat, obs_ice)
+    obs_keep_rows, obs_cell_area = get_grid_geometry(
+        obs_lon, obs_lat, grid, hemisphere, bounding_lat
     )
+    obs_extent = iceExtent(obs_ICEC, obs_keep_rows, obs_cell_area)
     OBS = str(obs_extent/1e6)
 else:
     print("NOTE: Using NA for obs")
     OBS = 'NA'
 
-# Calculate observation sea-ice extent
+# Read forecast sea-ice concentration for all forecast hours
+fcst_ICEC_list = []
+fcst_ICEC_lead_list = []
 for fcst_lead in fhr_list:
-    FCST_LEAD = fcst_lead.zfill(2)+'0000'
     initDATE_dt = DATE_end_dt - datetime.timedelta(hours=int(fcst_lead))
     fcst_file = os.path.join(DATA, VERIF_CASE+'_'+STEP, 'METplus_output',
                              RUN+'.'+DATE_end_dt.strftime('%Y%m%d'),
@@ -169,36 +224,33 @@ for fcst_lead in fhr_list:
                              +'to'+DATE_end_dt.strftime('%Y%m%d%H')+'.nc')
     if gda_util.check_file_exists_size(fcst_file):
         fcst = netcdf.Dataset(fcst_file, 'r')
-        fcst_lat_in = fcst.variables['lat'][:]
-        fcst_lon_in = fcst.variables['lon'][:]
-        fcst_ICEC = fcst.variables['FCST_ICEC_Z0_DAILYAVG'][:] * 100
-        if fcst_lat_in.ndim == 1 and fcst_lon_in.ndim == 1:
-            fcst_lon, fcst_lat = np.meshgrid(fcst_lon_in, fcst_lat_in)
-        else:
-            fcst_lon = fcst_lon_in
-            fcst_lat = fcst_lat_in
-        if hemisphere == 'nh':
-            fcst_lat_masked = np.ma.masked_invalid(
-                np.where(fcst_lat>=bounding_lat, fcst_lat, np.nan)
-            )
-        elif hemisphere == 'sh':
-            fcst_lat_masked = np.ma.masked_invalid(
-                np.where(fcst_lat<=bounding_lat, fcst_lat, np.nan)
-            )
-        drop_idx_list = []
-        for r in range(len(fcst_lat_masked[:,0])):
-            if fcst_lat_masked[r,:].mask.all():
-                drop_idx_list.append(r)
-        fcst_lat = np.delete(fcst_lat, drop_idx_list, axis=0)
-        fcst_lon = np.delete(fcst_lon, drop_idx_list, axis=0)
-        fcst_ice = np.delete(fcst_ICEC, drop_idx_list, axis=0)
-        fcst_ice = np.ma.masked_greater(
-            np.ma.masked_less(np.ma.masked_invalid(fcst_ice),15)
-        ,100)
-        fcst_extent, fcst_area, fcst_surface_area = (
-            iceArea(fcst_lon, fcst_lat, fcst_ice)
+        if len(fcst_ICEC_list) == 0:
+            fcst_lat_in = fcst.variables['lat'][:]
+            fcst_lon_in = fcst.variables['lon'][:]
+        fcst_ICEC_list.append(
+            fcst.variables['FCST_ICEC_Z0_DAILYAVG'][:] * 100
         )
-        FCST = str(fcst_extent/1e6)
+        fcst_ICEC_lead_list.append(fcst_lead)
+        fcst.close()
+
+# Calculate forecast sea-ice extent for all forecast hours at once
+fcst_extent_dict = {}
+if len(fcst_ICEC_list) != 0:
+    if fcst_lat_in.ndim == 1 and fcst_lon_in.ndim == 1:
+        fcst_lon, fcst_lat = np.meshgrid(fcst_lon_in, fcst_lat_in)
+    else:
+        fcst_lon = fcst_lon_in
+        fcst_lat = fcst_lat_in
+    fcst_keep_rows, fcst_cell_area = get_grid_geometry(
+        fcst_lon, fcst_lat, grid, hemisphere, bounding_lat
+    )
+    fcst_extent = iceExtent(np.ma.stack(fcst_ICEC_list),
+                            fcst_keep_rows, fcst_cell_area)
+    fcst_extent_dict = dict(zip(fcst_ICEC_lead_list, fcst_extent))
+for fcst_lead in fhr_list:
+    FCST_LEAD = fcst_lead.zfill(2)+'0000'
+    if fcst_lead in fcst_extent_dict:
+        FCST = str(fcst_extent_dict[fcst_lead]/1e6)
     else:
         print("NOTE: Using NA for forecast")
         FCST = 'NA'
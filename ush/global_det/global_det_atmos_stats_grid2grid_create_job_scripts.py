@@ -1419,4 +1419,7 @@ if USE_CFP == 'YES':
        iproc+=1
     poe_file.close()
 
+print(f"Path index: {gda_util.path_index_count_dict['hits']} hits, "
+      +f"{gda_util.path_index_count_dict['misses']} misses")
+
 print("END: "+os.path.basename(__file__))
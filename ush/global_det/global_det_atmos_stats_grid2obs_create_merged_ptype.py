@@ -12,7 +12,6 @@ Run By: individual statistics job scripts generated through
 import os
 import sys
 import netCDF4 as netcdf
-import numpy as np
 import datetime
 import global_det_atmos_util as gda_util
 
@@ -95,7 +94,8 @@ while valid_date_dt <= ENDDATE_dt:
             +'_fhr'+str(fhr).zfill(3)+'.nc'
         )
         if os.path.exists(output_COMOUT_merged_ptype_file):
-            if not os.path.exits(output_DATA_merged_ptype_file):
+            make_merged_ptype_output_file = False
+            if not os.path.exists(output_DATA_merged_ptype_file):
                 gda_util.copy_file(output_COMOUT_merged_ptype_file,
                                    output_DATA_merged_ptype_file)
         else:
@@ -135,25 +135,9 @@ while valid_date_dt <= ENDDATE_dt:
                   +output_DATA_merged_ptype_file)
             print("COMOUT Output Merged Ptype File: "
                   +output_COMOUT_merged_ptype_file)
-            merged_ptype = np.zeros_like(input_crain)
-            for x in range(len(input_crain[:,0])):
-                for y in range(len(input_crain[0,:])):
-                    crain_xy = input_crain[x,y]
-                    csnow_xy = input_csnow[x,y]
-                    cfrzr_xy = input_cfrzr[x,y]
-                    cicep_xy = input_cicep[x,y]
-                    ptype_xy_list = [crain_xy, csnow_xy, cfrzr_xy, cicep_xy]
-                    if ptype_xy_list.count(1.0) == 1: # one ptype
-                        if crain_xy == 1.0:
-                            merged_ptype[x,y] = 1
-                        elif csnow_xy == 1.0:
-                            merged_ptype[x,y] = 2
-                        elif cfrzr_xy == 1.0:
-                            merged_ptype[x,y] = 3
-                        elif cicep_xy == 1.0:
-                            merged_ptype[x,y] = 4
-                    elif ptype_xy_list.count('1.0') > 1: # more than ptype
-                        print("more than 1 ptype")
+            merged_ptype = gda_util.merge_ptype(
+                input_crain, input_csnow, input_cfrzr, input_cicep
+            )
             output_merged_ptype_data = netcdf.Dataset(
                 output_DATA_merged_ptype_file, 'w', format='NETCDF3_CLASSIC'
             )
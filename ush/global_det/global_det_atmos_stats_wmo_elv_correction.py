@@ -32,30 +32,43 @@ MODELNAME = os.environ['MODELNAME']
 wmo_verif = os.environ['wmo_verif']
 valid_date = os.environ['valid_date']
 fhr = os.environ['fhr']
-tmp_fhr_stat_file = os.environ['tmp_fhr_stat_file']
-tmp_fhr_elv_correction_stat_file = (
-    os.environ['tmp_fhr_elv_correction_stat_file']
-)
+
+# Process run time arguments: pairs of input and output stat files,
+# e.g. all forecast hours for a valid date, or else the files for
+# the job's forecast hour
+if len(sys.argv[1:]) % 2 != 0:
+    print("FATAL ERROR: Not given correct number of run time arguments..."
+          +os.path.basename(__file__)+" "
+          +"[TMP_FHR_STAT_FILE TMP_FHR_ELV_CORRECTION_STAT_FILE ...]")
+    sys.exit(1)
+if len(sys.argv) > 1:
+    stat_file_pair_list = list(zip(sys.argv[1::2], sys.argv[2::2]))
+else:
+    stat_file_pair_list = [(
+        os.environ['tmp_fhr_stat_file'],
+        os.environ['tmp_fhr_elv_correction_stat_file']
+    )]
 
 valid_date_dt = datetime.datetime.strptime(valid_date, '%Y%m%d%H')
 
 # Set lapse rates set by WMO (K/m)
-elv_correction_var_list = ['TMP/Z2', 'DPT/Z2']
-tmp2m_lapse_rate = 0.0065
-dpt2m_lapse_rate = 0.0012
+elv_correction_var_lapse_rate_dict = {
+    'TMP/Z2': 0.0065,
+    'DPT/Z2': 0.0012
+}
 
 # Set MET MPR columns
 MET_MPR_column_list = gda_util.get_met_line_type_cols(
     'null', MET_ROOT, met_ver, 'MPR'
 )
 
-# Initialize data dictionary
-stat_elv_correction_dict = {}
-for col in MET_MPR_column_list:
-    stat_elv_correction_dict[col] = []
-
 # Do elevation correction by station
-if gda_util.check_file_exists_size(tmp_fhr_stat_file):
+for tmp_fhr_stat_file, tmp_fhr_elv_correction_stat_file \
+        in stat_file_pair_list:
+    if not gda_util.check_file_exists_size(tmp_fhr_stat_file):
+        print(f"WARNING: {tmp_fhr_stat_file} does not exist or is empty, "
+              +f"not writing {tmp_fhr_elv_correction_stat_file}")
+        continue
     print(f"Reading data from {tmp_fhr_stat_file}")
     with open(tmp_fhr_stat_file, 'r') as infile:
         headers = infile.readline()
@@ -63,63 +76,67 @@ if gda_util.check_file_exists_size(tmp_fhr_stat_file):
                           skipinitialspace=True, header= None,
                           names=MET_MPR_column_list,
                           na_filter=False, dtype=str)
-    for sid in file_df['OBS_SID'].unique():
-        sid_df = file_df[file_df['OBS_SID'] == sid]
-        # Grab model elevation
-        sid_model_elv_df = sid_df[sid_df['FCST_VAR'] == 'ELV']
-        if len(sid_model_elv_df) == 0:
-            print(f"NOTE: Cannot grab model elevation for {sid} from "
-                  +f"{tmp_fhr_stat_file}, not doing elevation corrections "
-                  +"for station")
-        else:
-            sid_model_elv = float(sid_model_elv_df.iloc[0]['FCST'])
-            for var_level in elv_correction_var_list:
-                var = var_level.split('/')[0]
-                level = var_level.split('/')[1]
-                if var_level == 'TMP/Z2':
-                    var_level_lapse_rate = tmp2m_lapse_rate
-                elif var_level == 'DPT/Z2':
-                    var_level_lapse_rate = dpt2m_lapse_rate
-                sid_var_level_df = sid_df[
-                    (sid_df['FCST_VAR'] == var)
-                    & (sid_df['FCST_LEV'] == level)
-                    & (sid_df['FCST'] != 'NA')
-                    & (sid_df['OBS_ELV'] != 'NA')
-                ]
-                if len(sid_var_level_df) > 0:
-                    sid_var_level_fcst = float(sid_var_level_df.iloc[0]['FCST'])
-                    sid_obs_elv = float(sid_var_level_df.iloc[0]['OBS_ELV'])
-                    sid_var_level_fcst_elv_correction = str(
-                        sid_var_level_fcst
-                        +((sid_model_elv - sid_obs_elv)*var_level_lapse_rate)
-                    )
-                    for col in MET_MPR_column_list:
-                        if col == 'FCST':
-                            stat_elv_correction_dict[col].append(
-                                sid_var_level_fcst_elv_correction
-                            )
-                        elif col == 'FCST_VAR':
-                            stat_elv_correction_dict[col].append(
-                                f"{sid_var_level_df.iloc[0][col]}_EC"
-                            )
-                        else:
-                            stat_elv_correction_dict[col].append(
-                                sid_var_level_df.iloc[0][col]
-                            )
-                            append_value = sid_var_level_df.iloc[0][col]
-                else:
-                    print(f"NOTE: No data found for {var_level} "
-                          +f"for station {sid}")
+    file_df['sid_idx'] = pd.factorize(file_df['OBS_SID'])[0]
+    # Grab the first model elevation for each station
+    sid_model_elv_df = (
+        file_df[file_df['FCST_VAR'] == 'ELV']
+        .drop_duplicates('sid_idx', keep='first')
+        .set_index('sid_idx')['FCST'].astype(float)
+    )
+    no_model_elv_sid_list = (
+        file_df.loc[~file_df['sid_idx'].isin(sid_model_elv_df.index),
+                    'OBS_SID'].unique().tolist()
+    )
+    if len(no_model_elv_sid_list) != 0:
+        print(f"NOTE: Cannot grab model elevation for "
+              +f"{len(no_model_elv_sid_list)} stations from "
+              +f"{tmp_fhr_stat_file}, not doing elevation corrections "
+              +f"for stations: {' '.join(no_model_elv_sid_list)}")
+    # Grab the first forecast for each station and variable
+    var_level_df_list = []
+    for var_idx, (var_level, var_level_lapse_rate) in enumerate(
+            elv_correction_var_lapse_rate_dict.items()
+    ):
+        var, level = var_level.split('/')
+        var_level_df = file_df[
+            (file_df['FCST_VAR'] == var)
+            & (file_df['FCST_LEV'] == level)
+            & (file_df['FCST'] != 'NA')
+            & (file_df['OBS_ELV'] != 'NA')
+            & (file_df['sid_idx'].isin(sid_model_elv_df.index))
+        ].drop_duplicates('sid_idx', keep='first').copy()
+        no_data_sid_list = sorted(
+            set(sid_model_elv_df.index) - set(var_level_df['sid_idx'])
+        )
+        if len(no_data_sid_list) != 0:
+            print(f"NOTE: No data found for {var_level} for "
+                  +f"{len(no_data_sid_list)} stations: "
+                  +' '.join(file_df['OBS_SID'].unique()[no_data_sid_list]))
+        var_level_fcst_elv_correction = (
+            var_level_df['FCST'].astype(float).to_numpy()
+            +((sid_model_elv_df.loc[var_level_df['sid_idx']].to_numpy()
+               - var_level_df['OBS_ELV'].astype(float).to_numpy())
+              *var_level_lapse_rate)
+        )
+        var_level_df['FCST'] = [
+            str(value) for value in var_level_fcst_elv_correction.tolist()
+        ]
+        var_level_df['FCST_VAR'] = var_level_df['FCST_VAR']+'_EC'
+        var_level_df['var_idx'] = var_idx
+        var_level_df_list.append(var_level_df)
 
-# Make dataframe
-stat_elv_correction_df = pd.DataFrame(stat_elv_correction_dict)
+    # Make dataframe, by station then variable
+    stat_elv_correction_df = (
+        pd.concat(var_level_df_list)
+        .sort_values(['sid_idx', 'var_idx'])[MET_MPR_column_list]
+    )
 
-# Write out dataframe
-print("Writing forecast value elevations to "
-      +f"{tmp_fhr_elv_correction_stat_file}")
-stat_elv_correction_df.to_csv(
-    tmp_fhr_elv_correction_stat_file, header=headers, index=None, sep=' ',
-    mode='w'
-)
+    # Write out dataframe
+    print("Writing forecast value elevations to "
+          +f"{tmp_fhr_elv_correction_stat_file}")
+    stat_elv_correction_df.to_csv(
+        tmp_fhr_elv_correction_stat_file, header=headers, index=None,
+        sep=' ', mode='w'
+    )
 
 print("END: "+os.path.basename(__file__))
@@ -16,7 +16,6 @@ import netCDF4 as netcdf
 import tarfile
 import gzip
 import shutil
-import itertools
 import global_det_atmos_util as gda_util
 
 print("BEGIN: "+os.path.basename(__file__))
@@ -111,13 +110,16 @@ for diag_var in list(diag_var_dict.keys()):
         ]
         # Put into dataframe for MET to read
         station_id_list = diag_var_rawinsonde_df['Station_ID'].tolist()
-        reltimes = (diag_var_rawinsonde_df['Time'].to_numpy()
-                    * datetime.timedelta(hours=1))
-        valid_time_list = [
-            datetime.datetime.strftime(valid_date_dt+reltime,
-                                       '%Y%m%d_%H%M%S') \
-            for reltime in reltimes
-        ]
+        # Round to microseconds half to even, as datetime.timedelta does
+        reltimes = pd.to_timedelta(
+            np.rint(diag_var_rawinsonde_df['Time'].to_numpy(dtype=float)
+                    * 3600e6).astype('int64'),
+            unit='us'
+        )
+        valid_time_list = (
+            (pd.Timestamp(valid_date_dt) + reltimes)
+            .strftime('%Y%m%d_%H%M%S').tolist()
+        )
         lat_list = diag_var_rawinsonde_df['Latitude'].tolist()
         lon_list = diag_var_rawinsonde_df['Longitude'].tolist()
         elv_list = diag_var_rawinsonde_df['Station_Elevation'].tolist()
@@ -176,97 +178,62 @@ radius_earth = 6371008.7714
 gravity = 9.80665
 
 # Calculate geopotential heigh and relative humidity
+# from stations with one TMP value (and one SPFH value
+# for relative humidity) at a level
 print("Calculating Geopotential Height and Relative Humidity")
-for sid_level in \
-        list(itertools.product(tmp_ascii2nc_df['Station_ID'].unique(),
-                               tmp_ascii2nc_df['Level'].unique())):
-    sid = sid_level[0]
-    level = sid_level[1]
-    tmp_row = tmp_ascii2nc_df[
-        (tmp_ascii2nc_df['Station_ID'] == sid)
-        & (tmp_ascii2nc_df['Level'] == level)
-        & (tmp_ascii2nc_df['Variable_Name'] == 'TMP')
-    ]
-    spfh_row = tmp_ascii2nc_df[
-        (tmp_ascii2nc_df['Station_ID'] == sid)
-        & (tmp_ascii2nc_df['Level'] == level)
-        & (tmp_ascii2nc_df['Variable_Name'] == 'SPFH')
-    ]
-    # Geopotential Height
-    if len(tmp_row) == 1:
-        if tmp_row.iloc[0]['Height'] < 9999999:
-            geo_height = (
-                (gravity*radius_earth*tmp_row.iloc[0]['Height'])
-                    /(radius_earth+tmp_row.iloc[0]['Height'])
-                )/gravity
-        else:
-            geo_height = 'NA'
-    else:
-        geo_height = 'NA'
-    # Relative Humidity
-    if len(tmp_row) == 1 and len(spfh_row) == 1:
-        if tmp_row.iloc[0]['Valid_Time'] == spfh_row.iloc[0]['Valid_Time'] \
-                and tmp_row.iloc[0]['Height'] == spfh_row.iloc[0]['Height'] \
-                and tmp_row.iloc[0]['Lat'] == spfh_row.iloc[0]['Lat'] \
-                and tmp_row.iloc[0]['Lon'] == spfh_row.iloc[0]['Lon']:
-            pres = float(level)
-            tmpK = float(tmp_row.iloc[0]['Observation_Value'])
-            tmpC = tmpK - 273.15
-            spfh = float(spfh_row.iloc[0]['Observation_Value'])
-            mixing_ratio = spfh/(1-spfh)
-            # MetPy [Bolton (1980)]
-            sat_vap_pres = (
-                6.112 *
-                np.exp((17.67*tmpC)/(tmpC+243.5))
-            )
-            sat_mixing_ratio = epsilon*(sat_vap_pres/(pres-sat_vap_pres))
-            rh = (
-                (mixing_ratio/(epsilon+mixing_ratio))
-                *((epsilon+sat_mixing_ratio)/sat_mixing_ratio)
-            )*100.
-        else:
-            rh = 'NA'
-    else:
-        rh = 'NA'
-    if len(tmp_row) == 1:
-        for met_var in ['HGT', 'RH']:
-            if met_var == 'HGT':
-                met_var_value = geo_height
-            elif met_var == 'RH':
-                met_var_value = rh
-            if met_var_value == 'NA':
-                continue
-            ascii2nc_df_dict['Message_Type'].append(
-                tmp_row.iloc[0]['Message_Type']
-            )
-            ascii2nc_df_dict['Station_ID'].append(
-                tmp_row.iloc[0]['Station_ID']
-            )
-            ascii2nc_df_dict['Valid_Time'].append(
-                tmp_row.iloc[0]['Valid_Time']
-            )
-            ascii2nc_df_dict['Lat'].append(
-                tmp_row.iloc[0]['Lat']
-            )
-            ascii2nc_df_dict['Lon'].append(
-                tmp_row.iloc[0]['Lon']
-            )
-            ascii2nc_df_dict['Elevation'].append(
-                tmp_row.iloc[0]['Elevation']
-            )
-            ascii2nc_df_dict['Variable_Name'].append(met_var)
-            ascii2nc_df_dict['Level'].append(
-                tmp_row.iloc[0]['Level']
-            )
-            ascii2nc_df_dict['Height'].append(
-                tmp_row.iloc[0]['Height']
-            )
-            ascii2nc_df_dict['QC_String'].append(
-                tmp_row.iloc[0]['QC_String']
-            )
-            ascii2nc_df_dict['Observation_Value'].append(
-                str(met_var_value)
-            )
+tmp_ascii2nc_df['sid_idx'] = pd.factorize(tmp_ascii2nc_df['Station_ID'])[0]
+tmp_ascii2nc_df['level_idx'] = pd.factorize(tmp_ascii2nc_df['Level'])[0]
+sid_level_cols = ['sid_idx', 'level_idx']
+tmp_df = tmp_ascii2nc_df[tmp_ascii2nc_df['Variable_Name'] == 'TMP']
+tmp_df = tmp_df[~tmp_df.duplicated(sid_level_cols, keep=False)]
+spfh_df = tmp_ascii2nc_df[tmp_ascii2nc_df['Variable_Name'] == 'SPFH']
+spfh_df = spfh_df[~spfh_df.duplicated(sid_level_cols, keep=False)]
+tmp_spfh_df = tmp_df.merge(
+    spfh_df[sid_level_cols+['Valid_Time', 'Height', 'Lat', 'Lon',
+                            'Observation_Value']],
+    on=sid_level_cols, how='left', suffixes=('', '_SPFH')
+)
+# Geopotential Height
+height = tmp_spfh_df['Height'].to_numpy(dtype=float)
+hgt_df = tmp_spfh_df[height < 9999999].copy()
+hgt_height = hgt_df['Height'].to_numpy(dtype=float)
+geo_height = (
+    (gravity*radius_earth*hgt_height)/(radius_earth+hgt_height)
+)/gravity
+hgt_df['Variable_Name'] = 'HGT'
+hgt_df['Observation_Value'] = [str(value) for value in geo_height.tolist()]
+hgt_df['var_idx'] = 0
+# Relative Humidity
+rh_df = tmp_spfh_df[
+    (tmp_spfh_df['Valid_Time'] == tmp_spfh_df['Valid_Time_SPFH'])
+    & (tmp_spfh_df['Height'] == tmp_spfh_df['Height_SPFH'])
+    & (tmp_spfh_df['Lat'] == tmp_spfh_df['Lat_SPFH'])
+    & (tmp_spfh_df['Lon'] == tmp_spfh_df['Lon_SPFH'])
+].copy()
+pres = rh_df['Level'].to_numpy(dtype=float)
+tmpK = rh_df['Observation_Value'].to_numpy(dtype=float)
+tmpC = tmpK - 273.15
+spfh = rh_df['Observation_Value_SPFH'].to_numpy(dtype=float)
+mixing_ratio = spfh/(1-spfh)
+# MetPy [Bolton (1980)]
+sat_vap_pres = (
+    6.112 *
+    np.exp((17.67*tmpC)/(tmpC+243.5))
+)
+sat_mixing_ratio = epsilon*(sat_vap_pres/(pres-sat_vap_pres))
+rh = (
+    (mixing_ratio/(epsilon+mixing_ratio))
+    *((epsilon+sat_mixing_ratio)/sat_mixing_ratio)
+)*100.
+rh_df['Variable_Name'] = 'RH'
+rh_df['Observation_Value'] = [str(value) for value in rh.tolist()]
+rh_df['var_idx'] = 1
+# Add by station, then level, then HGT before RH
+hgt_rh_df = pd.concat([hgt_df, rh_df]).sort_values(
+    sid_level_cols+['var_idx']
+)
+for col in list(ascii2nc_df_dict.keys()):
+    ascii2nc_df_dict[col].extend(hgt_rh_df[col].tolist())
 
 # Make dataframe
 ascii2nc_df = pd.DataFrame(ascii2nc_df_dict)
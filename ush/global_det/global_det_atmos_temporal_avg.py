@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+'''
+Name: global_det_atmos_temporal_avg.py
+Contact(s): Mallory Row (mallory.row@noaa.gov)
+Abstract: This contains functions to make time averages (e.g. daily
+          averages) of the forecast, observation, and climatology
+          fields in netCDF output. Many averaging windows are made in
+          one pass: each input file is read once and added to the
+          running sums of every window that uses it, and each window
+          is written as soon as its last input has been read.
+          The subseasonal averages are made with these functions too.
+Run By: ush/global_det/global_det_atmos_stats_grid2grid_create_daily_avg.py
+        ush/subseasonal/subseasonal_stats_grid2grid_create_avgs.py
+'''
+
+import os
+import datetime
+import netCDF4 as netcdf
+import global_det_atmos_util as gda_util
+
+def get_avg_window(output_file, init_dt, valid_end_dt, fhr_list,
+                   DATA_file_format, COMIN_file_format, data_name_list,
+                   avg_name, avg_label, min_nfiles,
+                   format_filler=gda_util.format_filler, alert_word='NOTE'):
+    """! Get the information needed to make one average file
+
+         Args:
+             output_file       - path of the average file (string)
+             init_dt           - initialization time of the forecasts
+                                 averaged (datetime)
+             valid_end_dt      - end of the averaging window (datetime)
+             fhr_list          - forecast hours averaged, in
+                                 order (list of integers)
+             DATA_file_format  - DATA input file format (string)
+             COMIN_file_format - COMIN input file format, used
+                                 first if the file exists (string)
+             data_name_list    - data averaged, from FCST, OBS,
+                                 and CLIMO_MEAN (list of strings)
+             avg_name          - name appended to the averaged
+                                 variable names, e.g. DAILYAVG
+                                 (string)
+             avg_label         - label of the average used in
+                                 the FileOrigins attribute and
+                                 messages, e.g. Daily (string)
+             min_nfiles        - number of input files needed to
+                                 make the average (integer)
+             format_filler     - function filling in the input
+                                 file formats, the component's
+                                 own format_filler (function)
+             alert_word        - word starting the message printed
+                                 when there are too few input
+                                 files, NOTE or WARNING (string)
+
+         Returns:
+             avg_window - dictionary of average file information
+    """
+    input_list = []
+    for fhr in fhr_list:
+        valid_dt = init_dt + datetime.timedelta(hours=fhr)
+        DATA_input_file = format_filler(
+            DATA_file_format, valid_dt, init_dt, str(fhr), {}
+        )
+        COMIN_input_file = format_filler(
+            COMIN_file_format, valid_dt, init_dt, str(fhr), {}
+        )
+        input_list.append((fhr, valid_dt, DATA_input_file, COMIN_input_file))
+    avg_window = {
+        'output_file': output_file,
+        'init_dt': init_dt,
+        'valid_end_dt': valid_end_dt,
+        'input_list': input_list,
+        'data_name_list': data_name_list,
+        'avg_name': avg_name,
+        'avg_label': avg_label,
+        'min_nfiles': min_nfiles,
+        'alert_word': alert_word
+    }
+    return avg_window
+
+def get_input_var_name(input_var_list, data_name, var_level):
+    """! Get the name of the input variable holding data
+
+         Args:
+             input_var_list - input file variable names
+                              (list of strings)
+             data_name      - FCST, OBS, or CLIMO_MEAN (string)
+             var_level      - variable and level, e.g. HGT_P500
+                              (string)
+
+         Returns:
+             input_var_name - the last variable name containing
+                              data_name_var_level, or None (string)
+    """
+    input_var_name = None
+    for input_var in input_var_list:
+        if data_name+'_'+var_level in input_var:
+            input_var_name = input_var
+    return input_var_name
+
+def read_input_file(input_file, var_level, data_name_list):
+    """! Read the data and the metadata needed to write averages
+         from an input file
+
+         Args:
+             input_file     - input file path (string)
+             var_level      - variable and level, e.g. HGT_P500
+                              (string)
+             data_name_list - data to read, from FCST, OBS,
+                              and CLIMO_MEAN (list of strings)
+
+         Returns:
+             input_data_dict - dictionary of data arrays keyed
+                               by data name
+             input_meta      - dictionary of the file's global
+                               attributes, dimensions, lat/lon,
+                               and variable descriptions
+    """
+    input_file_data = netcdf.Dataset(input_file)
+    input_var_list = list(input_file_data.variables.keys())
+    input_meta = {
+        'ncattrs': {attr: input_file_data.getncattr(attr)
+                    for attr in input_file_data.ncattrs()},
+        'dimensions': {dim: len(input_file_data.dimensions[dim])
+                       for dim in input_file_data.dimensions},
+        'var_list': input_var_list,
+        'variables': {}
+    }
+    input_data_dict = {}
+    for data_name in data_name_list:
+        input_var_name = get_input_var_name(input_var_list, data_name,
+                                            var_level)
+        if input_var_name is not None:
+            input_data_dict[data_name] = (
+                input_file_data.variables[input_var_name][:]
+            )
+    for input_var_name in ['lat', 'lon'] + [
+            get_input_var_name(input_var_list, data_name, var_level)
+            for data_name in data_name_list
+    ]:
+        if input_var_name in input_var_list:
+            input_var = input_file_data.variables[input_var_name]
+            input_meta['variables'][input_var_name] = {
+                'datatype': input_var.datatype,
+                'dimensions': input_var.dimensions,
+                'ncattrs': {k: input_var.getncattr(k)
+                            for k in input_var.ncattrs()}
+            }
+            if input_var_name in ['lat', 'lon']:
+                input_meta['variables'][input_var_name]['data'] = (
+                    input_var[:]
+                )
+    input_file_data.close()
+    return input_data_dict, input_meta
+
+def write_avg_file(avg_window, var_level, avg_data_dict, avg_file_list_dict,
+                   input_meta, write_lat_lon):
+    """! Write an average file
+
+         Args:
+             avg_window         - dictionary of average file
+                                  information
+             var_level          - variable and level, e.g. HGT_P500
+                                  (string)
+             avg_data_dict      - dictionary of averaged data
+                                  keyed by data name
+             avg_file_list_dict - dictionary of the input files
+                                  averaged keyed by data name
+             input_meta         - metadata of the last input file
+                                  read for the average (dictionary)
+             write_lat_lon      - write lat and lon (boolean)
+
+         Returns:
+    """
+    output_file = avg_window['output_file']
+    avg_label = avg_window['avg_label']
+    # Write to a temporary file so an unfinished average file is never
+    # left in place of the output file
+    tmp_output_file = output_file+'.tmp'
+    output_file_data = netcdf.Dataset(tmp_output_file, 'w',
+                                      format='NETCDF3_CLASSIC')
+    for attr, attr_value in input_meta['ncattrs'].items():
+        if attr == 'FileOrigins':
+            output_file_data.setncattr(
+                attr, ';'.join([
+                    f"{avg_label} "
+                    +f"{data_name.split('_')[0].title()} Mean from "
+                    +','.join(avg_file_list_dict[data_name])
+                    for data_name in avg_window['data_name_list']
+                ])
+            )
+        else:
+            output_file_data.setncattr(attr, attr_value)
+    for dim, dim_len in input_meta['dimensions'].items():
+        output_file_data.createDimension(dim, dim_len)
+    if write_lat_lon:
+        for input_var_name in ['lat', 'lon']:
+            input_var_meta = input_meta['variables'][input_var_name]
+            write_data_name_var = output_file_data.createVariable(
+                input_var_name, input_var_meta['datatype'],
+                input_var_meta['dimensions']
+            )
+            for k, k_value in input_var_meta['ncattrs'].items():
+                write_data_name_var.setncatts({k: k_value})
+            write_data_name_var[:] = input_var_meta['data']
+    valid_end_dt = avg_window['valid_end_dt']
+    init_dt = avg_window['init_dt']
+    k_valid_time = valid_end_dt.strftime('%Y%m%d_%H%M%S')
+    k_valid_time_ut = int(
+        (valid_end_dt
+         -datetime.datetime.strptime('19700101','%Y%m%d')).total_seconds()
+    )
+    k_init_time = init_dt.strftime('%Y%m%d_%H%M%S')
+    k_init_time_ut = int(
+        (init_dt
+         -datetime.datetime.strptime('19700101','%Y%m%d')).total_seconds()
+    )
+    for data_name in avg_window['data_name_list']:
+        input_var_level = get_input_var_name(input_meta['var_list'],
+                                             data_name, var_level)
+        input_var_meta = input_meta['variables'][input_var_level]
+        write_data_name_var = output_file_data.createVariable(
+            data_name+'_'+var_level+'_'+avg_window['avg_name'],
+            input_var_meta['datatype'], input_var_meta['dimensions']
+        )
+        for k, k_value in input_var_meta['ncattrs'].items():
+            if k == 'valid_time':
+                write_data_name_var.setncatts({k: k_valid_time})
+            elif k == 'valid_time_ut':
+                write_data_name_var.setncatts({k: k_valid_time_ut})
+            elif k == 'init_time' and data_name == 'FCST':
+                write_data_name_var.setncatts({k: k_init_time})
+            elif k == 'init_time_ut' and data_name == 'FCST':
+                write_data_name_var.setncatts({k: k_init_time_ut})
+            elif k == 'init_time':
+                write_data_name_var.setncatts({k: k_valid_time})
+            elif k == 'init_time_ut':
+                write_data_name_var.setncatts({k: k_valid_time_ut})
+            else:
+                write_data_name_var.setncatts({k: k_value})
+        write_data_name_var[:] = avg_data_dict[data_name]
+    output_file_data.close()
+    os.replace(tmp_output_file, output_file)
+
+def create_avg_files(avg_window_list, var_level, write_lat_lon=True):
+    """! Make the average files for many averaging windows, reading
+         each input file once
+
+         Args:
+             avg_window_list - list of average file information
+                               dictionaries from get_avg_window
+             var_level       - variable and level, e.g. HGT_P500
+                               (string)
+             write_lat_lon   - write lat and lon (boolean)
+
+         Returns:
+             output_file_list - list of average files written
+    """
+    output_file_list = []
+    # Find the input files for all windows; windows sharing an input
+    # file share one read of it
+    input_file_windows_dict = {}
+    input_file_info_dict = {}
+    window_state_list = []
+    for window_idx, avg_window in enumerate(avg_window_list):
+        window_state_list.append({
+            'nremaining': 0,
+            'sum': {data_name: 0
+                    for data_name in avg_window['data_name_list']},
+            'file_list': {data_name: []
+                          for data_name in avg_window['data_name_list']},
+            'input_meta': None
+        })
+        for fhr, valid_dt, DATA_input_file, COMIN_input_file \
+                in avg_window['input_list']:
+            if os.path.exists(COMIN_input_file):
+                input_file = COMIN_input_file
+            else:
+                input_file = DATA_input_file
+            if not os.path.exists(input_file):
+                print("No input file for forecast hour "+str(fhr)
+                      +', valid '+str(valid_dt)
+                      +', init '+str(avg_window['init_dt'])+" "
+                      +DATA_input_file+" or "+COMIN_input_file)
+                continue
+            if input_file not in input_file_windows_dict:
+                input_file_windows_dict[input_file] = []
+                input_file_info_dict[input_file] = (
+                    avg_window['init_dt'], fhr, valid_dt
+                )
+            input_file_windows_dict[input_file].append(window_idx)
+            window_state_list[window_idx]['nremaining']+=1
+    # Windows are averaged in forecast hour order, as their inputs are
+    # read in initialization then forecast hour order
+    input_file_list = sorted(
+        input_file_windows_dict,
+        key=lambda input_file: input_file_info_dict[input_file][:2]
+    )
+    finished_window_idx_list = [
+        window_idx for window_idx, window_state in enumerate(window_state_list)
+        if window_state['nremaining'] == 0
+    ]
+    for input_file in [None] + input_file_list:
+        if input_file is not None:
+            init_dt, fhr, valid_dt = input_file_info_dict[input_file]
+            print("Input file for forecast hour "+str(fhr)
+                  +', valid '+str(valid_dt)
+                  +', init '+str(init_dt)+": "+input_file)
+            input_window_idx_list = input_file_windows_dict[input_file]
+            input_data_name_list = []
+            for window_idx in input_window_idx_list:
+                for data_name in avg_window_list[window_idx]['data_name_list']:
+                    if data_name not in input_data_name_list:
+                        input_data_name_list.append(data_name)
+            input_data_dict, input_meta = read_input_file(
+                input_file, var_level, input_data_name_list
+            )
+            finished_window_idx_list = []
+            for window_idx in input_window_idx_list:
+                window_state = window_state_list[window_idx]
+                for data_name in avg_window_list[window_idx]['data_name_list']:
+                    if data_name in input_data_dict:
+                        window_state['sum'][data_name] = (
+                            window_state['sum'][data_name]
+                            + input_data_dict[data_name]
+                        )
+                        window_state['file_list'][data_name].append(
+                            input_file
+                        )
+                window_state['input_meta'] = input_meta
+                window_state['nremaining']-=1
+                if window_state['nremaining'] == 0:
+                    finished_window_idx_list.append(window_idx)
+        for window_idx in finished_window_idx_list:
+            avg_window = avg_window_list[window_idx]
+            window_state = window_state_list[window_idx]
+            output_file = avg_window['output_file']
+            if all(len(window_state['file_list'][data_name])
+                   >= avg_window['min_nfiles']
+                   for data_name in avg_window['data_name_list']):
+                print(f"Output File: {output_file}")
+                avg_data_dict = {
+                    data_name: (window_state['sum'][data_name]
+                                /len(window_state['file_list'][data_name]))
+                    for data_name in avg_window['data_name_list']
+                }
+                write_avg_file(avg_window, var_level, avg_data_dict,
+                               window_state['file_list'],
+                               window_state['input_meta'], write_lat_lon)
+                output_file_list.append(output_file)
+            else:
+                print(f"{avg_window['alert_word']}: Cannot create "
+                      +f"{avg_window['avg_label'].lower()} average file "
+                      +f"{output_file}; need at least "
+                      +f"{avg_window['min_nfiles']} input files")
+            # Free the sums as soon as the window is written
+            window_state_list[window_idx] = None
+    return output_file_list
@@ -6,6 +6,11 @@ Abstract: This contains many functions used across global_det atmos.
 '''
 
 import os
+import functools
+import re
+import hashlib
+import heapq
+import fcntl
 import datetime
 import numpy as np
 import subprocess
@@ -52,6 +57,7 @@ def make_dir(dir_path):
     if not os.path.exists(dir_path):
         print(f"Making directory {dir_path}")
         os.makedirs(dir_path, mode=0o755, exist_ok=True)
+        forget_path_index(dir_path)
 
 def metplus_command(conf_file_name):
     """! Write out full call to METplus
@@ -99,11 +105,109 @@ def python_command(python_script_name, script_arg_list):
         python_cmd = python_cmd+' '+script_arg
     return python_cmd
 
-def check_file_exists_size(file_name):
+# Directory listings taken by get_path_index_dir, by directory path, and
+# how many existence and size queries were answered from a listing
+# already taken (hits) or had to list the directory first (misses)
+path_index_dict = {}
+path_index_count_dict = {'hits': 0, 'misses': 0}
+
+def get_path_index_dir(dir_path):
+    """! Get the listing of a directory, taking it with one os.scandir
+         the first time the directory is asked for and keeping it for
+         the rest of the job
+
+         Args:
+             dir_path - path of the directory (string)
+
+         Returns:
+             dir_entry_dict - entries in the directory by name, empty
+                              if the directory does not exist, None if
+                              it can not be listed (dictionary of
+                              os.DirEntry)
+    """
+    if not os.path.isabs(dir_path):
+        dir_path = os.path.abspath(dir_path)
+    if dir_path in path_index_dict:
+        path_index_count_dict['hits']+=1
+    else:
+        path_index_count_dict['misses']+=1
+        try:
+            with os.scandir(dir_path) as dir_entries:
+                path_index_dict[dir_path] = {
+                    dir_entry.name: dir_entry for dir_entry in dir_entries
+                }
+        except PermissionError:
+            path_index_dict[dir_path] = None
+        except OSError:
+            path_index_dict[dir_path] = {}
+    return path_index_dict[dir_path]
+
+def forget_path_index(path):
+    """! Forget the directory listings a new file or directory
+         makes out of date
+
+         Args:
+             path - path of the new file or directory (string)
+
+         Returns:
+    """
+    path = os.path.abspath(path)
+    while path not in ['', os.sep]:
+        path_index_dict.pop(path, None)
+        path = os.path.dirname(path)
+
+def path_exists(path):
+    """! Check if a path exists, like os.path.exists, from the
+         listing of its directory
+
+         Args:
+             path - path to check (string)
+
+         Returns:
+             path_exists - if path exists or not (boolean)
+    """
+    dir_path, path_name = os.path.split(path)
+    if path_name in ['', '.', '..']:
+        return os.path.exists(path)
+    dir_entry_dict = get_path_index_dir(dir_path)
+    if dir_entry_dict is None:
+        return os.path.exists(path)
+    if path_name not in dir_entry_dict:
+        return False
+    if dir_entry_dict[path_name].is_symlink():
+        try:
+            dir_entry_dict[path_name].stat()
+        except OSError:
+            return False
+    return True
+
+def path_getsize(path):
+    """! Get the size of a path, like os.path.getsize, from the
+         listing of its directory
+
+         Args:
+             path - path to get size of (string)
+
+         Returns:
+             path_size - size of path in bytes (integer)
+    """
+    dir_path, path_name = os.path.split(path)
+    if path_name in ['', '.', '..']:
+        return os.path.getsize(path)
+    dir_entry_dict = get_path_index_dir(dir_path)
+    if dir_entry_dict is None or path_name not in dir_entry_dict:
+        return os.path.getsize(path)
+    return dir_entry_dict[path_name].stat().st_size
+
+def check_file_exists_size(file_name, use_path_index=False):
     """! Checks to see if file exists and has size greater than 0
 
          Args:
-             file_name - file path (string)
+             file_name      - file path (string)
+             use_path_index - answer from directory listings kept
+                              for the job, see get_path_index_dir,
+                              instead of checking the file system
+                              (boolean)
 
          Returns:
              file_good - boolean
@@ -115,8 +219,16 @@ def check_file_exists_size(file_name):
         alert_word = 'WARNING'
     else:
         alert_word = 'NOTE'
-    if os.path.exists(file_name):
-        if os.path.getsize(file_name) > 0:
+    if use_path_index:
+        file_exists = path_exists(file_name)
+    else:
+        file_exists = os.path.exists(file_name)
+    if file_exists:
+        if use_path_index:
+            file_size = path_getsize(file_name)
+        else:
+            file_size = os.path.getsize(file_name)
+        if file_size > 0:
             file_good = True
         else:
             print(f"{alert_word}: {file_name} empty, 0 sized")
@@ -193,6 +305,7 @@ def copy_file(source_file, dest_file):
     if check_file_exists_size(source_file):
         print("Copying "+source_file+" to "+dest_file)
         shutil.copy(source_file, dest_file)
+        forget_path_index(dest_file)
 
 def convert_grib1_grib2(grib1_file, grib2_file):
     """! Converts GRIB1 data to GRIB2
@@ -292,6 +405,87 @@ def check_grib2_file_corrupt(grib2_file):
         file_is_corrupt = False
     return file_is_corrupt
 
+def get_grib_inventory(grib_file, grib_version):
+    """! Get the inventory of a GRIB file with one wgrib or wgrib2
+         run, used to find records without reading the file again
+
+         Args:
+             grib_file    - string of the path to
+                            the GRIB file
+             grib_version - GRIB edition of the file,
+                            1 or 2 (integer)
+         Returns:
+             grib_inventory - list of tuples of the record
+                              inventory line and the byte the
+                              record starts at, or None if the
+                              file is corrupt
+    """
+    if grib_version == 1:
+        wgrib_cmd = [os.environ['WGRIB'], grib_file]
+    elif grib_version == 2:
+        wgrib_cmd = [os.environ['WGRIB2'], '-s', grib_file]
+    print("Running  "+' '.join(wgrib_cmd))
+    wgrib_inv = subprocess.run(wgrib_cmd, capture_output=True,
+                               encoding='utf8')
+    if wgrib_inv.returncode != 0:
+        print(f"WARNING: {grib_file} is corrupt")
+        return None
+    grib_inventory = []
+    for inv_line in wgrib_inv.stdout.splitlines():
+        if inv_line.strip() == '':
+            continue
+        grib_inventory.append((inv_line, int(inv_line.split(':')[1])))
+    return grib_inventory
+
+def write_grib_records(grib_file, grib_inventory, record_match_list,
+                       output_file):
+    """! Write the GRIB records whose inventory lines match the
+         regular expressions to a file, copying each record's bytes
+         from the GRIB file; this gives the same file as running
+         wgrib/wgrib2 with -grib for each expression in order
+         and concatenating the output
+
+         Args:
+             grib_file         - string of the path to
+                                 the GRIB file
+             grib_inventory    - list of tuples of the record
+                                 inventory line and the byte the
+                                 record starts at, from
+                                 get_grib_inventory
+             record_match_list - list of regular expressions
+                                 to match inventory lines (strings)
+             output_file       - string of the path to
+                                 the GRIB file to write
+         Returns:
+             nrecords - number of records written (integer)
+    """
+    print(f"Writing records matching {' or '.join(record_match_list)} "
+          +f"from {grib_file} to {output_file}")
+    record_start_list = []
+    for record_match in record_match_list:
+        match_record_start_list = []
+        for inv_line, record_start in grib_inventory:
+            # Submessages share one GRIB message, which is written once
+            if re.search(record_match, inv_line) \
+                    and record_start not in match_record_start_list:
+                match_record_start_list.append(record_start)
+        record_start_list.extend(match_record_start_list)
+    with open(grib_file, 'rb') as grib_f, open(output_file, 'wb') as output_f:
+        for record_start in record_start_list:
+            grib_f.seek(record_start)
+            grib_header = grib_f.read(16)
+            if grib_header[0:4] != b'GRIB':
+                print(f"FATAL ERROR: No GRIB record at byte {record_start} "
+                      +f"of {grib_file}")
+                sys.exit(1)
+            if grib_header[7] == 2:
+                record_length = int.from_bytes(grib_header[8:16], 'big')
+            else:
+                record_length = int.from_bytes(grib_header[4:7], 'big')
+            grib_f.seek(record_start)
+            output_f.write(grib_f.read(record_length))
+    return len(record_start_list)
+
 def check_netcdf_file_corrupt(netcdf_file):
     """! Checks if netCDF file is corrupt
                 
@@ -416,6 +610,215 @@ def get_valid_hour(init_hour, forecast_hour):
     return valid_hour
 
 
+def merge_ptype(crain, csnow, cfrzr, cicep):
+    """! Merge the categorical precipitation types into one
+         precipitation type, set where exactly one of the types
+         is 1 (masked points count as not 1)
+
+         Args:
+             crain - array of categorical rain
+             csnow - array of categorical snow
+             cfrzr - array of categorical freezing rain
+             cicep - array of categorical ice pellets
+
+         Returns:
+             merged_ptype - array of merged precipitation type
+                            (0-none or mixed, 1-rain, 2-snow,
+                            3-freezing rain, 4-ice pellets)
+    """
+    ptype_is_one = [
+        np.ma.filled(ptype == 1.0, False)
+        for ptype in [crain, csnow, cfrzr, cicep]
+    ]
+    one_ptype = np.sum(ptype_is_one, axis=0) == 1
+    merged_ptype = np.zeros_like(crain)
+    merged_ptype[one_ptype] = np.select(ptype_is_one, [1, 2, 3, 4])[one_ptype]
+    return merged_ptype
+
+
+class FileFormat:
+    """! File naming convention parsed once into literal strings and
+         {option?fmt=} fields, see compile_file_format
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+    """
+    # Time information fields are filled from, as index into
+    # (valid time, initialization time, forecast hour), and if
+    # the field takes a shift
+    option_dict = {
+        'lead': (2, False), 'lead_shift': (2, True),
+        'valid': (0, False), 'valid_shift': (0, True),
+        'init': (1, False), 'init_shift': (1, True)
+    }
+    option_regex = re.compile(r'\{([^{}?/]+)\?fmt=([^}/]*)\}')
+
+    def __init__(self, unfilled_file_format):
+        self.unfilled_file_format = unfilled_file_format
+        self.chunk_list = []
+        for file_format_chunk in unfilled_file_format.split('/'):
+            token_list = []
+            literal_start = 0
+            for option_match in self.option_regex.finditer(file_format_chunk):
+                token_list.append(
+                    file_format_chunk[literal_start:option_match.start()]
+                )
+                token_list.append(self.parse_field(*option_match.group(0, 1, 2)))
+                literal_start = option_match.end()
+            token_list.append(file_format_chunk[literal_start:])
+            self.chunk_list.append(
+                [token for token in token_list if token != '']
+            )
+
+    def parse_field(self, field, option, fmt):
+        """! Parse one {option?fmt=} field
+
+             Args:
+                 field  - full field text (string)
+                 option - field option name (string)
+                 fmt    - field format, including shift (string)
+             Returns:
+                 parsed_field - field text if it is left as is
+                                (string), or time information index,
+                                option, format, shift, field text
+                                (tuple)
+        """
+        if option not in self.option_dict:
+            return (None, option, fmt, 0, field)
+        time_idx, takes_shift = self.option_dict[option]
+        if not takes_shift:
+            return (time_idx, option, fmt, 0, field)
+        shift = fmt.partition('shift=')[2]
+        fmt = fmt.partition('?')[0]
+        if field != '{'+option+'?fmt='+fmt+'?shift='+shift+'}':
+            return field
+        return (time_idx, option, fmt, int(shift), field)
+
+    def fill_field(self, parsed_field, time_info_value):
+        """! Fill one parsed field from its time information
+
+             Args:
+                 parsed_field    - field from parse_field (tuple)
+                 time_info_value - valid time, initialization time
+                                   (datetime) or forecast hour (string)
+             Returns:
+                 filled_field - filled field (string)
+        """
+        time_idx, option, fmt, shift, field = parsed_field
+        if time_idx == 2:
+            forecast_hour = time_info_value
+            if option == 'lead_shift':
+                forecast_hour = str(int(forecast_hour) + shift)
+            if fmt == '%1H':
+                if int(forecast_hour) < 10:
+                    return forecast_hour[1]
+                else:
+                    return forecast_hour
+            elif fmt == '%2H':
+                return forecast_hour.zfill(2)
+            elif fmt == '%3H':
+                return forecast_hour.zfill(3)
+            else:
+                return forecast_hour
+        if shift != 0:
+            time_info_value = time_info_value + datetime.timedelta(hours=shift)
+        return time_info_value.strftime(fmt)
+
+    def fill(self, valid_time_dt, init_time_dt, forecast_hour,
+             str_sub_dict={}):
+        """! Fill in the file naming convention
+
+             Args:
+                 valid_time_dt - valid time (datetime)
+                 init_time_dt  - initialization time (datetime)
+                 forecast_hour - forecast hour (string)
+                 str_sub_dict  - other strings to substitue (dictionary)
+             Returns:
+                 filled_file_format - file_format filled in with verifying
+                                      time information (string)
+        """
+        time_info = (valid_time_dt, init_time_dt, forecast_hour)
+        filled_chunk_list = []
+        for token_list in self.chunk_list:
+            filled_token_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    filled_token_list.append(token)
+                elif token[0] is None:
+                    filled_token_list.append(
+                        str_sub_dict.get(token[1], token[4])
+                    )
+                else:
+                    filled_token_list.append(
+                        self.fill_field(token, time_info[token[0]])
+                    )
+            filled_chunk_list.append(''.join(filled_token_list))
+        return os.path.join('/', *filled_chunk_list)
+
+    def fill_many(self, valid_time_dt_list, init_time_dt_list,
+                  forecast_hour_list, str_sub_dict={}):
+        """! Fill in the file naming convention for many times at once,
+             filling each field once per unique time
+
+             Args:
+                 valid_time_dt_list - valid times (list of datetimes)
+                 init_time_dt_list  - initialization times
+                                      (list of datetimes)
+                 forecast_hour_list - forecast hours (list of strings)
+                 str_sub_dict       - other strings to substitue
+                                      (dictionary)
+             Returns:
+                 filled_file_format_list - file_format filled in with
+                                           verifying time information
+                                           (list of strings)
+        """
+        time_info_list = [
+            list(valid_time_dt_list), list(init_time_dt_list),
+            list(forecast_hour_list)
+        ]
+        nfiles = len(time_info_list[2])
+        filled_chunk_column_list = []
+        for token_list in self.chunk_list:
+            token_column_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    token_column_list.append([token]*nfiles)
+                elif token[0] is None:
+                    token_column_list.append(
+                        [str_sub_dict.get(token[1], token[4])]*nfiles
+                    )
+                else:
+                    filled_field_dict = {}
+                    for time_info_value in time_info_list[token[0]]:
+                        if time_info_value not in filled_field_dict:
+                            filled_field_dict[time_info_value] = (
+                                self.fill_field(token, time_info_value)
+                            )
+                    token_column_list.append(
+                        [filled_field_dict[time_info_value]
+                         for time_info_value in time_info_list[token[0]]]
+                    )
+            filled_chunk_column_list.append(
+                [''.join(filled_tokens)
+                 for filled_tokens in zip(*token_column_list)]
+                if len(token_column_list) != 0 else ['']*nfiles
+            )
+        return [os.path.join('/', *filled_chunks)
+                for filled_chunks in zip(*filled_chunk_column_list)]
+
+@functools.lru_cache(maxsize=None)
+def compile_file_format(unfilled_file_format):
+    """! Parse a file naming convention once, cached by the
+         file naming convention
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+         Returns:
+             file_format - parsed file naming convention with fill
+                           and fill_many methods (FileFormat)
+    """
+    return FileFormat(unfilled_file_format)
+
 def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
                   forecast_hour, str_sub_dict):
     """! Creates a filled file path from a format
@@ -430,129 +833,9 @@ def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
              filled_file_format - file_format filled in with verifying
                                   time information (string)
     """
-    filled_file_format = '/'
-    format_opt_list = ['lead', 'lead_shift', 'valid', 'valid_shift',
-                       'init', 'init_shift']
-    if len(list(str_sub_dict.keys())) != 0:
-        format_opt_list = format_opt_list+list(str_sub_dict.keys())
-    for filled_file_format_chunk in unfilled_file_format.split('/'):
-        for format_opt in format_opt_list:
-            nformat_opt = (
-                filled_file_format_chunk.count('{'+format_opt+'?fmt=')
-            )
-            if nformat_opt > 0:
-               format_opt_count = 1
-               while format_opt_count <= nformat_opt:
-                   if format_opt in ['lead_shift', 'valid_shift',
-                                     'init_shift']:
-                       shift = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0].partition('shift=')[2]
-                       )
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0].partition('?')[0]
-                       )
-                   else:
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0]
-                       )
-                   if format_opt == 'valid':
-                       replace_format_opt_count = valid_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead':
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour) < 10:
-                               replace_format_opt_count = forecast_hour[1]
-                           else:
-                               replace_format_opt_count = forecast_hour
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = forecast_hour.zfill(2)
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = forecast_hour.zfill(3)
-                       else:
-                           replace_format_opt_count = forecast_hour
-                   elif format_opt == 'init':
-                       replace_format_opt_count = init_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead_shift':
-                       shift = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0].partition('shift=')[2]
-                       )
-                       forecast_hour_shift = str(int(forecast_hour)
-                                                 + int(shift))
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour_shift) < 10:
-                               replace_format_opt_count = (
-                                   forecast_hour_shift[1]
-                               )
-                           else:
-                               replace_format_opt_count = forecast_hour_shift
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(2)
-                           )
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(3)
-                           )
-                       else:
-                           replace_format_opt_count = forecast_hour_shift
-                   elif format_opt == 'init_shift':
-                       shift = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0].partition('shift=')[2]
-                       )
-                       init_shift_time_dt = (
-                           init_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = init_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'valid_shift':
-                       shift = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0].partition('shift=')[2]
-                       )
-                       valid_shift_time_dt = (
-                           valid_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = valid_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   else:
-                       replace_format_opt_count = str_sub_dict[format_opt]
-                   if format_opt in ['lead_shift', 'valid_shift', 'init_shift']:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt
-                               +'?shift='+shift+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   else:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   format_opt_count+=1
-        filled_file_format = os.path.join(filled_file_format,
-                                          filled_file_format_chunk)
-    return filled_file_format
+    return compile_file_format(unfilled_file_format).fill(
+        valid_time_dt, init_time_dt, forecast_hour, str_sub_dict
+    )
 
 def prep_prod_gfs_file(source_file, dest_file, init_dt, forecast_hour,
                        prep_method, log_missing_file):
@@ -573,45 +856,36 @@ def prep_prod_gfs_file(source_file, dest_file, init_dt, forecast_hour,
     if prep_method != 'wmo':
         print("ERROR: prep for gfs only for wmo")
         sys.exit(1)
-    # Environment variables and executables
-    WGRIB2 = os.environ['WGRIB2']
     # Working file names
     prepped_file = os.path.join(os.getcwd(),
                                 'atmos.'+dest_file.rpartition('/')[2])
-    working_file5 = prepped_file+'.tmp5'
     # Prep file
     if check_file_exists_size(source_file):
-        for num in range(1,5,1):
-            working_filenum = prepped_file+'.tmp'+str(num)
-            if num == 1:
-                num_match = (':(HGT|UGRD|VGRD|TMP|RH):'
-                             +'(925|850|700|500|250|100) mb:')
-            elif num == 2:
-                num_match = ':HGT:surface:'
-            elif num == 3:
-                num_match = ':(DPT|TMP|RH|UGRD|VGRD):(2|10) m above ground:'
-            elif num == 4:
-                if int(forecast_hour) == 0:
-                    num_match = ':TCDC:entire atmosphere:anl:'
-                else:
-                    num_match = (':TCDC:entire atmosphere:'
-                                 +forecast_hour+' hour fcst:')
-            run_shell_command(
-                [WGRIB2+' '+source_file+' -match "'+num_match+'" '
-                 +'-grib '+working_filenum]
-            )
-        if int(forecast_hour) <= 6:
-            wgrib2_apcp_grep = subprocess.run(
-                WGRIB2+' '+source_file+' | grep "APCP"',
-                shell=True, capture_output=True, encoding="utf8"
-            )
-            if wgrib2_apcp_grep.returncode == 0:
-                first_apcp_rec = wgrib2_apcp_grep.stdout.split(':')[0]
-                run_shell_command(
-                    [WGRIB2+' '+source_file+' '
-                     +"-match '^("+first_apcp_rec+"):' "
-                     +'-grib '+working_file5]
-                )
+        record_match_list = [
+            ':(HGT|UGRD|VGRD|TMP|RH):(925|850|700|500|250|100) mb:',
+            ':HGT:surface:',
+            ':(DPT|TMP|RH|UGRD|VGRD):(2|10) m above ground:'
+        ]
+        if int(forecast_hour) == 0:
+            record_match_list.append(':TCDC:entire atmosphere:anl:')
+        else:
+            record_match_list.append(':TCDC:entire atmosphere:'
+                                     +forecast_hour+' hour fcst:')
+        source_inventory = get_grib_inventory(source_file, 2)
+        if source_inventory is None:
+            print(f"FATAL ERROR: Cannot read records from {source_file}")
+            sys.exit(1)
+        # Precipitation is not used from the analysis file
+        if int(forecast_hour) == 0:
+            pass
+        elif int(forecast_hour) <= 6:
+            apcp_inv_line_list = [
+                inv_line for inv_line, record_start in source_inventory
+                if 'APCP' in inv_line
+            ]
+            if len(apcp_inv_line_list) != 0:
+                first_apcp_rec = apcp_inv_line_list[0].split(':')[0]
+                record_match_list.append('^('+first_apcp_rec+'):')
         else:
             if int(forecast_hour) % 24 == 0:
                 continuous_bucket = ('0-'+str(int(int(forecast_hour)/24))
@@ -620,21 +894,10 @@ def prep_prod_gfs_file(source_file, dest_file, init_dt, forecast_hour,
                 continuous_bucket = '0-'+forecast_hour+' hour acc fcst'
             sixhr_bucket = (str(int(forecast_hour)-(6-int(forecast_hour)%6))
                             +'-'+forecast_hour+' hour acc fcst')
-            run_shell_command(
-                [WGRIB2+' '+source_file
-                 +' -match ":APCP:surface:('+continuous_bucket+'|'
-                 +sixhr_bucket+'):" '
-                 +'-grib '+working_file5]
-            )
-        run_shell_command(['>', prepped_file])
-        if int(forecast_hour) == 0:
-            file_range = range(1,5,1)
-        else:
-            file_range = range(1,6,1)
-        for num in file_range:
-            working_filenum = prepped_file+'.tmp'+str(num)
-            if check_file_exists_size(working_filenum):
-                run_shell_command(['cat', working_filenum, '>>', prepped_file])
+            record_match_list.append(':APCP:surface:('+continuous_bucket+'|'
+                                     +sixhr_bucket+'):')
+        write_grib_records(source_file, source_inventory, record_match_list,
+                           prepped_file)
     else:
         log_missing_file_model(log_missing_file, source_file, 'gfs',
                                init_dt, str(forecast_hour).zfill(3))
@@ -777,7 +1040,6 @@ def prep_prod_jma_file(source_file_format, dest_file, init_dt, forecast_hour,
          Returns:
     """
     # Environment variables and executables
-    WGRIB = os.environ['WGRIB']
     EXECevs = os.environ['EXECevs']
     JMAMERGE = os.path.join(EXECevs, 'jma_merge')
     # Working file names
@@ -800,12 +1062,10 @@ def prep_prod_jma_file(source_file_format, dest_file, init_dt, forecast_hour,
             elif hem == 's':
                 working_file = working_file2
             if check_file_exists_size(hem_source_file):
-                if not check_grib1_file_corrupt(hem_source_file):
-                    run_shell_command(
-                        [WGRIB+' '+hem_source_file+' | grep "'+wgrib_fhr+'" | '
-                         +WGRIB+' '+hem_source_file+' -i -grib -o '
-                         +working_file]
-                    )
+                hem_source_inventory = get_grib_inventory(hem_source_file, 1)
+                if hem_source_inventory is not None:
+                    write_grib_records(hem_source_file, hem_source_inventory,
+                                       [re.escape(wgrib_fhr)], working_file)
             else:
                 log_missing_file_model(log_missing_file, hem_source_file,
                                        'jma', init_dt,
@@ -818,12 +1078,11 @@ def prep_prod_jma_file(source_file_format, dest_file, init_dt, forecast_hour,
     elif 'precip' in prep_method:
         source_file = source_file_format
         if check_file_exists_size(source_file):
-            if not check_grib1_file_corrupt(source_file):
-                run_shell_command(
-                    [WGRIB+' '+source_file+' | grep "0-'
-                     +forecast_hour+'hr" | '+WGRIB+' '+source_file
-                     +' -i -grib -o '+prepped_file]
-                )
+            source_inventory = get_grib_inventory(source_file, 1)
+            if source_inventory is not None:
+                write_grib_records(source_file, source_inventory,
+                                   [re.escape('0-'+forecast_hour+'hr')],
+                                   prepped_file)
         else:
             log_missing_file_model(log_missing_file, source_file, 'jma',
                                    init_dt, str(forecast_hour).zfill(3))
@@ -849,7 +1108,6 @@ def prep_prod_ecmwf_file(source_file, dest_file, init_dt, forecast_hour, prep_me
     EXECevs = os.environ['EXECevs']
     ECMGFSLOOKALIKENEW = os.path.join(EXECevs, 'ecm_gfs_look_alike_new')
     PCPCONFORM = os.path.join(EXECevs, 'pcpconform')
-    WGRIB = os.environ['WGRIB']
     # Working file names
     prepped_file = os.path.join(os.getcwd(),
                                 'atmos.'+dest_file.rpartition('/')[2])
@@ -863,12 +1121,10 @@ def prep_prod_ecmwf_file(source_file, dest_file, init_dt, forecast_hour, prep_me
         else:
             wgrib_fhr = ':'+forecast_hour+'hr'
         if check_file_exists_size(source_file):
-            if not check_grib1_file_corrupt(source_file):
-                run_shell_command(
-                    [WGRIB+' '+source_file+' | grep "'+wgrib_fhr+'" | '
-                     +WGRIB+' '+source_file+' -i -grib -o '
-                     +working_file1]
-                )
+            source_inventory = get_grib_inventory(source_file, 1)
+            if source_inventory is not None:
+                write_grib_records(source_file, source_inventory,
+                                   [re.escape(wgrib_fhr)], working_file1)
         else:
             log_missing_file_model(log_missing_file, source_file, 'ecmwf',
                                    init_dt, str(forecast_hour).zfill(3))
@@ -911,7 +1167,6 @@ def prep_prod_ukmet_file(source_file_format, dest_file, init_dt,
     """
     # Environment variables and executables
     EXECevs = os.environ['EXECevs']
-    WGRIB = os.environ['WGRIB']
     WGRIB2 = os.environ['WGRIB2']
     UKMHIRESMERGE = os.path.join(EXECevs, 'ukm_hires_merge')
     # Working file names
@@ -964,12 +1219,10 @@ def prep_prod_ukmet_file(source_file_format, dest_file, init_dt,
             source_file = source_file_format.replace('{letter?fmt=str}',
                                                      fhr_id)
             if check_file_exists_size(source_file):
-                if not check_grib1_file_corrupt(source_file):
-                    run_shell_command(
-                        [WGRIB+' '+source_file+' | grep "'+wgrib_fhr
-                         +'" | '+WGRIB+' '+source_file+' -i -grib -o '
-                         +working_file1]
-                    )
+                source_inventory = get_grib_inventory(source_file, 1)
+                if source_inventory is not None:
+                    write_grib_records(source_file, source_inventory,
+                                       [re.escape(wgrib_fhr)], working_file1)
             else:
                 log_missing_file_model(log_missing_file, source_file, 'ukmet',
                                        init_dt, str(forecast_hour).zfill(3))
@@ -994,12 +1247,14 @@ def prep_prod_ukmet_file(source_file_format, dest_file, init_dt,
             source_file_accum_fhr_start = (
                 int(forecast_hour) - source_file_accum
             )
-            run_shell_command(
-                [WGRIB+' '+working_file2+' | grep "'
-                 +str(source_file_accum_fhr_start)+'-'
-                 +forecast_hour+'hr" | '+WGRIB+' '+working_file2
-                 +' -i -grib -o '+prepped_file]
-            )
+            working_inventory = get_grib_inventory(working_file2, 1)
+            if working_inventory is None:
+                print(f"FATAL ERROR: Cannot read records from {working_file2}")
+                sys.exit(1)
+            write_grib_records(working_file2, working_inventory,
+                               [re.escape(str(source_file_accum_fhr_start)
+                                          +'-'+forecast_hour+'hr')],
+                               prepped_file)
     copy_file(prepped_file, dest_file)
 
 def prep_prod_dwd_file(source_file, dest_file, init_dt, forecast_hour,
@@ -1466,6 +1721,37 @@ def get_truth_file(valid_time_dt, obs, source_prod_file_format,
                 log_missing_file_truth(log_missing_file, source_file,
                                        obs, valid_time_dt)
 
+def fill_check_file_format(file_format, fhr_check_dict):
+    """! Fill in a file format for all the files of all the forecast
+         hours to check at once
+
+         Args:
+             file_format    - file naming convention (string)
+             fhr_check_dict - forecast hour files to check, with
+                              valid_date, init_date and forecast_hour
+                              for each (dictionary)
+         Returns:
+             fhr_file_dict - filled file path for each
+                             (forecast hour key, file key) (dictionary)
+    """
+    fhr_fileN_key_list = [
+        (fhr_key, fhr_fileN_key) for fhr_key in fhr_check_dict
+        for fhr_fileN_key in fhr_check_dict[fhr_key]
+    ]
+    if len(fhr_fileN_key_list) == 0:
+        return {}
+    fhr_fileN_dict_list = [
+        fhr_check_dict[fhr_key][fhr_fileN_key]
+        for fhr_key, fhr_fileN_key in fhr_fileN_key_list
+    ]
+    fhr_file_list = compile_file_format(file_format).fill_many(
+        [fhr_fileN_dict['valid_date'] for fhr_fileN_dict in fhr_fileN_dict_list],
+        [fhr_fileN_dict['init_date'] for fhr_fileN_dict in fhr_fileN_dict_list],
+        [fhr_fileN_dict['forecast_hour']
+         for fhr_fileN_dict in fhr_fileN_dict_list]
+    )
+    return dict(zip(fhr_fileN_key_list, fhr_file_list))
+
 def check_model_files(job_dict):
     """! Check what model files or don't exist
 
@@ -1492,6 +1778,9 @@ def check_model_files(job_dict):
     fhr_list = []
     fhr_check_input_dict = {}
     fhr_check_output_dict = {}
+    input_file_format = None
+    output_DATA_file_format = None
+    output_COMOUT_file_format = None
     job_dict_fhr_list = job_dict['fhr_list'].split(', ')
     for fhr in [int(i) for i in job_dict_fhr_list]:
         fhr_check_input_dict[str(fhr)] = {}
@@ -2035,17 +2324,13 @@ def check_model_files(job_dict):
                 'forecast_hour': str(fhr)
             }
     # Check input files
+    input_file_dict = fill_check_file_format(input_file_format,
+                                             fhr_check_input_dict)
     for fhr_key in list(fhr_check_input_dict.keys()):
         fhr_key_input_files_exist_list = []
         for fhr_fileN_key in list(fhr_check_input_dict[fhr_key].keys()):
-            fhr_fileN = format_filler(
-                input_file_format,
-                fhr_check_input_dict[fhr_key][fhr_fileN_key]['valid_date'],
-                fhr_check_input_dict[fhr_key][fhr_fileN_key]['init_date'],
-                fhr_check_input_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
-                {}
-            )
-            if os.path.exists(fhr_fileN):
+            fhr_fileN = input_file_dict[(fhr_key, fhr_fileN_key)]
+            if path_exists(fhr_fileN):
                 fhr_key_input_files_exist_list.append(True)
                 if job_dict['JOB_GROUP'] == 'reformat_data' \
                         and job_dict['job_name'] in ['GeoHeightAnom',
@@ -2073,23 +2358,18 @@ def check_model_files(job_dict):
     input_fhr_list = copy.deepcopy(fhr_list)
     # Check output files
     model_copy_output_DATA2COMOUT_list = []
+    output_DATA_file_dict = fill_check_file_format(output_DATA_file_format,
+                                                   fhr_check_output_dict)
+    output_COMOUT_file_dict = fill_check_file_format(
+        output_COMOUT_file_format, fhr_check_output_dict
+    )
     for fhr_key in list(fhr_check_output_dict.keys()):
         for fhr_fileN_key in list(fhr_check_output_dict[fhr_key].keys()):
-            fhr_fileN_DATA = format_filler(
-                output_DATA_file_format,
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['valid_date'],
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['init_date'],
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
-                {}
+            fhr_fileN_DATA = output_DATA_file_dict[(fhr_key, fhr_fileN_key)]
+            fhr_fileN_COMOUT = (
+                output_COMOUT_file_dict[(fhr_key, fhr_fileN_key)]
             )
-            fhr_fileN_COMOUT = format_filler(
-                output_COMOUT_file_format,
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['valid_date'],
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['init_date'],
-                fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
-                {}
-            )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
                 if fhr_check_output_dict[fhr_key]\
                         [fhr_fileN_key]['forecast_hour'] \
@@ -2226,7 +2506,7 @@ def check_truth_files(job_dict):
                 truth_input_file_list.append(pb2nc_file)
     truth_input_files_exist_list = []
     for truth_file in truth_input_file_list:
-        if os.path.exists(truth_file):
+        if path_exists(truth_file):
             truth_input_files_exist_list.append(True)
         else:
             truth_input_files_exist_list.append(False)
@@ -2253,7 +2533,11 @@ def check_stat_files(job_dict):
         'METplus_output', job_dict['RUN']+'.'+job_dict['DATE'],
         job_dict['MODEL'], job_dict['VERIF_CASE']
     )
-    stat_file_list = glob.glob(os.path.join(model_stat_file_dir, '*.stat'))
+    stat_file_list = [
+        stat_file for stat_file in (get_path_index_dir(model_stat_file_dir)
+                                    or {})
+        if stat_file.endswith('.stat') and not stat_file.startswith('.')
+    ]
     if len(stat_file_list) != 0:
         stat_files_exist = True
     else:
@@ -3040,12 +3324,9 @@ def build_df(job_group, logger, input_dir, output_dir, model_info_dict,
                 filtered_model_df = filtered_model_df[
                     filtered_model_df['FCST_VALID_BEG'].isin(met_format_valid_dates)
                 ]
-                filtered_model_df['FCST_VALID_BEG'] = pd.to_datetime(
-                    filtered_model_df['FCST_VALID_BEG'], format='%Y%m%d_%H%M%S'
-                )
-                filtered_model_df = filtered_model_df.sort_values(by='FCST_VALID_BEG')
-                filtered_model_df['FCST_VALID_BEG'] = (
-                    filtered_model_df['FCST_VALID_BEG'].dt.strftime('%Y%m%d_%H%M%S')
+                # YYYYmmdd_HHMMSS sorts the same as a string and as a date
+                filtered_model_df = filtered_model_df.sort_values(
+                    by='FCST_VALID_BEG', kind='stable'
                 )
                 filtered_model_df.to_csv(
                     filtered_model_stat_file, header=met_version_line_type_col_list,
@@ -3078,19 +3359,13 @@ def build_df(job_group, logger, input_dir, output_dir, model_info_dict,
                     else:
                         df_dtype_dict[col] = np.float64
                 model_stat_file_df = model_stat_file_df.astype(df_dtype_dict)
-                for valid_date in met_format_valid_dates:
-                    model_stat_file_df_valid_date_idx_list = (
-                        model_stat_file_df.index[
-                            model_stat_file_df['FCST_VALID_BEG'] == valid_date
-                        ]
-                    ).tolist()
-                    if len(model_stat_file_df_valid_date_idx_list) == 0:
-                        continue
-                    model_num_df.loc[(model_num_name, valid_date)] = (
-                        model_stat_file_df.loc\
-                        [model_stat_file_df_valid_date_idx_list[0]]\
-                        [:]
-                    )
+                # Use the first line for each valid date
+                model_num_df = model_stat_file_df.drop_duplicates(
+                    'FCST_VALID_BEG'
+                ).set_index('FCST_VALID_BEG', drop=False).reindex(
+                    met_format_valid_dates
+                )
+                model_num_df.index = model_num_df_index
                 # Do conversions if needed
                 #### K to F
                 if fcst_var_name in ['TMP', 'DPT', 'TMP_ANOM_DAILYAVG',
@@ -3120,61 +3395,34 @@ def build_df(job_group, logger, input_dir, output_dir, model_info_dict,
                 else:
                     convert = False
                 if convert:
-                    if line_type == 'SL1L2':
-                        fcst_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'FBAR'
-                        ]
-                        obs_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'OBAR'
-                        ]
-                        col1_list = ['FBAR', 'OBAR']
-                        col2_list = ['FOBAR', 'FFBAR', 'OOBAR']
-                    elif line_type == 'SAL1L2':
-                        fcst_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'FABAR'
-                        ]
-                        obs_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'OABAR'
-                        ]
-                        col1_list = ['FABAR', 'OABAR']
-                        col2_list = ['FOABAR', 'FFABAR', 'OOABAR']
-                    elif line_type == 'VL1L2':
-                        uf_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'UFBAR'
-                        ]
-                        vf_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'VFBAR'
-                        ]
-                        uo_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'UOBAR'
-                        ]
-                        vo_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'VOBAR'
-                        ]
-                        col1_list = ['UFBAR', 'VFBAR', 'UOBAR', 'VOBAR']
-                        col2_list = ['UVFOBAR', 'UVFFBAR', 'UVOOBAR']
-                    elif line_type == 'VAL1L2':
-                        uf_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'UFABAR'
-                        ]
-                        vf_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'VFABAR'
-                        ]
-                        uo_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'UOABAR'
-                        ]
-                        vo_avg_old = model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, 'VOABAR'
-                        ]
-                        col1_list = ['UFABAR', 'VFABAR', 'UOABAR', 'VOABAR']
-                        col2_list = ['UVFOABAR', 'UVFFABAR', 'UVOOABAR']
-                    for col in col1_list:
-                        model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, col
-                        ] = (coef
-                             * model_num_df.loc[model_num_df['FCST_UNITS'] \
-                                               == units_old, col]) \
-                            + const
+                    units_old_idx = model_num_df['FCST_UNITS'] == units_old
+                    if line_type in ['SL1L2', 'SAL1L2']:
+                        if line_type == 'SL1L2':
+                            col1_list = ['FBAR', 'OBAR']
+                            col2_list = ['FOBAR', 'FFBAR', 'OOBAR']
+                        else:
+                            col1_list = ['FABAR', 'OABAR']
+                            col2_list = ['FOABAR', 'FFABAR', 'OOABAR']
+                        fcst_avg_old, obs_avg_old = (
+                            model_num_df.loc[units_old_idx, col1_list[0]],
+                            model_num_df.loc[units_old_idx, col1_list[1]]
+                        )
+                    elif line_type in ['VL1L2', 'VAL1L2']:
+                        if line_type == 'VL1L2':
+                            col1_list = ['UFBAR', 'VFBAR', 'UOBAR', 'VOBAR']
+                            col2_list = ['UVFOBAR', 'UVFFBAR', 'UVOOBAR']
+                        else:
+                            col1_list = ['UFABAR', 'VFABAR', 'UOABAR',
+                                         'VOABAR']
+                            col2_list = ['UVFOABAR', 'UVFFABAR', 'UVOOABAR']
+                        uf_avg_old, vf_avg_old, uo_avg_old, vo_avg_old = (
+                            model_num_df.loc[units_old_idx, col]
+                            for col in col1_list
+                        )
+                    model_num_df.loc[units_old_idx, col1_list] = (
+                        (coef * model_num_df.loc[units_old_idx, col1_list])
+                        + const
+                    )
                     for col in col2_list:
                         if col in ['FOBAR', 'FOABAR']:
                             const2 =  ((coef * const * fcst_avg_old)
@@ -3193,15 +3441,11 @@ def build_df(job_group, logger, input_dir, output_dir, model_info_dict,
                         elif col in ['UVOOBAR', 'UVOOABAR']:
                             const2 = 2 * (coef * const * \
                                           (uo_avg_old+vo_avg_old))
-                        model_num_df.loc[
-                            model_num_df['FCST_UNITS'] == units_old, col
-                        ] = (coef**2
-                             *model_num_df.loc[model_num_df['FCST_UNITS'] \
-                                               == units_old, col]) \
-                             + const2 + const**2
-                    model_num_df.loc[
-                        model_num_df['FCST_UNITS'] == units_old, 'FCST_UNITS'
-                    ] = units_new
+                        model_num_df.loc[units_old_idx, col] = (
+                            (coef**2 * model_num_df.loc[units_old_idx, col])
+                            + const2 + const**2
+                        )
+                    model_num_df.loc[units_old_idx, 'FCST_UNITS'] = units_new
             else:
                 logger.debug(f"{filtered_model_stat_file} does not exist")
         if model_num == 'model1':
@@ -3688,3 +3932,355 @@ def calculate_average(logger, average_method, line_type, stat, df):
         logger.warning(f"{average_method} not recongnized..."
                        +"use mean, or aggregation...returning NaN")
     return average_value
+
+def get_job_script_env(job_file):
+    """! Get the environment variables exported in a job script
+         Args:
+             job_file - string of the job script path
+         Returns:
+             job_env_dict - dictionary of environment variable
+                            values keyed by name
+    """
+    job_env_dict = {}
+    with open(job_file, 'r') as jf:
+        for line in jf:
+            if line.startswith('export '):
+                name, _, value = line[len('export '):].strip().partition('=')
+                job_env_dict[name] = value.strip('"')
+    return job_env_dict
+
+def get_job_signature(job_file, signature_env_vars, models_env_var):
+    """! Get the key under which a job's run times are recorded: the
+         signature_env_vars exported in the job script and its number
+         of models, for reading, then a hash of the whole job script,
+         so jobs that differ only in their loops or commands are told
+         apart. Values that change from run to run (the DATA path,
+         dates, and job numbers) are left out of the hash.
+         Args:
+             job_file           - string of the job script path
+             signature_env_vars - list of environment variables
+                                  exported in the job script
+                                  that identify the job
+             models_env_var     - string of the environment variable
+                                  listing the job's models
+         Returns:
+             job_signature - string of the job signature
+    """
+    job_env_dict = get_job_script_env(job_file)
+    models = [
+        model for model in re.split(r'[,\s]+',
+                                    job_env_dict.get(models_env_var, ''))
+        if model
+    ]
+    with open(job_file, 'r') as jf:
+        job_script = jf.read()
+    DATA = os.environ.get('DATA', '')
+    if DATA:
+        job_script = job_script.replace(DATA, '$DATA')
+    job_script = re.sub(r'\d{8,}', 'D', job_script)
+    job_script = re.sub(r'job\d+', 'job', job_script)
+    job_signature = ':'.join(
+        [re.sub(r'\s+', '', job_env_dict.get(env_var, ''))
+         for env_var in signature_env_vars]
+        + [str(len(models)),
+           hashlib.sha1(job_script.encode('utf-8')).hexdigest()[:12]]
+    )
+    return job_signature
+
+def read_job_runtime_history(runtime_history_file, nrecent=5):
+    """! Read the most recent run times recorded for each job signature
+         Args:
+             runtime_history_file - string of the run time history
+                                    file path
+             nrecent              - integer of the number of most
+                                    recent run times to keep
+         Returns:
+             runtime_history - dictionary of lists of run times
+                               (seconds), oldest first, keyed by
+                               job signature
+    """
+    runtime_history = {}
+    if os.path.exists(runtime_history_file):
+        with open(runtime_history_file, 'r') as rhf:
+            for line in rhf:
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) != 2:
+                    continue
+                try:
+                    runtime = float(cols[1])
+                except ValueError:
+                    continue
+                runtime_history.setdefault(cols[0], []).append(runtime)
+    runtime_history = {
+        job_signature: runtimes[-nrecent:]
+        for job_signature, runtimes in runtime_history.items()
+    }
+    return runtime_history
+
+def trim_job_runtime_history(runtime_history_file, nrecent=5):
+    """! Rewrite the run time history file keeping only the most
+         recent run times of each job signature, the only ones
+         get_job_runtimes reads, so the file does not grow with
+         every run. Other jobs may be appending run times at the
+         same time, so the file is rewritten in place while holding
+         the lock they take to append.
+         Args:
+             runtime_history_file - string of the run time history
+                                    file path
+             nrecent              - integer of the number of most
+                                    recent run times to keep
+         Returns:
+    """
+    if not os.path.exists(runtime_history_file):
+        return
+    with open(runtime_history_file, 'r+') as rhf:
+        fcntl.flock(rhf, fcntl.LOCK_EX)
+        runtime_history = read_job_runtime_history(runtime_history_file,
+                                                   nrecent)
+        rhf.seek(0)
+        for job_signature, runtimes in runtime_history.items():
+            for runtime in runtimes:
+                rhf.write(f"{job_signature}\t{runtime:.0f}\n")
+        rhf.truncate()
+
+def get_job_runtimes(runtime_history_file, nrecent=5):
+    """! Get the mean of the most recent run times recorded for each
+         job signature
+         Args:
+             runtime_history_file - string of the run time history
+                                    file path
+             nrecent              - integer of the number of most
+                                    recent run times to average
+         Returns:
+             job_runtimes - dictionary of run times (seconds)
+                            keyed by job signature
+    """
+    # Run times are recorded in whole seconds, so count at least one
+    job_runtimes = {
+        job_signature: max(np.mean(runtimes), 1.)
+        for job_signature, runtimes
+        in read_job_runtime_history(runtime_history_file, nrecent).items()
+    }
+    return job_runtimes
+
+def get_static_job_cost(job_signature):
+    """! Get the cost of a job that has no recorded run time: the
+         number of models times the number of days in the
+         evaluation period
+         Args:
+             job_signature - string of the job signature
+         Returns:
+             static_job_cost - integer of the static cost
+    """
+    fields = job_signature.split(':')
+    ndays = 1
+    for field in fields[:-2]:
+        ndays_match = re.search(r'(\d+)DAYS', field.upper())
+        if ndays_match:
+            ndays = int(ndays_match.group(1))
+    static_job_cost = max(int(fields[-2]), 1)*ndays
+    return static_job_cost
+
+def get_job_costs(job_signatures, job_runtimes):
+    """! Get the estimated cost of each job: its recorded run time if
+         there is one, otherwise its static cost scaled by the seconds
+         per unit of static cost seen in jobs that have run times
+         Args:
+             job_signatures - list of job signature strings
+             job_runtimes   - dictionary of run times (seconds)
+                              keyed by job signature
+         Returns:
+             job_costs - list of estimated costs (seconds)
+    """
+    seen_job_signatures = set(job_signatures) & set(job_runtimes)
+    if seen_job_signatures:
+        seconds_per_cost = np.median([
+            job_runtimes[job_signature]/get_static_job_cost(job_signature)
+            for job_signature in seen_job_signatures
+        ])
+    else:
+        seconds_per_cost = 1.
+    job_costs = [
+        job_runtimes[job_signature] if job_signature in job_runtimes
+        else get_static_job_cost(job_signature)*seconds_per_cost
+        for job_signature in job_signatures
+    ]
+    return job_costs
+
+def get_plot_job_dependencies(job_group_list, job_group_env_dict):
+    """! Get the jobs each plotting job must wait for. A job waits
+         for the jobs of earlier job groups whose DATAjob directory
+         is its own DATAjob directory or a parent of it, since those
+         write the files it reads. A job with no such jobs waits for
+         every job of the nearest earlier job group with the same
+         VERIF_TYPE.
+         Args:
+             job_group_list     - list of job groups in run order
+             job_group_env_dict - dictionary keyed by job group of
+                                  dictionaries of job script
+                                  environment variables keyed by
+                                  job script path
+         Returns:
+             job_deps_dict - dictionary of lists of job script
+                             paths keyed by job script path
+    """
+    job_deps_dict = {}
+    earlier_DATAjob_dict = {}
+    for group_idx, job_group in enumerate(job_group_list):
+        for job_file, job_env_dict in job_group_env_dict[job_group].items():
+            job_deps = []
+            if 'DATAjob' in job_env_dict:
+                DATAjob = os.path.normpath(job_env_dict['DATAjob'])
+                while DATAjob != os.path.dirname(DATAjob):
+                    job_deps.extend(earlier_DATAjob_dict.get(DATAjob, []))
+                    DATAjob = os.path.dirname(DATAjob)
+            if not job_deps:
+                for earlier_job_group in job_group_list[:group_idx][::-1]:
+                    job_deps = [
+                        earlier_job_file for earlier_job_file, earlier_env_dict
+                        in job_group_env_dict[earlier_job_group].items()
+                        if earlier_env_dict.get('VERIF_TYPE') \
+                            == job_env_dict.get('VERIF_TYPE')
+                    ]
+                    if job_deps:
+                        break
+            job_deps_dict[job_file] = job_deps
+        # Jobs of a group only wait for jobs of earlier groups
+        for job_file, job_env_dict in job_group_env_dict[job_group].items():
+            if 'DATAjob' in job_env_dict:
+                earlier_DATAjob_dict.setdefault(
+                    os.path.normpath(job_env_dict['DATAjob']), []
+                ).append(job_file)
+    return job_deps_dict
+
+def run_task_dag(task_cmd_dict, task_deps_dict, task_priority_dict, nproc,
+                 task_log_file, host_list=None, remote_launcher=''):
+    """! Run tasks as subprocesses, at most nproc at a time on each
+         host, starting each task as soon as every task it depends
+         on has finished successfully. Tasks whose dependencies
+         failed are skipped.
+         Args:
+             task_cmd_dict      - dictionary of commands (lists of
+                                  strings) keyed by task name
+             task_deps_dict     - dictionary of lists of task names
+                                  each task depends on, keyed by
+                                  task name
+             task_priority_dict - dictionary of numbers keyed by task
+                                  name; of the tasks ready to run,
+                                  those with the largest start first
+             nproc              - integer of the number of tasks to
+                                  run at once on each host
+             task_log_file      - string of the path of the file to
+                                  write each task's host, start and
+                                  end times, maximum resident set
+                                  size, and exit status to
+             host_list          - list of hosts other than this one
+                                  to also run tasks on, or None to
+                                  run tasks only on this one
+             remote_launcher    - string of the command prefix to run
+                                  a task on another host, with {host}
+                                  in place of the host name
+         Returns:
+             task_result_dict - dictionary keyed by task name of
+                                dictionaries with the task's exit
+                                status, run time (seconds), and
+                                maximum resident set size (KB, None
+                                for tasks run on another host), or
+                                None if the task was skipped
+    """
+    if host_list is None:
+        host_list = []
+    task_dependents_dict = {task: [] for task in task_cmd_dict}
+    task_nwaiting_dict = {}
+    for task in task_cmd_dict:
+        task_deps = set(task_deps_dict.get(task, []))
+        task_nwaiting_dict[task] = len(task_deps)
+        for dep_task in task_deps:
+            task_dependents_dict[dep_task].append(task)
+    ready_task_heap = []
+    for task_idx, task in enumerate(task_cmd_dict):
+        if task_nwaiting_dict[task] == 0:
+            heapq.heappush(ready_task_heap,
+                           (-task_priority_dict.get(task, 0), task_idx, task))
+    task_idx_dict = {task: idx for idx, task in enumerate(task_cmd_dict)}
+    host_nfree_dict = {'localhost': int(nproc)}
+    for host in host_list:
+        host_nfree_dict[host] = int(nproc)
+    running_task_dict = {}
+    task_result_dict = {}
+    run_start = datetime.datetime.now()
+    with open(task_log_file, 'w') as tlf:
+        tlf.write('\t'.join(['TASK', 'HOST', 'START', 'END', 'SECONDS',
+                             'MAX_RSS_KB', 'STATUS'])+'\n')
+        while ready_task_heap or running_task_dict:
+            while ready_task_heap:
+                host = max(host_nfree_dict, key=host_nfree_dict.get)
+                if host_nfree_dict[host] == 0:
+                    break
+                _, _, task = heapq.heappop(ready_task_heap)
+                task_cmd = task_cmd_dict[task]
+                if host != 'localhost':
+                    task_cmd = (
+                        remote_launcher.format(host=host).split()+task_cmd
+                    )
+                task_start = datetime.datetime.now()
+                print(f"Starting {task} on {host}")
+                proc = subprocess.Popen(task_cmd)
+                host_nfree_dict[host]-=1
+                running_task_dict[proc.pid] = (task, host, task_start, proc)
+            pid, wait_status, rusage = os.wait4(-1, 0)
+            if pid not in running_task_dict:
+                continue
+            task, host, task_start, proc = running_task_dict.pop(pid)
+            proc.returncode = os.waitstatus_to_exitcode(wait_status)
+            task_end = datetime.datetime.now()
+            host_nfree_dict[host]+=1
+            # A remote task's usage is the launcher's, not the task's
+            if host == 'localhost':
+                max_rss_kb = rusage.ru_maxrss
+            else:
+                max_rss_kb = None
+            task_result_dict[task] = {
+                'status': proc.returncode,
+                'seconds': (task_end-task_start).total_seconds(),
+                'max_rss_kb': max_rss_kb
+            }
+            tlf.write('\t'.join([
+                task, host, task_start.isoformat(timespec='seconds'),
+                task_end.isoformat(timespec='seconds'),
+                f"{task_result_dict[task]['seconds']:.1f}",
+                'NA' if max_rss_kb is None else str(max_rss_kb),
+                str(proc.returncode)
+            ])+'\n')
+            tlf.flush()
+            print(f"Finished {task} on {host} with exit status "
+                  +f"{proc.returncode}")
+            if proc.returncode == 0:
+                for dependent_task in task_dependents_dict[task]:
+                    task_nwaiting_dict[dependent_task]-=1
+                    if task_nwaiting_dict[dependent_task] == 0:
+                        heapq.heappush(
+                            ready_task_heap,
+                            (-task_priority_dict.get(dependent_task, 0),
+                             task_idx_dict[dependent_task], dependent_task)
+                        )
+            else:
+                skip_task_list = list(task_dependents_dict[task])
+                while skip_task_list:
+                    skip_task = skip_task_list.pop()
+                    if skip_task in task_result_dict:
+                        continue
+                    print(f"Skipping {skip_task} because {task} failed")
+                    task_result_dict[skip_task] = None
+                    tlf.write('\t'.join([skip_task, '-', '-', '-', '-', '-',
+                                         'SKIPPED'])+'\n')
+                    skip_task_list.extend(task_dependents_dict[skip_task])
+    nskipped = list(task_result_dict.values()).count(None)
+    nfailed = len([
+        task_result for task_result in task_result_dict.values()
+        if task_result is not None and task_result['status'] != 0
+    ])
+    print(f"Ran {len(task_result_dict)-nskipped} tasks, {nfailed} of which "
+          +f"failed, and skipped {nskipped} tasks in "
+          +f"{(datetime.datetime.now()-run_start).total_seconds():.0f} s")
+    return task_result_dict
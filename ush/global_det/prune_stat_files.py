@@ -15,7 +15,7 @@ Abstract: This script is run by all scripts in the verif_plotting software.
 '''
 
 import glob
-import subprocess
+import itertools
 import os
 import re
 import sys
@@ -31,6 +31,46 @@ def daterange(start, end, td):
       yield curr
       curr+=td
 
+# MET .stat header columns, used when a file is missing its header line
+MET_STAT_HEADER_COLS = [
+   'VERSION', 'MODEL', 'DESC', 'FCST_LEAD', 'FCST_VALID_BEG',
+   'FCST_VALID_END', 'OBS_LEAD', 'OBS_VALID_BEG', 'OBS_VALID_END',
+   'FCST_VAR', 'FCST_UNITS', 'FCST_LEV', 'OBS_VAR', 'OBS_UNITS', 'OBS_LEV',
+   'OBTYPE', 'VX_MASK', 'INTERP_MTHD', 'INTERP_PNTS', 'FCST_THRESH',
+   'OBS_THRESH', 'COV_THRESH', 'ALPHA', 'LINE_TYPE'
+]
+
+def read_stat_file_header(msf):
+   '''Return the header columns of an open MET .stat file and an iterator
+      over the lines that follow the header'''
+   first_line = msf.readline()
+   header_cols = first_line.split()
+   if header_cols[:1] == ['VERSION']:
+      return header_cols, msf
+   return MET_STAT_HEADER_COLS, itertools.chain([first_line], msf)
+
+def prune_stat_file(met_stat_file, pmsf, column_filters):
+   '''Stream one MET .stat file and write to the open file object pmsf
+      every line whose header columns each hold one of the accepted
+      values. Columns are compared whole, so e.g. a CONUS filter does
+      not keep CONUS_East lines.
+
+      column_filters: dict of {MET header column name: accepted values}
+   '''
+   with open(met_stat_file, 'r', encoding='UTF-8') as msf:
+      header_cols, lines = read_stat_file_header(msf)
+      col_tests = [
+         (header_cols.index(col_name), set(accepted))
+         for col_name, accepted in column_filters.items()
+      ]
+      max_idx = max(idx for idx, accepted in col_tests)
+      for line in lines:
+         cols = line.split(None, max_idx+1)
+         if len(cols) <= max_idx:
+            continue
+         if all(cols[idx] in accepted for idx, accepted in col_tests):
+            pmsf.write(line if line.endswith('\n') else line+'\n')
+
 def expand_met_stat_files(met_stat_files, data_dir, output_base_template, RUN_case, 
                           RUN_type, line_type, vx_mask, var_name, model, 
                           obtype, eval_period, valid):
@@ -86,33 +126,25 @@ def prune_data(data_dir, prune_dir, tmp_dir, output_base_template, valid_range,
          continue
       with open(met_stat_files[0]) as msf:
          met_header_cols = msf.readline()
-      all_grep_output = ''
+      column_filters = {
+         'MODEL': [model],
+         'VX_MASK': [vx_mask],
+         'FCST_VAR': [name.strip() for name in fcst_var_names],
+         'LINE_TYPE': [line_type],
+      }
       if RUN_type == 'anom' and 'HGT' in var_name:
          print("Pruning "+data_dir+" files for model "+model+", vx_mask "
                +vx_mask+", variable "+'/'.join(fcst_var_names)+", line_type "+line_type
                +", interp "+os.environ['INTERP'])
-         filter_cmd = (
-            ' | grep "'+vx_mask
-            +'" | grep "'+'\|'.join(fcst_var_names)
-            +'" | grep "'+line_type
-            +'" | grep "'+os.environ['INTERP']+'"'
-         )
+         column_filters['INTERP_MTHD'] = [os.environ['INTERP']]
       else:
          print("Pruning "+data_dir+" files for model "+model+", vx_mask "
                +vx_mask+", variable "+'/'.join(fcst_var_names)+", line_type "+line_type)
-         filter_cmd = (
-            ' | grep "'+vx_mask
-            +'" | grep "'+'\|'.join(fcst_var_names)
-            +'" | grep "'+line_type+'"'
-         )
       # Prune the MET .stat files and write to new file
-      for met_stat_file in met_stat_files:
-         grep = subprocess.run('grep -R "'+model+'" '+met_stat_file+filter_cmd,
-                               shell=True, capture_output=True, encoding="utf8")
-         grep_output = grep.stdout
-         all_grep_output = all_grep_output+grep_output
       pruned_met_stat_file = os.path.join(pruned_data_dir,
                                           model+'.stat')
       with open(pruned_met_stat_file, 'w') as pmsf:
-         pmsf.write(met_header_cols+all_grep_output)
+         pmsf.write(met_header_cols)
+         for met_stat_file in met_stat_files:
+            prune_stat_file(met_stat_file, pmsf, column_filters)
    print("END: "+os.path.basename(__file__))
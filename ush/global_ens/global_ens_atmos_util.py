@@ -1,13 +1,14 @@
 #! /usr/bin/env python3
 
 import os
+import re
+import functools
 import datetime
 import numpy as np
 import subprocess
 import shutil
 import sys
 import netCDF4 as netcdf
-import numpy as np
 import glob
 import pandas as pd
 from time import sleep
@@ -237,6 +238,230 @@ def get_time_info(date_start, date_end, date_type, init_hr_list, valid_hr_list,
         date_dt = date_dt + datetime.timedelta(hours=int(date_type_hr_inc))
     return time_info
 
+class FileFormat:
+    """! File naming convention parsed once into literal strings and
+         {option?fmt=} fields, see compile_file_format
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+    """
+    # Time information fields are filled from, as index into
+    # (valid time, initialization time, forecast hour), and if
+    # the field takes a shift
+    option_dict = {
+        'lead': (2, False), 'lead_shift': (2, True),
+        'valid': (0, False), 'valid_shift': (0, True),
+        'init': (1, False), 'init_shift': (1, True)
+    }
+    option_regex = re.compile(r'\{([^{}?/]+)\?fmt=([^}/]*)\}')
+
+    def __init__(self, unfilled_file_format):
+        self.unfilled_file_format = unfilled_file_format
+        self.chunk_list = []
+        for file_format_chunk in unfilled_file_format.split('/'):
+            token_list = []
+            literal_start = 0
+            filled_shift_field_list = self.get_filled_shift_fields(
+                file_format_chunk
+            )
+            for option_match in self.option_regex.finditer(file_format_chunk):
+                token_list.append(
+                    file_format_chunk[literal_start:option_match.start()]
+                )
+                field, option, fmt = option_match.group(0, 1, 2)
+                if self.option_dict.get(option, (None, False))[1] \
+                        and field not in filled_shift_field_list:
+                    token_list.append(field)
+                else:
+                    token_list.append(self.parse_field(field, option, fmt))
+                literal_start = option_match.end()
+            token_list.append(file_format_chunk[literal_start:])
+            self.chunk_list.append(
+                [token for token in token_list if token != '']
+            )
+
+    def get_filled_shift_fields(self, file_format_chunk):
+        """! Get the shift fields of a chunk that are filled. This
+             util's format_filler always read a shift from the chunk's
+             first "shift=" and its format up to the chunk's last "?",
+             filling the options in option_dict order, so a shift field
+             is only filled when those make up the field; any other
+             shift field is left as is
+
+             Args:
+                 file_format_chunk - file naming convention between
+                                     slashes (string)
+             Returns:
+                 filled_shift_field_list - shift fields to fill
+                                           (list of strings)
+        """
+        filled_shift_field_list = []
+        for option, (time_idx, takes_shift) in self.option_dict.items():
+            option_start = '{'+option+'?fmt='
+            for noption in range(file_format_chunk.count(option_start)):
+                fmt = file_format_chunk.partition(option_start)[2]
+                if takes_shift:
+                    shift = (file_format_chunk.partition('shift=')[2]
+                             .partition('}')[0])
+                    field = (option_start+fmt.rpartition('?')[0]
+                             +'?shift='+shift+'}')
+                    if field in file_format_chunk:
+                        filled_shift_field_list.append(field)
+                else:
+                    field = option_start+fmt.partition('}')[0]+'}'
+                # Filled fields have no "?" or "shift=" left in them
+                file_format_chunk = file_format_chunk.replace(field, '\0')
+        return filled_shift_field_list
+
+    def parse_field(self, field, option, fmt):
+        """! Parse one {option?fmt=} field
+
+             Args:
+                 field  - full field text (string)
+                 option - field option name (string)
+                 fmt    - field format, including shift (string)
+             Returns:
+                 parsed_field - field text if it is left as is
+                                (string), or time information index,
+                                option, format, shift, field text
+                                (tuple)
+        """
+        if option not in self.option_dict:
+            return (None, option, fmt, 0, field)
+        time_idx, takes_shift = self.option_dict[option]
+        if not takes_shift:
+            return (time_idx, option, fmt, 0, field)
+        shift = fmt.partition('shift=')[2]
+        fmt = fmt.rpartition('?')[0]
+        if field != '{'+option+'?fmt='+fmt+'?shift='+shift+'}':
+            return field
+        return (time_idx, option, fmt, int(shift), field)
+
+    def fill_field(self, parsed_field, time_info_value):
+        """! Fill one parsed field from its time information
+
+             Args:
+                 parsed_field    - field from parse_field (tuple)
+                 time_info_value - valid time, initialization time
+                                   (datetime) or forecast hour (string)
+             Returns:
+                 filled_field - filled field (string)
+        """
+        time_idx, option, fmt, shift, field = parsed_field
+        if time_idx == 2:
+            forecast_hour = time_info_value
+            if option == 'lead_shift':
+                forecast_hour = str(int(forecast_hour) + shift)
+            if fmt == '%1H':
+                if int(forecast_hour) < 10:
+                    return forecast_hour[1]
+                else:
+                    return forecast_hour
+            elif fmt == '%2H':
+                return forecast_hour.zfill(2)
+            elif fmt == '%3H':
+                return forecast_hour.zfill(3)
+            else:
+                return forecast_hour
+        if shift != 0:
+            time_info_value = time_info_value + datetime.timedelta(hours=shift)
+        return time_info_value.strftime(fmt)
+
+    def fill(self, valid_time_dt, init_time_dt, forecast_hour,
+             str_sub_dict={}):
+        """! Fill in the file naming convention
+
+             Args:
+                 valid_time_dt - valid time (datetime)
+                 init_time_dt  - initialization time (datetime)
+                 forecast_hour - forecast hour (string)
+                 str_sub_dict  - other strings to substitue (dictionary)
+             Returns:
+                 filled_file_format - file_format filled in with verifying
+                                      time information (string)
+        """
+        time_info = (valid_time_dt, init_time_dt, forecast_hour)
+        filled_chunk_list = []
+        for token_list in self.chunk_list:
+            filled_token_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    filled_token_list.append(token)
+                elif token[0] is None:
+                    filled_token_list.append(
+                        str_sub_dict.get(token[1], token[4])
+                    )
+                else:
+                    filled_token_list.append(
+                        self.fill_field(token, time_info[token[0]])
+                    )
+            filled_chunk_list.append(''.join(filled_token_list))
+        return os.path.join('/', *filled_chunk_list)
+
+    def fill_many(self, valid_time_dt_list, init_time_dt_list,
+                  forecast_hour_list, str_sub_dict={}):
+        """! Fill in the file naming convention for many times at once,
+             filling each field once per unique time
+
+             Args:
+                 valid_time_dt_list - valid times (list of datetimes)
+                 init_time_dt_list  - initialization times
+                                      (list of datetimes)
+                 forecast_hour_list - forecast hours (list of strings)
+                 str_sub_dict       - other strings to substitue
+                                      (dictionary)
+             Returns:
+                 filled_file_format_list - file_format filled in with
+                                           verifying time information
+                                           (list of strings)
+        """
+        time_info_list = [
+            list(valid_time_dt_list), list(init_time_dt_list),
+            list(forecast_hour_list)
+        ]
+        nfiles = len(time_info_list[2])
+        filled_chunk_column_list = []
+        for token_list in self.chunk_list:
+            token_column_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    token_column_list.append([token]*nfiles)
+                elif token[0] is None:
+                    token_column_list.append(
+                        [str_sub_dict.get(token[1], token[4])]*nfiles
+                    )
+                else:
+                    filled_field_dict = {}
+                    for time_info_value in time_info_list[token[0]]:
+                        if time_info_value not in filled_field_dict:
+                            filled_field_dict[time_info_value] = (
+                                self.fill_field(token, time_info_value)
+                            )
+                    token_column_list.append(
+                        [filled_field_dict[time_info_value]
+                         for time_info_value in time_info_list[token[0]]]
+                    )
+            filled_chunk_column_list.append(
+                [''.join(filled_tokens)
+                 for filled_tokens in zip(*token_column_list)]
+                if len(token_column_list) != 0 else ['']*nfiles
+            )
+        return [os.path.join('/', *filled_chunks)
+                for filled_chunks in zip(*filled_chunk_column_list)]
+
+@functools.lru_cache(maxsize=None)
+def compile_file_format(unfilled_file_format):
+    """! Parse a file naming convention once, cached by the
+         file naming convention
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+         Returns:
+             file_format - parsed file naming convention with fill
+                           and fill_many methods (FileFormat)
+    """
+    return FileFormat(unfilled_file_format)
+
 def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
                   forecast_hour, str_sub_dict):
     """! Creates a filled file path from a format
@@ -251,118 +476,9 @@ def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
              filled_file_format - file_format filled in with verifying
                                   time information (string)
     """
-    filled_file_format = '/'
-    format_opt_list = ['lead', 'lead_shift', 'valid', 'valid_shift',
-                       'init', 'init_shift']
-    if len(list(str_sub_dict.keys())) != 0:
-        format_opt_list = format_opt_list+list(str_sub_dict.keys())
-    for filled_file_format_chunk in unfilled_file_format.split('/'):
-        for format_opt in format_opt_list:
-            nformat_opt = (
-                filled_file_format_chunk.count('{'+format_opt+'?fmt=')
-            )
-            if nformat_opt > 0:
-               format_opt_count = 1
-               while format_opt_count <= nformat_opt:
-                   if format_opt in ['lead_shift', 'valid_shift',
-                                     'init_shift']:
-                       shift = (filled_file_format_chunk \
-                                .partition('shift=')[2] \
-                                .partition('}')[0])
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .rpartition('?')[0]
-                       )
-                   else:
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0]
-                       )
-                   if format_opt == 'valid':
-                       replace_format_opt_count = valid_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead':
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour) < 10:
-                               replace_format_opt_count = forecast_hour[1]
-                           else:
-                               replace_format_opt_count = forecast_hour
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = forecast_hour.zfill(2)
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = forecast_hour.zfill(3)
-                       else:
-                           replace_format_opt_count = forecast_hour
-                   elif format_opt == 'init':
-                       replace_format_opt_count = init_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       forecast_hour_shift = str(int(forecast_hour)
-                                                 + int(shift))
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour_shift) < 10:
-                               replace_format_opt_count = (
-                                   forecast_hour_shift[1]
-                               )
-                           else:
-                               replace_format_opt_count = forecast_hour_shift
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(2)
-                           )
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(3)
-                           )
-                       else:
-                           replace_format_opt_count = forecast_hour_shift
-                   elif format_opt == 'init_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       init_shift_time_dt = (
-                           init_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = init_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'valid_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       valid_shift_time_dt = (
-                           valid_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = valid_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   else:
-                       replace_format_opt_count = str_sub_dict[format_opt]
-                   if format_opt in ['lead_shift', 'valid_shift', 'init_shift']:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt
-                               +'?shift='+shift+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   else:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   format_opt_count+=1
-        filled_file_format = os.path.join(filled_file_format,
-                                          filled_file_format_chunk)
-    return filled_file_format
+    return compile_file_format(unfilled_file_format).fill(
+        valid_time_dt, init_time_dt, forecast_hour, str_sub_dict
+    )
 
 def prep_prod_gfs_file(source_file, dest_file, forecast_hour, prep_method):
     """! Do prep work for GFS production files
@@ -2122,7 +2122,8 @@ def equalize_samples(logger, df, group_by):
             'FCST_THRESH_VALUE', 'OBS_LEV']
         if key in df.keys()
     ]
-    df_groups = df.groupby(group_by)
+    # rows missing a group_by key belong to no group
+    df_groups = df.dropna(subset=group_by).groupby(group_by)
     indexes = []
     # List all of the independent variables that are found in the data
     unique_indep_vars = np.unique(np.array(list(df_groups.groups.keys())).T[1])
@@ -2147,12 +2148,30 @@ def equalize_samples(logger, df, group_by):
         # cols_to_check) to reduce comp time in the next in the next step
         match_these = df_merged.drop_duplicates()
         # Get all the indices for rows in each group that match the merged df
+        # (on all columns in cols_to_check but the first), using a hash 
+        # lookup on the merged keys instead of a row-by-row list search
+        match_cols = cols_to_check[1:]
+        if match_cols:
+            match_keys = pd.MultiIndex.from_frame(
+                match_these[match_cols].drop_duplicates()
+            )
+            # NaN never equals NaN, so a row missing a numeric key matches
+            # nothing, as in the row-by-row comparison this replaced
+            nan_match_cols = [
+                col for col in match_cols
+                if pd.api.types.is_numeric_dtype(df[col])
+            ]
         for dfs_i in dfs:
-            for idx, row in dfs_i.iterrows():
-                if (
-                        row.to_numpy()[1:].tolist() 
-                        in match_these.to_numpy()[:,1:].tolist()):
-                    indexes.append(idx)
+            if not match_cols:
+                if not match_these.empty:
+                    indexes.extend(dfs_i.index)
+                continue
+            is_match = pd.MultiIndex.from_frame(
+                dfs_i[match_cols]
+            ).isin(match_keys)
+            if nan_match_cols:
+                is_match &= ~dfs_i[nan_match_cols].isna().any(axis=1).to_numpy()
+            indexes.extend(dfs_i.index[is_match])
     # Select the matched rows by index among the rows in the original DataFrame
     df_equalized = df.loc[indexes]
     # Remove duplicates again, this time among both the columns 
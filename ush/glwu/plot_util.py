@@ -11,6 +11,10 @@ warnings.filterwarnings('ignore')
    @brief Provides utility functions for METplus plotting use case
 """
 
+# Seed and per-array memory limit (MB) for bootstrap resampling
+BOOTSTRAP_SEED = 20230101
+BOOTSTRAP_MAX_MEM_PER_ARRAY = 32
+
 def get_date_arrays(date_type, date_beg, date_end,
                     fcst_valid_hour, fcst_init_hour,
                     obs_valid_hour, obs_init_hour,
@@ -633,6 +637,52 @@ def get_stat_plot_name(logger, stat):
       exit(1)
    return stat_plot_name
 
+def get_bootstrap_indices(n, size, nrepl, seed=BOOTSTRAP_SEED):
+   """! Generate the bootstrap resample indices in memory-bounded chunks
+        of replicates. Each chunk comes from a Generator seeded on
+        (seed, n, size, chunk start), so the same sample size always gets
+        the same resamples, which are then shared across statistics and
+        across models with the same samples.
+
+        Args:
+           n     - integer number of samples to draw from
+           size  - integer number of draws per replicate
+           nrepl - integer number of replicates
+           seed  - integer seed for the resampling
+
+        Yields:
+           idxs  - (chunk of nrepl) x size array of sample indices
+   """
+   max_array_size = BOOTSTRAP_MAX_MEM_PER_ARRAY*1E6/8
+   chunk_size = max(1, int(max_array_size/size))
+   for b in range(0, nrepl, chunk_size):
+      rng = np.random.default_rng([seed, n, size, b])
+      yield rng.integers(0, n, size=(min(chunk_size, nrepl-b), size))
+
+def bootstrap_resample(summary_stats, nrepl, size=None, agg=np.mean):
+   """! Resample several summary statistics with one shared index matrix
+
+        Args:
+           summary_stats - list of equal-length 1-D arrays
+           nrepl         - integer number of replicates
+           size          - integer number of draws per replicate
+                           (default: length of the arrays)
+           agg           - function reducing each replicate along axis 1
+
+        Returns:
+           samples       - list with an nrepl-length array of the
+                           aggregated replicates for each summary_stat
+   """
+   arrays = [np.asarray(summary_stat, dtype=float) for summary_stat in summary_stats]
+   n = len(arrays[0])
+   if size is None:
+      size = n
+   samples = [[] for _ in arrays]
+   for idxs in get_bootstrap_indices(n, size, nrepl):
+      for s, array in enumerate(arrays):
+         samples[s].append(agg(array[idxs], axis=1))
+   return [np.concatenate(sample) for sample in samples]
+
 def calculate_bootstrap_ci(logger, bs_method, model_data, stat, nrepl, level, 
                            bs_min_samp):
    """! Calculate the upper and lower bound bootstrap statistic from the 
@@ -765,18 +815,20 @@ def calculate_bootstrap_ci(logger, bs_method, model_data, stat, nrepl, level,
          ctc_all = np.array([fy_oy_all, fy_on_all, fn_oy_all, fn_on_all])
          prob_ctc_all = ctc_all/total_all.astype(float)
          # sample over events in the aggregated contingency table
-         fy_oy_samp,fy_on_samp,fn_oy_samp,fn_on_samp = np.random.multinomial(
+         rng = np.random.default_rng(BOOTSTRAP_SEED)
+         fy_oy_samp,fy_on_samp,fn_oy_samp,fn_on_samp = rng.multinomial(
             total_all, 
             prob_ctc_all, 
             size=nrepl
          ).T
       elif line_type == 'SL1L2':
          fo_matched_est = []
+         rng = np.random.default_rng(BOOTSTRAP_SEED)
          fvar = ffbar-fbar*fbar
          ovar = oobar-obar*obar
          focovar = fobar-fbar*obar
          for i, _ in enumerate(total):
-            fo_matched_est_i = np.random.multivariate_normal(
+            fo_matched_est_i = rng.multivariate_normal(
                [fbar[i], obar[i]], 
                [[fvar[i],focovar[i]],[focovar[i],ovar[i]]], 
                size=int(total[i])
@@ -788,59 +840,18 @@ def calculate_bootstrap_ci(logger, bs_method, model_data, stat, nrepl, level,
          fobar_est_mean = np.mean(np.prod(fo_matched_est, axis=1))
          ffbar_est_mean = np.mean(fo_matched_est[:,0]*fo_matched_est[:,0])
          oobar_est_mean = np.mean(fo_matched_est[:,1]*fo_matched_est[:,1])
-         max_mem_per_array = 32 # MB
-         max_array_size = max_mem_per_array*1E6/8
-         batch_size = int(max_array_size/len(fo_matched_est))
-         fbar_est_samples = []
-         obar_est_samples = []
-         fobar_est_samples = []
-         ffbar_est_samples = []
-         oobar_est_samples = []
-         # attempt to bootstrap in batches to save time
-         # if sampling array is too large for batches, traditional bootstrap
-         if batch_size <= 1:
-            for _ in range(nrepl):
-               fo_matched_indices = np.random.choice(
-                  len(fo_matched_est), 
-                  size=fo_matched_est.size, 
-                  replace=True
-               )
-               f_est_bs, o_est_bs = fo_matched_est[fo_matched_indices].T
-               fbar_est_samples.append(f_est_bs.mean())
-               obar_est_samples.append(o_est_bs.mean())
-               fobar_est_samples.append(np.mean(f_est_bs*o_est_bs))
-               ffbar_est_samples.append(np.mean(f_est_bs*f_est_bs))
-               oobar_est_samples.append(np.mean(o_est_bs*o_est_bs))
-            fbar_est_samp = np.array(fbar_est_samples)
-            obar_est_samp = np.array(obar_est_samples)
-            fobar_est_samp = np.array(fobar_est_samples)
-            ffbar_est_samp = np.array(ffbar_est_samples)
-            oobar_est_samp = np.array(oobar_est_samples)
-         else:
-            rep_arr = np.arange(0,nrepl)
-            for b in range(0, nrepl, batch_size):
-               curr_batch_size = len(rep_arr[b:b+batch_size])
-               idxs = [
-                  np.random.choice(
-                     len(fo_matched_est), 
-                     size=fo_matched_est.size, 
-                     replace=True
-                  ) 
-                  for _ in range(curr_batch_size)
-               ]
-               f_est_bs, o_est_bs = [
-                  np.take(fo_matched_est.T[i], idxs) for i in [0,1]
-               ]
-               fbar_est_samples.append(f_est_bs.mean(axis=1))
-               obar_est_samples.append(o_est_bs.mean(axis=1))
-               fobar_est_samples.append((f_est_bs*o_est_bs).mean(axis=1))
-               ffbar_est_samples.append((f_est_bs*f_est_bs).mean(axis=1))
-               oobar_est_samples.append((o_est_bs*o_est_bs).mean(axis=1))
-            fbar_est_samp = np.concatenate((fbar_est_samples))
-            obar_est_samp = np.concatenate((obar_est_samples))
-            fobar_est_samp = np.concatenate((fobar_est_samples))
-            ffbar_est_samp = np.concatenate((ffbar_est_samples))
-            oobar_est_samp = np.concatenate((oobar_est_samples))
+         (
+            fbar_est_samp, obar_est_samp, fobar_est_samp, ffbar_est_samp, 
+            oobar_est_samp
+         ) = bootstrap_resample(
+            [
+               fo_matched_est[:,0], fo_matched_est[:,1], 
+               np.prod(fo_matched_est, axis=1), 
+               fo_matched_est[:,0]*fo_matched_est[:,0], 
+               fo_matched_est[:,1]*fo_matched_est[:,1]
+            ], 
+            nrepl, size=fo_matched_est.size
+         )
       else:
          logger.error(line_type+" is not currently a valid option")
          exit(1)
@@ -856,89 +867,19 @@ def calculate_bootstrap_ci(logger, bs_method, model_data, stat, nrepl, level,
       lower_pctile = 100.*((1.-level)/2.)
       upper_pctile = 100.-lower_pctile
       if line_type == 'CTC':
-         ctc = np.array([fy_oy, fy_on, fn_oy, fn_on])
-         fy_oy_samp, fy_on_samp, fn_oy_samp, fn_on_samp = [
-            [] for item in range(4)
-         ]
-         for _ in range(nrepl):
-            ctc_bs = ctc.T[
-               np.random.choice(
-                  range(len(ctc.T)), 
-                  size=len(ctc.T), 
-                  replace=True
-               )
-            ].sum(axis=0)
-            fy_oy_samp.append(ctc_bs[0])
-            fy_on_samp.append(ctc_bs[1])
-            fn_oy_samp.append(ctc_bs[2])
-            fn_on_samp.append(ctc_bs[3])
-         fy_oy_samp = np.array(fy_oy_samp)
-         fy_on_samp = np.array(fy_on_samp)
-         fn_oy_samp = np.array(fn_oy_samp)
-         fn_on_samp = np.array(fn_on_samp)
+         fy_oy_samp, fy_on_samp, fn_oy_samp, fn_on_samp = bootstrap_resample(
+            [fy_oy, fy_on, fn_oy, fn_on], nrepl, agg=np.sum
+         )
       elif line_type == 'SL1L2':
          fbar_est_mean = fbar.mean()
          obar_est_mean = obar.mean()
          fobar_est_mean = fobar.mean()
          ffbar_est_mean = ffbar.mean()
          oobar_est_mean = oobar.mean()
-         max_mem_per_array = 32 # MB
-         max_array_size = max_mem_per_array*1E6/8
-         batch_size = int(max_array_size/len(fbar))
-         fbar_samples = []
-         obar_samples = []
-         fobar_samples = []
-         ffbar_samples = []
-         oobar_samples = []
-         # attempt to bootstrap in batches to save time
-         # if sampling array is too large for batches, traditional bootstrap
-         if batch_size <= 1:
-            for _ in range(nrepl):
-               idx = np.random.choice(
-                  len(fbar), 
-                  size=fbar.size, 
-                  replace=True
-               )
-               fbar_bs, obar_bs, fobar_bs, ffbar_bs, oobar_bs = [
-                  summary_stat[idx].T 
-                  for summary_stat in [fbar, obar, fobar, ffbar, oobar]
-               ]
-               fbar_samples.append(fbar_bs.mean())
-               obar_samples.append(obar_bs.mean())
-               fobar_samples.append(fobar_bs.mean())
-               ffbar_samples.append(ffbar_bs.mean())
-               oobar_samples.append(oobar_bs.mean())
-            fbar_est_samp = np.array(fbar_samples)
-            obar_est_samp = np.array(obar_samples)
-            fobar_est_samp = np.array(fobar_samples)
-            ffbar_est_samp = np.array(ffbar_samples)
-            oobar_est_samp = np.array(oobar_samples)
-         else:
-            rep_arr = np.arange(0,nrepl)
-            for b in range(0, nrepl, batch_size):
-               curr_batch_size = len(rep_arr[b:b+batch_size])
-               idxs = [
-                  np.random.choice(
-                     len(fbar), 
-                     size=fbar.size, 
-                     replace=True
-                  ) 
-                  for _ in range(curr_batch_size)
-               ]
-               fbar_bs, obar_bs, fobar_bs, ffbar_bs, oobar_bs = [
-                  np.take(np.array(summary_stat), idxs) 
-                  for s, summary_stat in enumerate([fbar, obar, fobar, ffbar, oobar])
-               ]
-               fbar_samples.append(fbar_bs.mean(axis=1))
-               obar_samples.append(obar_bs.mean(axis=1))
-               fobar_samples.append(fobar_bs.mean(axis=1))
-               ffbar_samples.append(ffbar_bs.mean(axis=1))
-               oobar_samples.append(oobar_bs.mean(axis=1))
-            fbar_est_samp = np.concatenate((fbar_samples))
-            obar_est_samp = np.concatenate((obar_samples))
-            fobar_est_samp = np.concatenate((fobar_samples))
-            ffbar_est_samp = np.concatenate((ffbar_samples))
-            oobar_est_samp = np.concatenate((oobar_samples))
+         (
+            fbar_est_samp, obar_est_samp, fobar_est_samp, ffbar_est_samp, 
+            oobar_est_samp
+         ) = bootstrap_resample([fbar, obar, fobar, ffbar, oobar], nrepl)
       else:
          logger.error(line_type+" is not currently a valid option")
          exit(1)
@@ -1664,7 +1605,8 @@ def equalize_samples(logger, df, group_by):
             'FCST_THRESH_VALUE', 'OBS_LEV']
         if key in df.keys()
     ]
-    df_groups = df.groupby(group_by)
+    # rows missing a group_by key belong to no group
+    df_groups = df.dropna(subset=group_by).groupby(group_by)
     indexes = []
     # List all of the independent variables that are found in the data
     unique_indep_vars = np.unique(np.array(list(df_groups.groups.keys())).T[1])
@@ -1689,12 +1631,30 @@ def equalize_samples(logger, df, group_by):
         # cols_to_check) to reduce comp time in the next in the next step
         match_these = df_merged.drop_duplicates()
         # Get all the indices for rows in each group that match the merged df
+        # (on all columns in cols_to_check but the first), using a hash 
+        # lookup on the merged keys instead of a row-by-row list search
+        match_cols = cols_to_check[1:]
+        if match_cols:
+            match_keys = pd.MultiIndex.from_frame(
+                match_these[match_cols].drop_duplicates()
+            )
+            # NaN never equals NaN, so a row missing a numeric key matches
+            # nothing, as in the row-by-row comparison this replaced
+            nan_match_cols = [
+                col for col in match_cols
+                if pd.api.types.is_numeric_dtype(df[col])
+            ]
         for dfs_i in dfs:
-            for idx, row in dfs_i.iterrows():
-                if (
-                        row.to_numpy()[1:].tolist() 
-                        in match_these.to_numpy()[:,1:].tolist()):
-                    indexes.append(idx)
+            if not match_cols:
+                if not match_these.empty:
+                    indexes.extend(dfs_i.index)
+                continue
+            is_match = pd.MultiIndex.from_frame(
+                dfs_i[match_cols]
+            ).isin(match_keys)
+            if nan_match_cols:
+                is_match &= ~dfs_i[nan_match_cols].isna().any(axis=1).to_numpy()
+            indexes.extend(dfs_i.index[is_match])
     # Select the matched rows by index among the rows in the original DataFrame
     df_equalized = df.loc[indexes]
     # Remove duplicates again, this time among both the columns 
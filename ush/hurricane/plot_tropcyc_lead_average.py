@@ -4,7 +4,6 @@ import sys
 import numpy as np
 #import plot_util as plot_util
 import plot_tropcyc_util as plot_util
-import pandas as pd
 import warnings
 import matplotlib
 import math
@@ -255,29 +254,15 @@ print("Working on track and intensity error plots for "+plot_info)
 print("Reading in data")
 summary_tcst_filename = os.path.join(tc_stat_file_dir, 'tc_stat.out')
 if os.path.exists(summary_tcst_filename):
-    nrow = sum(1 for line in open(summary_tcst_filename))
-    if nrow == 3:
+    tc_stat_job, summary_tcst_data = plot_util.read_tc_stat_summary(
+        summary_tcst_filename
+    )
+    if len(summary_tcst_data) == 0:
         print("ERROR: "+summary_tcst_filename+" empty")
         sys.exit(1)
     else:
         print(summary_tcst_filename+" exists")
-        summary_tcst_file = open(summary_tcst_filename, 'r')
-        tc_stat_job = summary_tcst_file.readline()
-        summary_tcst_read_columns = summary_tcst_file.readline().split(' ')
-        summary_tcst_file.close()
-        tc_stat_summary_job_columns = []
-        for col in summary_tcst_read_columns:
-            if col != '':
-                tc_stat_summary_job_columns.append(col.rstrip())
-        summary_tcst_data = pd.read_csv(summary_tcst_filename,
-                                        sep=" ", skiprows=2,
-                                        skipinitialspace=True,
-                                        header=None, dtype=str,
-                                        names=tc_stat_summary_job_columns)
-        summary_tcst_data_groupby_COLUMN = (
-            summary_tcst_data.groupby(['COLUMN'])
-        )
-        for COLUMN_group in summary_tcst_data_groupby_COLUMN.groups.keys():
+        for COLUMN_group in summary_tcst_data.index.unique('COLUMN'):
             print("Creating plot for "+COLUMN_group)
             if COLUMN_group == 'AMAX_WIND-BMAX_WIND':
                 formal_stat_name = 'Intensity Bias (knots)'
@@ -291,15 +276,11 @@ if os.path.exists(summary_tcst_filename):
                 formal_stat_name =  'Cross Track Bias (nm)'
             else:
                 formal_stat_name = COLUMN_group
-            summary_tcst_data_COLUMN = (
-                summary_tcst_data_groupby_COLUMN.get_group(COLUMN_group)
-            )
-            summary_tcst_data_COLUMN_groupby_AMODEL = (
-                summary_tcst_data_COLUMN.groupby(['AMODEL'])
-            )
-            nmodels = len(
-                summary_tcst_data_COLUMN_groupby_AMODEL.groups.keys()
+            summary_tcst_data_COLUMN = summary_tcst_data.loc[COLUMN_group]
+            tcstat_file_AMODEL_list = (
+                summary_tcst_data_COLUMN.index.unique('AMODEL')
             )
+            nmodels = len(tcstat_file_AMODEL_list)
             if nmodels != len(model_tmp_atcf_name_list):
                 print("ERROR: Model(s) missing in "+summary_tcst_filename)
                 continue
@@ -324,8 +305,9 @@ if os.path.exists(summary_tcst_filename):
             CI_bar_intvl_widths = (
                 (CI_bar_max_widths-CI_bar_min_widths)/nmodels
             )
-            tcstat_file_AMODEL_list = (
-                summary_tcst_data_COLUMN_groupby_AMODEL.groups.keys()
+            lead_arrays_dict = plot_util.get_tc_stat_summary_lead_arrays(
+                summary_tcst_data_COLUMN, model_tmp_atcf_name_list, fhrs,
+                ['MEAN', 'TOTAL', 'MEAN_NCL', 'MEAN_NCU']
             )
             for AMODEL in model_tmp_atcf_name_list:
                 AMODEL_idx = model_tmp_atcf_name_list.index(AMODEL)
@@ -338,87 +320,18 @@ if os.path.exists(summary_tcst_filename):
                 model_plot_settings_dict = (
                     model_obs_plot_settings_dict['model'+str(model_num)]
                 )
-                fhrs_column_amodel_mean = np.full_like(fhrs, np.nan,
-                                                       dtype=float)
-                fhrs_column_amodel_total = np.full_like(fhrs, np.nan,
-                                                        dtype=float)
-                fhrs_column_amodel_mean_ncl = np.full_like(fhrs, np.nan,
-                                                           dtype=float)
-                fhrs_column_amodel_mean_ncu = np.full_like(fhrs, np.nan,
-                                                           dtype=float)
-                if AMODEL not in tcstat_file_AMODEL_list:
-                    print("Data for "+AMODEL+" missing...setting to NaN")
-                else:
-                    summary_tcst_data_COLUMN_AMODEL = (
-                        summary_tcst_data_COLUMN_groupby_AMODEL. \
-                        get_group(AMODEL)
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_LEAD = (
-                        summary_tcst_data_COLUMN_AMODEL['LEAD'].values
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_MEAN = np.asarray(
-                        summary_tcst_data_COLUMN_AMODEL['MEAN'].values,
-                        dtype=float
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_TOTAL = np.asarray(
-                        summary_tcst_data_COLUMN_AMODEL['TOTAL'].values,
-                        dtype=float
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_MEAN_NCL = np.asarray(
-                        summary_tcst_data_COLUMN_AMODEL['MEAN_NCL'].values,
-                        dtype=float
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_MEAN_NCU = np.asarray(
-                        summary_tcst_data_COLUMN_AMODEL['MEAN_NCU'].values,
-                        dtype=float
-                    )
-                    summary_tcst_data_COLUMN_AMODEL_STDEV = np.asarray(
-                        summary_tcst_data_COLUMN_AMODEL['STDEV'].values,
-                        dtype=float
-                    )
-                    leads_list = []
-                    for lead in summary_tcst_data_COLUMN_AMODEL_LEAD:
-                        if lead[0] != '0':
-                            leads_list.append(lead[0:3])
-                        else:
-                            leads_list.append(lead[1:3])
-                    leads = np.asarray(leads_list, dtype=int)
-                    for fhr in fhrs:
-                        fhr_idx = np.where(fhr == fhrs)[0][0]
-                        if fhr in leads:
-                            matching_lead_idx = np.where(fhr == leads)[0][0]
-                            fhrs_column_amodel_mean[fhr_idx] = (
-                                summary_tcst_data_COLUMN_AMODEL_MEAN[
-                                    matching_lead_idx
-                                ]
-                            )
-                            fhrs_column_amodel_total[fhr_idx] = (
-                                summary_tcst_data_COLUMN_AMODEL_TOTAL[
-                                    matching_lead_idx
-                                ]
-                            )
-                            fhrs_column_amodel_mean_ncl[fhr_idx] = (
-                                summary_tcst_data_COLUMN_AMODEL_MEAN_NCL[
-                                    matching_lead_idx
-                                ]
-                            )
-                            fhrs_column_amodel_mean_ncu[fhr_idx] = (
-                                summary_tcst_data_COLUMN_AMODEL_MEAN_NCU[
-                                    matching_lead_idx
-                                ]
-                            )
-                fhrs_column_amodel_mean = np.ma.masked_invalid(
-                    fhrs_column_amodel_mean
-                )
-                fhrs_column_amodel_total = np.ma.masked_invalid(
-                    fhrs_column_amodel_total
+                fhrs_column_amodel_mean = lead_arrays_dict['MEAN'][AMODEL_idx]
+                fhrs_column_amodel_total = (
+                    lead_arrays_dict['TOTAL'][AMODEL_idx]
                 )
-                fhrs_column_amodel_mean_ncl = np.ma.masked_invalid(
-                    fhrs_column_amodel_mean_ncl
+                fhrs_column_amodel_mean_ncl = (
+                    lead_arrays_dict['MEAN_NCL'][AMODEL_idx]
                 )
-                fhrs_column_amodel_mean_ncu = np.ma.masked_invalid(
-                    fhrs_column_amodel_mean_ncu
+                fhrs_column_amodel_mean_ncu = (
+                    lead_arrays_dict['MEAN_NCU'][AMODEL_idx]
                 )
+                if AMODEL not in tcstat_file_AMODEL_list:
+                    print("Data for "+AMODEL+" missing...setting to NaN")
                 if model_num == 1:
                     all_amodel_total = [fhrs_column_amodel_total]
                 else:
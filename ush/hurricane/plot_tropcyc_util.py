@@ -1074,3 +1074,74 @@ def get_ci_file(stat, input_filename, fcst_lead, output_base_dir, ci_method):
     CI_file = os.path.join(output_base_dir, 'data',
                            CI_filename)
     return CI_file
+
+def read_tc_stat_summary(summary_tcst_filename):
+    """! Read a TC-Stat summary job output file once
+
+             Args:
+                 summary_tcst_filename - string of the path to the
+                                         TC-Stat summary job output
+                                         file
+
+             Returns:
+                 tc_stat_job       - string of the TC-Stat job line
+                 summary_tcst_data - dataframe of the summary
+                                     statistics, indexed by COLUMN,
+                                     AMODEL, and LEAD (in hours),
+                                     with the statistics columns
+                                     (TOTAL onward) numeric
+    """
+    with open(summary_tcst_filename, 'r') as summary_tcst_file:
+        tc_stat_job = summary_tcst_file.readline()
+        tc_stat_summary_job_columns = summary_tcst_file.readline().split()
+        summary_tcst_data = pd.read_csv(summary_tcst_file, sep=r'\s+',
+                                        header=None, dtype=str,
+                                        names=tc_stat_summary_job_columns)
+    # Statistics columns start at TOTAL, after COLUMN and the
+    # -by columns
+    for col in tc_stat_summary_job_columns[
+            tc_stat_summary_job_columns.index('TOTAL'):]:
+        summary_tcst_data[col] = pd.to_numeric(summary_tcst_data[col],
+                                               errors='coerce')
+    # LEAD is HHHMMSS
+    summary_tcst_data['LEAD'] = np.where(
+        summary_tcst_data['LEAD'].str[0] != '0',
+        summary_tcst_data['LEAD'].str[0:3],
+        summary_tcst_data['LEAD'].str[1:3]
+    ).astype(int)
+    summary_tcst_data = (
+        summary_tcst_data.drop_duplicates(['COLUMN', 'AMODEL', 'LEAD'])
+        .set_index(['COLUMN', 'AMODEL', 'LEAD']).sort_index()
+    )
+    return tc_stat_job, summary_tcst_data
+
+def get_tc_stat_summary_lead_arrays(summary_tcst_data_COLUMN, AMODEL_list,
+                                    fhrs, stat_list):
+    """! Get the summary statistics of each model and forecast hour
+         for one TC-Stat summary COLUMN
+
+             Args:
+                 summary_tcst_data_COLUMN - dataframe of the summary
+                                            statistics for one COLUMN,
+                                            indexed by AMODEL and LEAD
+                 AMODEL_list              - list of models
+                 fhrs                     - array of forecast hours
+                 stat_list                - list of statistics columns
+
+             Returns:
+                 lead_arrays_dict - dictionary of statistics column and
+                                    masked array of its values
+                                    (models by forecast hours),
+                                    masked where there is no data
+    """
+    summary_tcst_data_COLUMN_lead = (
+        summary_tcst_data_COLUMN[stat_list].unstack('LEAD')
+        .reindex(index=AMODEL_list,
+                 columns=pd.MultiIndex.from_product([stat_list, fhrs]))
+    )
+    lead_arrays_dict = {}
+    for stat in stat_list:
+        lead_arrays_dict[stat] = np.ma.masked_invalid(
+            summary_tcst_data_COLUMN_lead[stat].to_numpy(dtype=float)
+        )
+    return lead_arrays_dict
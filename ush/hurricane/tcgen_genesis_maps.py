@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+'''
+Name: tcgen_genesis_maps.py
+Abstract: This script plots the TC genesis hits, false alarms, and
+          hits/false alarms maps for each basin and model from the
+          MET TC-Gen GENMPR output. Each basin map is drawn once and
+          used for all of its models and maps.
+'''
+
+import os
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import cartopy
+import cartopy.crs as ccrs
+import cartopy.feature as cfeature
+
+print("BEGIN: "+os.path.basename(__file__))
+
+# Read in environment variables
+DATA = os.environ['DATA']
+COMINstats = os.environ['COMINstats']
+YEAR = os.environ['YEAR']
+TCGENdays = os.environ['TCGENdays']
+basin_list = os.environ['basinlist'].split()
+model_list = os.environ['modellist'].split()
+cartopy.config['data_dir'] = os.environ['cartopyDataDir']
+
+# GENMPR lines for each genesis category, as matched by
+# their INIT_TDIFF and DEV_CAT columns
+category_match_dict = {
+    'hits': ['00    FYOY'],
+    'false': ['00    FYON', 'NA    FYON']
+}
+# AGEN_LAT and AGEN_LON columns
+genmpr_lat_col, genmpr_lon_col = 31, 32
+category_plot_dict = {
+    'hits': {'marker': 'o', 'color': 'green',
+             'label': 'Hits', 'label_color': 'Green'},
+    'false': {'marker': 's', 'color': 'red',
+              'label': 'False alarms', 'label_color': 'Red'}
+}
+# Map settings for each basin; the axis labels are annotated
+# by hand at offset points, and the legend of each map image
+# is category, marker lon, marker lat, label x offset, label y offset
+basin_map_dict = {
+    'al': {
+        'central_longitude': -55.0,
+        'extent': [260, 370, -5, 50],
+        'xticks': [-130, -120, -110, -100, -90, -80, -70, -60, -50, -40,
+                   -30, -20, -10, 0, 10],
+        'yticks': [-5, 0, 10, 20, 30, 40, 50],
+        'coastline_linewidth': 0.30,
+        'gshhs_color': 'black',
+        'axis_label_list': [
+            ('0 ', -6, 18), ('10N ', -15, 52), ('20N ', -15, 85),
+            ('30N ', -15, 120), ('40N ', -15, 157),
+            ('90W ', 27, -5), ('80W ', 60, -5), ('70W ', 92, -5),
+            ('60W ', 125, -5), ('50W ', 157, -5), ('40W ', 189, -5),
+            ('30W ', 220, -5), ('20W ', 253, -5), ('10W ', 286, -5),
+            ('0 ', 323, -5)
+        ],
+        'product_legend_dict': {
+            'hits': [('hits', 346, 47, 286, 185)],
+            'falseAlarm': [('false', 346, 47, 286, 185)],
+            'HitFalse': [('hits', 346, 47.5, 286, 186),
+                         ('false', 346, 45, 286, 177)]
+        }
+    },
+    'ep': {
+        'central_longitude': -60.0,
+        'extent': [180, 290, 0, 50],
+        'xticks': [-70, -80, -90, -100, -110, -120, -130, -140, -150, -160,
+                   -170, -180],
+        'yticks': [0, 10, 20, 30, 40, 50],
+        'coastline_linewidth': 0.30,
+        'gshhs_color': 'black',
+        'axis_label_list': [
+            ('40N ', -15, 140), ('30N ', -15, 104), ('20N ', -15, 69),
+            ('10N ', -15, 35),
+            ('80W ', 318, -5), ('90W ', 286, -5), ('100W ', 250, -5),
+            ('110W ', 218, -5), ('120W ', 185, -5), ('130W ', 152, -5),
+            ('140W ', 119, -5), ('150W ', 87, -5), ('160W ', 55, -5),
+            ('170W ', 23, -5)
+        ],
+        'product_legend_dict': {
+            'hits': [('hits', 185, 47, 20, 168)],
+            'falseAlarm': [('false', 185, 47, 20, 168)],
+            'HitFalse': [('hits', 185, 47, 20, 168),
+                         ('false', 185, 45, 20, 160)]
+        }
+    },
+    'wp': {
+        'central_longitude': 80.0,
+        'extent': [100, 180, 0, 50],
+        'xticks': [100, 110, 120, 130, 140, 150, 160, 170, 180],
+        'yticks': [0, 10, 20, 30, 40, 50],
+        'coastline_linewidth': 0.80,
+        'gshhs_color': cfeature.COLORS['water'],
+        'axis_label_list': [
+            ('40N ', -15, 191), ('30N ', -15, 141), ('20N ', -15, 94),
+            ('10N ', -15, 47),
+            ('110E ', 36, -5), ('120E ', 83, -5), ('130E ', 128, -5),
+            ('140E ', 171, -5), ('150E ', 216, -5), ('160E ', 262, -5),
+            ('170E ', 305, -5)
+        ],
+        'product_legend_dict': {
+            'hits': [('hits', 160, 47, 272, 230)],
+            'falseAlarm': [('false', 160, 47, 272, 230)],
+            'HitFalse': [('hits', 160, 47, 272, 230),
+                         ('false', 160, 45.5, 272, 221)]
+        }
+    }
+}
+
+def read_genmpr_genesis_locations(genmpr_file):
+    """! Read the genesis locations of each category in a
+         MET TC-Gen GENMPR file
+
+         Args:
+             genmpr_file - path to GENMPR file (string)
+
+         Returns:
+             category_lonlat_dict - dictionary of category and its
+                                    longitudes and latitudes
+                                    (tuple of 1D arrays)
+    """
+    category_line_dict = {category: [] for category in category_match_dict}
+    with open(genmpr_file, 'r') as genmpr:
+        for line in genmpr:
+            for category, match_list in category_match_dict.items():
+                for match in match_list:
+                    if match in line:
+                        category_line_dict[category].append(line)
+    category_lonlat_dict = {}
+    for category, category_line_list in category_line_dict.items():
+        if len(category_line_list) == 0:
+            lat_lon = np.empty((0, 2))
+        else:
+            lat_lon = np.loadtxt(category_line_list, dtype=float,
+                                 usecols=(genmpr_lat_col, genmpr_lon_col),
+                                 ndmin=2)
+        category_lonlat_dict[category] = (lat_lon[:,1] + 360., lat_lon[:,0])
+    return category_lonlat_dict
+
+def make_basin_map(basin):
+    """! Draw the map of a basin
+
+         Args:
+             basin - basin (string)
+
+         Returns:
+             fig - figure (Figure)
+             ax  - map axes (GeoAxes)
+    """
+    basin_map = basin_map_dict[basin]
+    fig = plt.figure()
+    ax = plt.axes(
+        projection=ccrs.Miller(
+            central_longitude=basin_map['central_longitude']
+        )
+    )
+    ax.set_extent(basin_map['extent'], crs=ccrs.PlateCarree())
+    # Extent is different from the tick marks by design
+    ax.gridlines(xlocs=basin_map['xticks'], ylocs=basin_map['yticks'],
+                 color='gray', alpha=0.9, linestyle='--')
+    ax.coastlines('10m', linewidth=basin_map['coastline_linewidth'],
+                  color='black')
+    ax.add_feature(cfeature.GSHHSFeature('low', levels=[2],
+                                         facecolor='white'),
+                   color=basin_map['gshhs_color'], linewidth=0.1)
+    land_10m = cfeature.NaturalEarthFeature('physical', 'land', '10m',
+                                            edgecolor='face',
+                                            facecolor='None')
+    ax.add_feature(cfeature.LAKES)
+    ax.add_feature(cfeature.BORDERS)
+    ax.add_feature(land_10m)
+    # Axis labels are annotated for the known issues with
+    # cartopy gridline labels
+    for label, label_xoffset, label_yoffset in basin_map['axis_label_list']:
+        ax.annotate(label, (0,0), (label_xoffset, label_yoffset),
+                    xycoords='axes fraction', textcoords='offset points',
+                    va='top', color='Black', fontsize=6.5)
+    ax.set_title(TCGENdays)
+    return fig, ax
+
+for basin in basin_list:
+    fig, ax = make_basin_map(basin)
+    product_legend_dict = basin_map_dict[basin]['product_legend_dict']
+    for model in model_list:
+        genmpr_file = os.path.join(
+            COMINstats, f"tc_gen_{YEAR}_genmpr_{basin}_{model}.txt"
+        )
+        if not os.path.exists(genmpr_file):
+            print(f"WARNING: {genmpr_file} does not exist")
+            continue
+        output_dir = os.path.join(DATA, f"{basin}_{model}")
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+        category_lonlat_dict = read_genmpr_genesis_locations(genmpr_file)
+        for product, product_legend_list in product_legend_dict.items():
+            product_artist_list = []
+            for (category, legend_lon, legend_lat, label_xoffset,
+                    label_yoffset) in product_legend_list:
+                lon, lat = category_lonlat_dict[category]
+                category_plot = category_plot_dict[category]
+                # Genesis locations and the legend marker
+                product_artist_list.append(ax.scatter(
+                    np.append(lon, legend_lon), np.append(lat, legend_lat),
+                    transform=ccrs.PlateCarree(),
+                    marker=category_plot['marker'],
+                    color=category_plot['color'], s=12, facecolor='none'
+                ))
+                product_artist_list.append(ax.annotate(
+                    f"{category_plot['label']} ({len(lon)})", (0,0),
+                    (label_xoffset, label_yoffset), xycoords='axes fraction',
+                    textcoords='offset points', va='top',
+                    color=category_plot['label_color'], fontsize=6.5
+                ))
+            image_name = os.path.join(
+                output_dir, f"tcgen_{product}_{basin}_{model}.png"
+            )
+            print(f"Saving image as {image_name}")
+            fig.savefig(image_name, dpi=160, bbox_inches='tight')
+            for product_artist in product_artist_list:
+                product_artist.remove()
+    plt.close(fig)
+
+print("END: "+os.path.basename(__file__))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+'''
+Name: tcgen_stats.py
+Abstract: This script runs METplus TCGen for each basin and model.
+          The A- and B-deck files for a basin are staged once, as hard
+          links when the file system allows, into a directory all of
+          the basin's models read from. The yearly genesis file of each
+          model is read once and split by basin. The TCGen confs are
+          rendered from the template, and the basin and model jobs run
+          concurrently, TCGEN_NPROC at a time.
+'''
+
+import os
+import sys
+import glob
+import shutil
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+# A- and B-deck directory environment variables for each basin
+basin_deck_dict = {
+    'al': ('COMINadeckNHC', 'COMINbdeckNHC'),
+    'ep': ('COMINadeckNHC', 'COMINbdeckNHC'),
+    'wp': ('COMINadeckJTWC', 'COMINbdeckJTWC')
+}
+# Forecast initialization frequency (hours) for each model
+model_init_freq_dict = {
+    'gfs': '6',
+    'ecmwf': '12',
+    'cmc': '12'
+}
+VALID_FREQ = '6'
+# TCGen output file and its COMOUT name, formatted with YEAR,
+# basin, and model
+tcgen_output_list = [
+    ('tc_gen_{YEAR}_ctc.txt', 'tc_gen_{YEAR}_ctc_{basin}_{model}.txt'),
+    ('tc_gen_{YEAR}_cts.txt', 'tc_gen_{YEAR}_cts_{basin}_{model}.txt'),
+    ('tc_gen_{YEAR}_genmpr.txt',
+     'tc_gen_{YEAR}_genmpr_{basin}_{model}.txt'),
+    ('tc_gen_{YEAR}.stat', 'tc_gen_{YEAR}_{basin}_{model}.stat'),
+    ('tc_gen_{YEAR}_pairs.nc', 'tc_gen_{YEAR}_pairs_{basin}_{model}.nc')
+]
+
+def link_or_copy(src_file, dest_file):
+    """! Hard link a file, or copy it when the file system
+         does not allow a link
+
+         Args:
+             src_file  - path of file to link (string)
+             dest_file - path of link (string)
+
+         Returns:
+    """
+    if os.path.exists(dest_file):
+        os.remove(dest_file)
+    try:
+        os.link(src_file, dest_file)
+    except OSError:
+        shutil.copy2(src_file, dest_file)
+
+def stage_basin_decks(basin, deck_dir):
+    """! Stage the A- and B-deck files of a basin once
+         for all models
+
+         Args:
+             basin    - basin (string)
+             deck_dir - directory to stage deck files in (string)
+
+         Returns:
+             ndeck_files - number of deck files staged (integer)
+    """
+    if not os.path.exists(deck_dir):
+        os.makedirs(deck_dir, exist_ok=True)
+    ndeck_files = 0
+    for deck, COMINdeck_env in zip(['a', 'b'], basin_deck_dict[basin]):
+        for deck_file in sorted(glob.glob(
+                os.path.join(os.environ[COMINdeck_env],
+                             f"{deck}{basin}*.dat"))):
+            link_or_copy(
+                deck_file,
+                os.path.join(deck_dir, os.path.basename(deck_file))
+            )
+            ndeck_files+=1
+    print(f"Staged {ndeck_files} {basin} deck files in {deck_dir}")
+    return ndeck_files
+
+def write_basin_genesis_files(genesis_file, basin_list,
+                              basin_genesis_file_dict):
+    """! Split a model's yearly genesis file by basin, keeping the
+         basin's invest records and then all HC records
+
+         Args:
+             genesis_file            - path to yearly genesis file
+                                       (string)
+             basin_list              - basins (list of strings)
+             basin_genesis_file_dict - dictionary of basin and path
+                                       of its genesis file
+
+         Returns:
+    """
+    with open(genesis_file, 'r') as gf:
+        genesis_line_list = gf.readlines()
+    hc_line_list = [line for line in genesis_line_list if 'HC,' in line]
+    for basin in basin_list:
+        basin_match = f"{basin.upper()},  9"
+        basin_genesis_file = basin_genesis_file_dict[basin]
+        basin_genesis_dir = os.path.dirname(basin_genesis_file)
+        if not os.path.exists(basin_genesis_dir):
+            os.makedirs(basin_genesis_dir, exist_ok=True)
+        with open(basin_genesis_file, 'w') as bgf:
+            bgf.writelines(
+                [line for line in genesis_line_list if basin_match in line]
+            )
+            bgf.writelines(hc_line_list)
+
+def render_tcgen_conf(template_conf, template_value_dict):
+    """! Fill in the template values of a TCGen conf
+
+         Args:
+             template_conf       - TCGen template conf (string)
+             template_value_dict - dictionary of template name
+                                   and value
+
+         Returns:
+             tcgen_conf - TCGen conf (string)
+    """
+    tcgen_conf = template_conf
+    for template_name, template_value in template_value_dict.items():
+        tcgen_conf = tcgen_conf.replace(template_name, template_value)
+    return tcgen_conf
+
+def run_tcgen_job(tcgen_job):
+    """! Run METplus TCGen for one basin and model
+
+         Args:
+             tcgen_job - dictionary of basin, model, output directory,
+                         and conf path
+
+         Returns:
+             tcgen_job  - tcgen_job (dictionary)
+             returncode - run_metplus.py exit code (integer)
+             output     - run_metplus.py output (string)
+    """
+    run_tcgen = subprocess.run(
+        ['run_metplus.py', '-c', tcgen_job['conf']],
+        cwd=tcgen_job['output_dir'], stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, universal_newlines=True
+    )
+    return tcgen_job, run_tcgen.returncode, run_tcgen.stdout
+
+def main():
+    DATA = os.environ['DATA']
+    COMOUT = os.environ['COMOUT']
+    SENDCOM = os.environ['SENDCOM']
+    PARMevs = os.environ['PARMevs']
+    STEP = os.environ['STEP']
+    COMPONENT = os.environ['COMPONENT']
+    COMINgenesis = os.environ['COMINgenesis']
+    MetOnMachine = os.environ['MetOnMachine']
+    YEAR = os.environ['YEAR']
+    basin_list = os.environ['basinlist'].split()
+    model_list = os.environ['modellist'].split()
+    nproc = int(os.environ.get('TCGEN_NPROC', '1'))
+    DATAroot = os.path.join(DATA, 'tcgen')
+    with open(os.path.join(PARMevs, 'metplus_config', STEP, COMPONENT,
+                           'TCGen_template.conf'), 'r') as tf:
+        template_conf = tf.read()
+    basin_deck_dir_dict = {}
+    for basin in basin_list:
+        basin_deck_dir_dict[basin] = os.path.join(DATAroot, 'input',
+                                                  f"{basin}_decks")
+        stage_basin_decks(basin, basin_deck_dir_dict[basin])
+    model_basin_genesis_file_dict = {}
+    for model in model_list:
+        genesis_file = os.path.join(COMINgenesis, f"{model}_genesis_{YEAR}")
+        if not os.path.exists(genesis_file):
+            print(f"WARNING: {genesis_file} does not exist")
+            continue
+        model_basin_genesis_file_dict[model] = {
+            basin: os.path.join(DATAroot, 'input', f"{basin}_{model}",
+                                f"genesis_{YEAR}")
+            for basin in basin_list
+        }
+        write_basin_genesis_files(genesis_file, basin_list,
+                                  model_basin_genesis_file_dict[model])
+    tcgen_job_list = []
+    for basin in basin_list:
+        for model in model_basin_genesis_file_dict:
+            output_dir = os.path.join(DATAroot, 'output', f"{basin}_{model}")
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+            tcgen_conf_file = os.path.join(output_dir, 'TCGen.conf')
+            with open(tcgen_conf_file, 'w') as cf:
+                cf.write(render_tcgen_conf(template_conf, {
+                    'METBASE_template': MetOnMachine,
+                    'DECK_BASE_template': basin_deck_dir_dict[basin],
+                    'INPUT_BASE_template': os.path.dirname(
+                        model_basin_genesis_file_dict[model][basin]
+                    ),
+                    'OUTPUT_BASE_template': output_dir,
+                    'YEAR_template': YEAR,
+                    'INIT_FREQ_template': model_init_freq_dict[model],
+                    'VALID_FREQ_template': VALID_FREQ,
+                    'BASIN_MASK_template': basin.upper()
+                }))
+            tcgen_job_list.append({'basin': basin, 'model': model,
+                                   'output_dir': output_dir,
+                                   'conf': tcgen_conf_file})
+    print(f"Running {len(tcgen_job_list)} TCGen jobs with {nproc} worker(s)")
+    if nproc > 1:
+        with ThreadPool(min(nproc, max(len(tcgen_job_list), 1))) as pool:
+            results = pool.map(run_tcgen_job, tcgen_job_list)
+    else:
+        results = [run_tcgen_job(tcgen_job) for tcgen_job in tcgen_job_list]
+    nfailed = 0
+    for tcgen_job, returncode, output in results:
+        basin, model = tcgen_job['basin'], tcgen_job['model']
+        print(f"----- TCGen {basin} {model} -----")
+        sys.stdout.write(output)
+        if returncode != 0:
+            nfailed+=1
+            print(f"ERROR: TCGen {basin} {model} exited with code "
+                  + f"{returncode}")
+            continue
+        if SENDCOM == 'YES':
+            if not os.path.exists(COMOUT):
+                os.makedirs(COMOUT, exist_ok=True)
+            for output_file_tmpl, comout_file_tmpl in tcgen_output_list:
+                output_file = os.path.join(
+                    tcgen_job['output_dir'],
+                    output_file_tmpl.format(YEAR=YEAR)
+                )
+                comout_file = os.path.join(
+                    COMOUT,
+                    comout_file_tmpl.format(YEAR=YEAR, basin=basin,
+                                            model=model)
+                )
+                if os.path.exists(output_file):
+                    print(f"Copying {output_file} to {comout_file}")
+                    shutil.copy2(output_file, comout_file)
+                else:
+                    print(f"WARNING: {output_file} does not exist")
+    print(f"Ran {len(results)-nfailed} of {len(results)} TCGen jobs")
+    return 1 if nfailed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,15 +13,22 @@ import os
 import sys
 import shutil
 import uuid
+import functools
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta as td
+from collections import OrderedDict
 
 SETTINGS_DIR = os.environ['USH_DIR']
 sys.path.insert(0, os.path.abspath(SETTINGS_DIR))
 from prune_stat_files import prune_data
 import plot_util
 
+# Results of get_preprocessed_data(), kept in memory when one process renders
+# many plots (see plot_server.py).  Disabled unless a cache size is set.
+preprocessed_data_cache = OrderedDict()
+preprocessed_data_cache_size = 0
+
 
 # =================== FUNCTIONS =========================
 
@@ -347,6 +354,31 @@ def filter_by_hour(df, logger, date_type, date_hours, model_list,
     check_empty(df, logger, 'filter_by_hour')
     return df
 
+def set_preprocessed_data_cache_size(cache_size):
+    global preprocessed_data_cache_size
+    preprocessed_data_cache_size = cache_size
+    while len(preprocessed_data_cache) > cache_size:
+        preprocessed_data_cache.popitem(last=False)
+
+def cache_preprocessed_data(func):
+    @functools.wraps(func)
+    def wrapper(logger, *args, **kwargs):
+        if preprocessed_data_cache_size < 1:
+            return func(logger, *args, **kwargs)
+        cache_key = repr((args, sorted(kwargs.items())))
+        if cache_key in preprocessed_data_cache:
+            preprocessed_data_cache.move_to_end(cache_key)
+            logger.info("Using preprocessed data already held in memory")
+        else:
+            preprocessed_data_cache[cache_key] = func(logger, *args, **kwargs)
+            if len(preprocessed_data_cache) > preprocessed_data_cache_size:
+                preprocessed_data_cache.popitem(last=False)
+        df = preprocessed_data_cache[cache_key]
+        # Callers modify the dataframe they get back
+        return None if df is None else df.copy()
+    return wrapper
+
+@cache_preprocessed_data
 def get_preprocessed_data(logger, stats_dir, prune_dir, output_base_template, 
                           verif_case, verif_type, line_type, date_type, 
                           date_range, eval_period, date_hours, fleads, 
@@ -14,6 +14,7 @@ import os
 import glob
 from datetime import datetime
 import numpy as np
+import mesoscale_util as cutil
 
 print(f"BEGIN: {os.path.basename(__file__)}")
 
@@ -24,6 +25,12 @@ nproc = os.environ['nproc']
 STEP = os.environ['STEP']
 VERIF_CASE = os.environ['VERIF_CASE']
 DATA = os.environ['DATA']
+PBS_NODEFILE = os.environ.get('PBS_NODEFILE', '')
+POE_RUNTIME_HISTORY_DIR = os.environ.get(
+    'POE_RUNTIME_HISTORY_DIR', os.path.join(DATA, 'runtime_history')
+)
+RUNTIME_HISTORY_FILE = os.path.join(POE_RUNTIME_HISTORY_DIR,
+                                    f'{VERIF_CASE}_{STEP}.txt')
 
 # If Using CFP, create POE scripts
 if USE_CFP == 'YES':
@@ -33,37 +40,18 @@ if USE_CFP == 'YES':
     if njob_files == 0:
         print(f"ERROR: No job files created in {job_dir}")
         sys.exit(1)
-    poe_job_files = glob.glob(os.path.join(job_dir, f'poe_job*'))
-    npoe_job_files = len(poe_job_files)
-    if npoe_job_files > 0:
-        for poe_job_file in poe_job_files:
-            os.remove(poe_job_file)
-    njob, iproc, node = 1, 0, 1
-    while njob <= njob_files:
-        job_filename = f'job{njob}'
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            if iproc >= int(nproc):
-                iproc = 0
-                node+=1
-        poe_job_file = os.path.join(job_dir, f'poe_jobs{node}')
-        poe_job = open(poe_job_file, 'a')
-        iproc+=1
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            poe_job.write(f'{iproc-1} {os.path.join(job_dir, job_filename)}\n')
-        else:
-            poe_job.write(f'{os.path.join(job_dir, job_filename)}\n')
-        poe_job.close()
-        njob+=1
-    poe_job_file = os.path.join(job_dir, f'poe_jobs{node}')
-    poe_job = open(poe_job_file, 'a')
-    iproc+=1
-    while iproc <= int(nproc):
-        if machine in ['HERA', 'ORION', 'S4', 'JET']:
-            poe_job.write(f'{iproc-1} /bin/echo {iproc}\n')
-        else:
-            poe_job.write(f'/bin/echo {iproc}\n')
-        iproc+=1
-    poe_job.close()
+    # On WCOSS2, cfp runs nproc processors on each node of the job
+    nworker = int(nproc)
+    if machine == 'WCOSS2' and os.path.exists(PBS_NODEFILE):
+        with open(PBS_NODEFILE, 'r') as pnf:
+            nworker = int(nproc)*len(pnf.readlines())
+    # Queue jobs longest recorded (or else estimated) run time first; each
+    # processor takes the next queued job as soon as it is free
+    cutil.create_job_queue_poe_scripts(
+        job_dir, machine, nworker,
+        ['VERIF_TYPE', 'var_name', 'LINE_TYPE', 'EVAL_PERIOD', 'PLOT_TYPE'],
+        'MODELS', RUNTIME_HISTORY_FILE
+    )
 else:
     print(f"ERROR: Cannot create POE scripts because USE_CFP is set to"
           + f" {USE_CFP}.  Please set USE_CFP=YES")
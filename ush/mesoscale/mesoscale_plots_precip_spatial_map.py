@@ -11,7 +11,6 @@ import numpy as np
 import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
 import os
 import glob
 import logging
@@ -19,10 +18,10 @@ import sys
 import datetime
 import subprocess
 import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 from cartopy.mpl.ticker import LongitudeFormatter, LatitudeFormatter
 from cartopy import config
 from mesoscale_plots_specs import PlotSpecs
+from mesoscale_plots_base_map import get_base_map, get_colormap_norm
 
 class PrecipSpatialMap:
     """
@@ -102,6 +101,12 @@ class PrecipSpatialMap:
         cmap_over_color_mm = '#ffaeb9'
         # Set Cartopy shapefile location
         config['data_dir'] = config['repo_data_dir']
+        # Set where to keep grids projected to map coordinates
+        if 'DATA' in os.environ:
+            grid_cache_dir = os.path.join(os.environ['DATA'],
+                                          'projected_grids')
+        else:
+            grid_cache_dir = None
         # Read in data
         self.logger.info(f"Reading in model files from {self.input_dir}")
         for model_num in self.model_info_dict:
@@ -267,62 +272,30 @@ class PrecipSpatialMap:
                         .strftime('%d%b%Y %H')+'Z to '
                         +valid_date_dt.strftime('%d%b%Y %H')+'Z'
                     )
-                plot_left_logo = False
-                plot_left_logo_path = os.path.join(self.logo_dir, 'noaa.png')
-                if os.path.exists(plot_left_logo_path):
-                    plot_left_logo = True
-                    left_logo_img_array = matplotlib.image.imread(
-                        plot_left_logo_path
-                    )
-                    left_logo_xpixel_loc,left_logo_ypixel_loc,left_logo_alpha = (
-                        plot_specs_psm.get_logo_location(
-                            'left', plot_specs_psm.fig_size[0],
-                             plot_specs_psm.fig_size[1],
-                             plt.rcParams['figure.dpi']
+                logo_list = []
+                for logo_position, logo_name in [('left', 'noaa.png'),
+                                                 ('right', 'nws.png')]:
+                    logo_path = os.path.join(self.logo_dir, logo_name)
+                    if os.path.exists(logo_path):
+                        logo_list.append(
+                            (logo_path,)
+                            + plot_specs_psm.get_logo_location(
+                                logo_position, plot_specs_psm.fig_size[0],
+                                plot_specs_psm.fig_size[1],
+                                plt.rcParams['figure.dpi']
+                            )
                         )
-                    )
-                plot_right_logo = False
-                plot_right_logo_path = os.path.join(self.logo_dir, 'nws.png')
-                if os.path.exists(plot_right_logo_path):
-                    plot_right_logo = True
-                    right_logo_img_array = matplotlib.image.imread(
-                        plot_right_logo_path
-                    )
-                    right_logo_xpixel_loc,right_logo_ypixel_loc,right_logo_alpha = (
-                        plot_specs_psm.get_logo_location(
-                            'right', plot_specs_psm.fig_size[0],
-                            plot_specs_psm.fig_size[1],
-                            plt.rcParams['figure.dpi']
-                        )
-                    )
                 if var_units == 'inches':
                     clevs = clevs_in
-                    cmap = matplotlib.colors.ListedColormap(colorlist_in)
-                    cmap_over_color = cmap_over_color_in
+                    cmap, norm = get_colormap_norm(
+                        tuple(colorlist_in), tuple(clevs_in),
+                        cmap_over_color_in
+                    )
                 elif var_units in ['mm', 'kg/m^2']:
                     clevs = clevs_mm
-                    cmap = matplotlib.colors.ListedColormap(colorlist_mm)
-                    cmap_over_color = cmap_over_color_mm
-                norm = matplotlib.colors.BoundaryNorm(clevs, cmap.N)
-                # Create plot
-                self.logger.info(f"Creating plot for {model_num_file}")
-                fig = plt.figure(figsize=(plot_specs_psm.fig_size[0],
-                                          plot_specs_psm.fig_size[1]))
-                gs_hspace, gs_wspace = 0, 0
-                gs_bottom, gs_top = 0.125, 0.85
-                gs = gridspec.GridSpec(1,1, bottom=gs_bottom, top=gs_top,
-                                       hspace=gs_hspace, wspace=gs_wspace)
-                fig.suptitle(plot_title)
-                if plot_left_logo:
-                    left_logo_img = fig.figimage(
-                        left_logo_img_array, left_logo_xpixel_loc,
-                        left_logo_ypixel_loc, zorder=1, alpha=right_logo_alpha
-                    )
-                    left_logo_img.set_visible(True)
-                if plot_right_logo:
-                    right_logo_img = fig.figimage(
-                        right_logo_img_array, right_logo_xpixel_loc,
-                        right_logo_ypixel_loc, zorder=1, alpha=right_logo_alpha
+                    cmap, norm = get_colormap_norm(
+                        tuple(colorlist_mm), tuple(clevs_mm),
+                        cmap_over_color_mm
                     )
                 if self.plot_info_dict['vx_mask'] == 'CONUS':
                     extent = [-124,-70,18.0,50.0]
@@ -340,19 +313,14 @@ class PrecipSpatialMap:
                     extent = [-165,-150,15.0,25.0]
                     central_lon = -157.5
                     central_lat = 20
-                myproj=ccrs.LambertConformal(central_longitude=central_lon,
-                                             central_latitude=central_lat,
-                                             false_easting=0.0,
-                                             false_northing=0.0,
-                                             globe=None)
-                ax1 = fig.add_subplot(gs[0], projection=myproj)
-                ax1.set_extent(extent)
-                ax1.add_feature(cfeature.COASTLINE.with_scale('50m'),
-                                zorder=2, linewidth=1)
-                ax1.add_feature(cfeature.BORDERS.with_scale('50m'),
-                                zorder=2, linewidth=1)
-                ax1.add_feature(cfeature.STATES.with_scale('50m'),
-                                zorder=2, linewidth=1)
+                # Create plot, reusing the map features already drawn
+                # for this region
+                self.logger.info(f"Creating plot for {model_num_file}")
+                base_map = get_base_map(plot_specs_psm.fig_size, extent,
+                                        central_lon, central_lat, logo_list)
+                fig, gs, ax1, myproj = (base_map.fig, base_map.gs, base_map.ax,
+                                        base_map.proj)
+                base_map.set_title(plot_title)
                 
                 # Sanitize lons if plot crosses the dateline
                 ax_ul = (0.,1.)
@@ -366,11 +334,10 @@ class PrecipSpatialMap:
                 if ax_ul_cartesian[0] > ax_ur_cartesian[0]:
                     x = np.mod(x, 360.)         
 
-                CF1 = ax1.contourf(x, y, precip_APCP_A24,
-                                   transform=ccrs.PlateCarree(),
-                                   levels=clevs, norm=norm,
-                                   cmap=cmap, extend='max')
-                CF1.cmap.set_over(cmap_over_color)
+                CF1 = base_map.contourf(x, y, precip_APCP_A24,
+                                        grid_cache_dir=grid_cache_dir,
+                                        levels=clevs, norm=norm,
+                                        cmap=cmap, extend='max')
                 cbar_left = gs.get_grid_positions(fig)[2][0]
                 cbar_width = (gs.get_grid_positions(fig)[3][-1]
                               - gs.get_grid_positions(fig)[2][0])
@@ -397,9 +364,7 @@ class PrecipSpatialMap:
                         )
                 cbar.ax.set_xticklabels(cbar_tick_labels_list)
                 self.logger.info("Saving image as "+image_name)
-                plt.savefig(image_name)
-                plt.clf()
-                plt.close('all')
+                base_map.save(image_name, [CF1, cbar_ax])
                 # Convert png to gif, if possible
                 check_convert = subprocess.run(
                     ['which', 'convert'], stdout=subprocess.DEVNULL,
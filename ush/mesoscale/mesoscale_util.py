@@ -10,10 +10,17 @@
 # =============================================================================
 
 import os
+import functools
 import sys
+import re
+import hashlib
+import shlex
+import fcntl
+import struct
 import datetime
 import numpy as np
 import glob
+import shutil
 import subprocess
 from collections.abc import Iterable
 
@@ -242,9 +249,235 @@ def check_pstat_files(job_dict):
 
 
 
+class FileFormat:
+    """! File naming convention parsed once into literal strings and
+         {option?fmt=} fields, see compile_file_format
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+    """
+    # Time information fields are filled from, as index into
+    # (valid time, initialization time, forecast hour), and if
+    # the field takes a shift
+    option_dict = {
+        'lead': (2, False), 'lead_shift': (2, True),
+        'valid': (0, False), 'valid_shift': (0, True),
+        'init': (1, False), 'init_shift': (1, True),
+        'cycle': (1, False)
+    }
+    option_regex = re.compile(r'\{([^{}?/]+)\?fmt=([^}/]*)\}')
+
+    def __init__(self, unfilled_file_format):
+        self.unfilled_file_format = unfilled_file_format
+        self.chunk_list = []
+        for file_format_chunk in unfilled_file_format.split('/'):
+            token_list = []
+            literal_start = 0
+            filled_shift_field_list = self.get_filled_shift_fields(
+                file_format_chunk
+            )
+            for option_match in self.option_regex.finditer(file_format_chunk):
+                token_list.append(
+                    file_format_chunk[literal_start:option_match.start()]
+                )
+                field, option, fmt = option_match.group(0, 1, 2)
+                if self.option_dict.get(option, (None, False))[1] \
+                        and field not in filled_shift_field_list:
+                    token_list.append(field)
+                else:
+                    token_list.append(self.parse_field(field, option, fmt))
+                literal_start = option_match.end()
+            token_list.append(file_format_chunk[literal_start:])
+            self.chunk_list.append(
+                [token for token in token_list if token != '']
+            )
+
+    def get_filled_shift_fields(self, file_format_chunk):
+        """! Get the shift fields of a chunk that are filled. This
+             util's format_filler always read a shift from the chunk's
+             first "shift=" and its format up to the chunk's last "?",
+             filling the options in option_dict order, so a shift field
+             is only filled when those make up the field; any other
+             shift field is left as is
+
+             Args:
+                 file_format_chunk - file naming convention between
+                                     slashes (string)
+             Returns:
+                 filled_shift_field_list - shift fields to fill
+                                           (list of strings)
+        """
+        filled_shift_field_list = []
+        for option, (time_idx, takes_shift) in self.option_dict.items():
+            option_start = '{'+option+'?fmt='
+            for noption in range(file_format_chunk.count(option_start)):
+                fmt = file_format_chunk.partition(option_start)[2]
+                if takes_shift:
+                    shift = (file_format_chunk.partition('shift=')[2]
+                             .partition('}')[0])
+                    field = (option_start+fmt.rpartition('?')[0]
+                             +'?shift='+shift+'}')
+                    if field in file_format_chunk:
+                        filled_shift_field_list.append(field)
+                else:
+                    field = option_start+fmt.partition('}')[0]+'}'
+                # Filled fields have no "?" or "shift=" left in them
+                file_format_chunk = file_format_chunk.replace(field, '\0')
+        return filled_shift_field_list
+
+    def parse_field(self, field, option, fmt):
+        """! Parse one {option?fmt=} field
+
+             Args:
+                 field  - full field text (string)
+                 option - field option name (string)
+                 fmt    - field format, including shift (string)
+             Returns:
+                 parsed_field - field text if it is left as is
+                                (string), or time information index,
+                                option, format, shift, field text
+                                (tuple)
+        """
+        if option not in self.option_dict:
+            return (None, option, fmt, 0, field)
+        time_idx, takes_shift = self.option_dict[option]
+        if not takes_shift:
+            return (time_idx, option, fmt, 0, field)
+        shift = fmt.partition('shift=')[2]
+        fmt = fmt.rpartition('?')[0]
+        if field != '{'+option+'?fmt='+fmt+'?shift='+shift+'}':
+            return field
+        return (time_idx, option, fmt, int(shift), field)
+
+    def fill_field(self, parsed_field, time_info_value):
+        """! Fill one parsed field from its time information
+
+             Args:
+                 parsed_field    - field from parse_field (tuple)
+                 time_info_value - valid time, initialization time
+                                   (datetime) or forecast hour (string)
+             Returns:
+                 filled_field - filled field (string)
+        """
+        time_idx, option, fmt, shift, field = parsed_field
+        if time_idx == 2:
+            forecast_hour = time_info_value
+            if option == 'lead_shift':
+                forecast_hour = str(int(forecast_hour) + shift)
+            if fmt == '%1H':
+                if int(forecast_hour) < 10:
+                    return forecast_hour[1]
+                else:
+                    return forecast_hour
+            elif fmt == '%2H':
+                return forecast_hour.zfill(2)
+            elif fmt == '%3H':
+                return forecast_hour.zfill(3)
+            else:
+                return forecast_hour
+        if shift != 0:
+            time_info_value = time_info_value + datetime.timedelta(hours=shift)
+        return time_info_value.strftime(fmt)
+
+    def fill(self, valid_time_dt, init_time_dt, forecast_hour,
+             str_sub_dict={}):
+        """! Fill in the file naming convention
+
+             Args:
+                 valid_time_dt - valid time (datetime)
+                 init_time_dt  - initialization time (datetime)
+                 forecast_hour - forecast hour (string)
+                 str_sub_dict  - other strings to substitue (dictionary)
+             Returns:
+                 filled_file_format - file_format filled in with verifying
+                                      time information (string)
+        """
+        time_info = (valid_time_dt, init_time_dt, forecast_hour)
+        filled_chunk_list = []
+        for token_list in self.chunk_list:
+            filled_token_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    filled_token_list.append(token)
+                elif token[0] is None:
+                    filled_token_list.append(
+                        str_sub_dict.get(token[1], token[4])
+                    )
+                else:
+                    filled_token_list.append(
+                        self.fill_field(token, time_info[token[0]])
+                    )
+            filled_chunk_list.append(''.join(filled_token_list))
+        return os.path.join('/', *filled_chunk_list)
+
+    def fill_many(self, valid_time_dt_list, init_time_dt_list,
+                  forecast_hour_list, str_sub_dict={}):
+        """! Fill in the file naming convention for many times at once,
+             filling each field once per unique time
+
+             Args:
+                 valid_time_dt_list - valid times (list of datetimes)
+                 init_time_dt_list  - initialization times
+                                      (list of datetimes)
+                 forecast_hour_list - forecast hours (list of strings)
+                 str_sub_dict       - other strings to substitue
+                                      (dictionary)
+             Returns:
+                 filled_file_format_list - file_format filled in with
+                                           verifying time information
+                                           (list of strings)
+        """
+        time_info_list = [
+            list(valid_time_dt_list), list(init_time_dt_list),
+            list(forecast_hour_list)
+        ]
+        nfiles = len(time_info_list[2])
+        filled_chunk_column_list = []
+        for token_list in self.chunk_list:
+            token_column_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    token_column_list.append([token]*nfiles)
+                elif token[0] is None:
+                    token_column_list.append(
+                        [str_sub_dict.get(token[1], token[4])]*nfiles
+                    )
+                else:
+                    filled_field_dict = {}
+                    for time_info_value in time_info_list[token[0]]:
+                        if time_info_value not in filled_field_dict:
+                            filled_field_dict[time_info_value] = (
+                                self.fill_field(token, time_info_value)
+                            )
+                    token_column_list.append(
+                        [filled_field_dict[time_info_value]
+                         for time_info_value in time_info_list[token[0]]]
+                    )
+            filled_chunk_column_list.append(
+                [''.join(filled_tokens)
+                 for filled_tokens in zip(*token_column_list)]
+                if len(token_column_list) != 0 else ['']*nfiles
+            )
+        return [os.path.join('/', *filled_chunks)
+                for filled_chunks in zip(*filled_chunk_column_list)]
+
+@functools.lru_cache(maxsize=None)
+def compile_file_format(unfilled_file_format):
+    """! Parse a file naming convention once, cached by the
+         file naming convention
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+         Returns:
+             file_format - parsed file naming convention with fill
+                           and fill_many methods (FileFormat)
+    """
+    return FileFormat(unfilled_file_format)
+
 def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
                   forecast_hour, str_sub_dict):
     """! Creates a filled file path from a format
+
          Args:
              unfilled_file_format - file naming convention (string)
              valid_time_dt        - valid time (datetime)
@@ -255,122 +488,9 @@ def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
              filled_file_format - file_format filled in with verifying
                                   time information (string)
     """
-    filled_file_format = '/'
-    format_opt_list = ['lead', 'lead_shift', 'valid', 'valid_shift',
-                       'init', 'init_shift', 'cycle']
-    if len(list(str_sub_dict.keys())) != 0:
-        format_opt_list = format_opt_list+list(str_sub_dict.keys())
-    for filled_file_format_chunk in unfilled_file_format.split('/'):
-        for format_opt in format_opt_list:
-            nformat_opt = (
-                filled_file_format_chunk.count('{'+format_opt+'?fmt=')
-            )
-            if nformat_opt > 0:
-               format_opt_count = 1
-               while format_opt_count <= nformat_opt:
-                   if format_opt in ['lead_shift', 'valid_shift',
-                                     'init_shift']:
-                       shift = (filled_file_format_chunk \
-                                .partition('shift=')[2] \
-                                .partition('}')[0])
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .rpartition('?')[0]
-                       )
-                   else:
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0]
-                       )
-                   if format_opt == 'valid':
-                       replace_format_opt_count = valid_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead':
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour) < 10:
-                               replace_format_opt_count = forecast_hour[1]
-                           else:
-                               replace_format_opt_count = forecast_hour
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = forecast_hour.zfill(2)
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = forecast_hour.zfill(3)
-                       else:
-                           replace_format_opt_count = forecast_hour
-                   elif format_opt == 'init':
-                       replace_format_opt_count = init_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'cycle':
-                       replace_format_opt_count = init_time_dt.strftime(
-                           format_opt_count_fmt
-                       ) 
-                   elif format_opt == 'lead_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       forecast_hour_shift = str(int(forecast_hour)
-                                                 + int(shift))
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour_shift) < 10:
-                               replace_format_opt_count = (
-                                   forecast_hour_shift[1]
-                               )
-                           else:
-                               replace_format_opt_count = forecast_hour_shift
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(2)
-                           )
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(3)
-                           )
-                       else:
-                           replace_format_opt_count = forecast_hour_shift
-                   elif format_opt == 'init_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       init_shift_time_dt = (
-                           init_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = init_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'valid_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       valid_shift_time_dt = (
-                           valid_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = valid_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   else:
-                       replace_format_opt_count = str_sub_dict[format_opt]
-                   if format_opt in ['lead_shift', 'valid_shift', 'init_shift']:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt
-                               +'?shift='+shift+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   else:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   format_opt_count+=1
-        filled_file_format = os.path.join(filled_file_format,
-                                          filled_file_format_chunk)
-    return filled_file_format
+    return compile_file_format(unfilled_file_format).fill(
+        valid_time_dt, init_time_dt, forecast_hour, str_sub_dict
+    )
 
 def initalize_job_env_dict():
     """! This initializes a dictionary of environment variables and their
@@ -838,3 +958,249 @@ def get_completed_jobs(completed_jobs_file):
 def mark_job_completed(completed_jobs_file, job_name):
     with open(completed_jobs_file, 'a') as f:
         f.write(job_name + "\n")
+
+# Return the key under which a job's run times are recorded: the
+# signature_env_vars exported in its job script and its number of models,
+# for reading, then a hash of the whole job script, so jobs that differ
+# only in their loops or commands are told apart.  Values that change from
+# run to run (the DATA path, dates, and job numbers) are left out of the hash.
+def get_job_signature(job_file, signature_env_vars, models_env_var):
+    job_env = {}
+    with open(job_file, 'r') as f:
+        job_script = f.read()
+    for line in job_script.splitlines():
+        if line.startswith('export '):
+            name, _, value = line[len('export '):].strip().partition('=')
+            job_env[name] = value.strip('"')
+    models = [
+        model for model in re.split(r'[,\s]+', job_env.get(models_env_var, ''))
+        if model
+    ]
+    DATA = os.environ.get('DATA', '')
+    if DATA:
+        job_script = job_script.replace(DATA, '$DATA')
+    job_script = re.sub(r'\d{8,}', 'D', job_script)
+    job_script = re.sub(r'job\d+', 'job', job_script)
+    return ':'.join(
+        [re.sub(r'\s+', '', job_env.get(env_var, ''))
+         for env_var in signature_env_vars]
+        + [str(len(models)),
+           hashlib.sha1(job_script.encode('utf-8')).hexdigest()[:12]]
+    )
+
+# Return the run times (seconds) recorded for each job signature, oldest
+# first, keeping only the nrecent most recent
+def read_job_runtime_history(runtime_history_file, nrecent=5):
+    runtime_history = {}
+    if os.path.exists(runtime_history_file):
+        with open(runtime_history_file, 'r') as f:
+            for line in f:
+                cols = line.rstrip('\n').split('\t')
+                if len(cols) != 2:
+                    continue
+                try:
+                    runtime = float(cols[1])
+                except ValueError:
+                    continue
+                runtime_history.setdefault(cols[0], []).append(runtime)
+    return {
+        job_signature: runtimes[-nrecent:]
+        for job_signature, runtimes in runtime_history.items()
+    }
+
+# Rewrite the run time history file keeping only the nrecent most recent
+# run times of each job signature, the only ones get_job_runtimes reads, so
+# the file does not grow with every run.  Other jobs may be appending run
+# times at the same time, so the file is rewritten in place while holding
+# the lock their workers take (with flock) to append.
+def trim_job_runtime_history(runtime_history_file, nrecent=5):
+    if not os.path.exists(runtime_history_file):
+        return
+    with open(runtime_history_file, 'r+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        runtime_history = read_job_runtime_history(runtime_history_file,
+                                                   nrecent)
+        f.seek(0)
+        for job_signature, runtimes in runtime_history.items():
+            for runtime in runtimes:
+                f.write(f'{job_signature}\t{runtime:.0f}\n')
+        f.truncate()
+
+# Return the mean of the most recent run times (seconds) recorded for each
+# job signature
+def get_job_runtimes(runtime_history_file, nrecent=5):
+    # Run times are recorded in whole seconds, so count at least one
+    return {
+        job_signature: max(np.mean(runtimes), 1.)
+        for job_signature, runtimes
+        in read_job_runtime_history(runtime_history_file, nrecent).items()
+    }
+
+# Static cost of a job that has no recorded run time: the number of models
+# times the number of days in the evaluation period
+def get_static_job_cost(job_signature):
+    fields = job_signature.split(':')
+    ndays = 1
+    for field in fields[:-2]:
+        ndays_match = re.search(r'(\d+)DAYS', field.upper())
+        if ndays_match:
+            ndays = int(ndays_match.group(1))
+    return max(int(fields[-2]), 1)*ndays
+
+# Return the estimated cost (seconds) of each job: its recorded run time if
+# there is one, otherwise its static cost scaled by the seconds per unit of
+# static cost seen in jobs that do have recorded run times
+def get_job_costs(job_signatures, job_runtimes):
+    seen_job_signatures = set(job_signatures) & set(job_runtimes)
+    if seen_job_signatures:
+        seconds_per_cost = np.median([
+            job_runtimes[job_signature]/get_static_job_cost(job_signature)
+            for job_signature in seen_job_signatures
+        ])
+    else:
+        seconds_per_cost = 1.
+    return [
+        job_runtimes[job_signature] if job_signature in job_runtimes
+        else get_static_job_cost(job_signature)*seconds_per_cost
+        for job_signature in job_signatures
+    ]
+
+# Write a poe_jobs1 script that runs the job scripts in job_dir on nproc
+# processors.  The jobs are queued in proc_queue longest estimated cost
+# first, and each processor runs proc_worker, which takes the next job no
+# other processor has taken (claimed by an atomic mkdir in proc_claims)
+# until the queue is done, so a wrong estimate only delays the job itself.
+# The run time history is trimmed and each successful job's run time is
+# appended to runtime_history_file.
+def create_job_queue_poe_scripts(job_dir, machine, nproc, signature_env_vars,
+                                 models_env_var, runtime_history_file):
+    for old_file in (glob.glob(os.path.join(job_dir, 'poe*'))
+                     + glob.glob(os.path.join(job_dir, 'proc_*'))):
+        if os.path.isdir(old_file):
+            shutil.rmtree(old_file)
+        else:
+            os.remove(old_file)
+    job_files = sorted(
+        glob.glob(os.path.join(job_dir, 'job*')),
+        key=lambda job_file: int(os.path.basename(job_file)[3:])
+    )
+    job_signatures = [
+        get_job_signature(job_file, signature_env_vars, models_env_var)
+        for job_file in job_files
+    ]
+    os.makedirs(os.path.dirname(runtime_history_file), exist_ok=True)
+    trim_job_runtime_history(runtime_history_file)
+    job_costs = get_job_costs(
+        job_signatures, get_job_runtimes(runtime_history_file)
+    )
+    queue_filename = os.path.join(job_dir, 'proc_queue')
+    with open(queue_filename, 'w') as queue_file:
+        for ijob in sorted(range(len(job_files)),
+                           key=lambda ijob: (-job_costs[ijob], ijob)):
+            queue_file.write(f'{job_files[ijob]}\t{job_signatures[ijob]}\n')
+    claims_dir = os.path.join(job_dir, 'proc_claims')
+    os.makedirs(claims_dir)
+    worker_filename = os.path.join(job_dir, 'proc_worker')
+    with open(worker_filename, 'w') as worker_file:
+        worker_file.write('#!/bin/bash\n')
+        worker_file.write('status=0\n')
+        worker_file.write(
+            "while IFS=$'\\t' read -r job_file job_signature; do\n"
+        )
+        worker_file.write(
+            f'    mkdir {shlex.quote(claims_dir)}/$(basename $job_file)'
+            + ' 2>/dev/null || continue\n'
+        )
+        worker_file.write('    start=$SECONDS\n')
+        worker_file.write('    $job_file\n')
+        worker_file.write('    rc=$?\n')
+        worker_file.write('    if [ $rc -ne 0 ]; then\n')
+        worker_file.write('        status=$rc\n')
+        worker_file.write('    else\n')
+        worker_file.write(
+            f"        flock {shlex.quote(runtime_history_file)}"
+            + " printf '%s\\t%d\\n' \"$job_signature\""
+            + " $((SECONDS-start)) >> "
+            + f"{shlex.quote(runtime_history_file)}\n"
+        )
+        worker_file.write('    fi\n')
+        worker_file.write(f'done < {shlex.quote(queue_filename)}\n')
+        worker_file.write('exit $status\n')
+    os.chmod(worker_filename, 0o775)
+    nworker = min(nproc, len(job_files))
+    poe_filename = os.path.join(job_dir, 'poe_jobs1')
+    with open(poe_filename, 'w') as poe_file:
+        for iproc in range(1, nproc+1):
+            if iproc <= nworker:
+                proc_cmd = worker_filename
+            else:
+                proc_cmd = f'/bin/echo {iproc}'
+            if machine in ['HERA', 'ORION', 'S4', 'JET']:
+                poe_file.write(f'{iproc-1} {proc_cmd}\n')
+            else:
+                poe_file.write(f'{proc_cmd}\n')
+    print(f"Queued {len(job_files)} jobs for {nworker} processors, estimated"
+          + f" {sum(job_costs):.0f} s in total")
+
+# Return merged precipitation type codes (1-rain, 2-snow, 3-freezing rain,
+# 4-ice pellets) where exactly one of the categorical precipitation types is
+# 1, and 0 elsewhere; masked points count as not 1
+def merge_ptype(crain, csnow, cfrzr, cicep):
+    ptype_is_one = [
+        np.ma.filled(ptype == 1.0, False)
+        for ptype in [crain, csnow, cfrzr, cicep]
+    ]
+    one_ptype = np.sum(ptype_is_one, axis=0) == 1
+    merged_ptype = np.zeros_like(crain)
+    merged_ptype[one_ptype] = np.select(ptype_is_one, [1, 2, 3, 4])[one_ptype]
+    return merged_ptype
+
+# Return (record index, name) for each record of a shapefile that has a
+# shape, reading the .shp record headers and the name_field attribute of
+# the matching .dbf table in one read each.  The record index is the one
+# gen_vx_mask takes with -shapeno.
+def get_shapefile_record_names(shp_file, name_field='LABEL'):
+    dbf_file = os.path.splitext(shp_file)[0]+'.dbf'
+    with open(dbf_file, 'rb') as dbf:
+        dbf_bytes = dbf.read()
+    n_records, header_len, record_len = struct.unpack('<IHH', dbf_bytes[4:12])
+    # Field descriptors are 32 bytes each, ended by 0x0D; record fields
+    # follow a 1 byte deletion flag in descriptor order
+    name_slice = None
+    field_start = 1
+    for descriptor_start in range(32, header_len-1, 32):
+        descriptor = dbf_bytes[descriptor_start:descriptor_start+32]
+        if descriptor[0] == 0x0D:
+            break
+        field_len = descriptor[16]
+        if descriptor[:11].split(b'\x00')[0].decode('latin-1') == name_field:
+            name_slice = slice(field_start, field_start+field_len)
+        field_start+=field_len
+    if name_slice is None:
+        raise ValueError(f"No {name_field} field in {dbf_file}")
+    record_names = [
+        dbf_bytes[header_len+(rec*record_len):
+                  header_len+((rec+1)*record_len)][name_slice]
+        .decode('latin-1').strip()
+        for rec in range(n_records)
+    ]
+    # Each .shp record is an 8 byte big-endian header (record number,
+    # content length in 16-bit words) then content starting with the
+    # little-endian shape type, 0 for a null shape
+    with open(shp_file, 'rb') as shp:
+        shp_bytes = shp.read()
+    shape_types = []
+    record_start = 100
+    while record_start+12 <= len(shp_bytes):
+        content_len = struct.unpack(
+            '>i', shp_bytes[record_start+4:record_start+8]
+        )[0]*2
+        shape_types.append(struct.unpack(
+            '<i', shp_bytes[record_start+8:record_start+12]
+        )[0])
+        record_start+=8+content_len
+    return [
+        (rec, record_names[rec])
+        for rec in range(min(n_records, len(shape_types)))
+        if shape_types[rec] != 0
+    ]
@@ -11,6 +11,10 @@ from numpy.ma import is_masked
 # set to true to output more info
 DEBUG = False
 
+# set to true to read one value at a time instead of whole arrays;
+# both produce the same point data
+LEGACY = False
+
 # constant values that will be used for every observation
 MESSAGE_TYPE = 'ARGO'
 ELEVATION = 'NA'
@@ -126,68 +130,139 @@ def get_lat_lon(nc_obj, idx):
             numpy.float64(nc_obj.variables['LONGITUDE'][idx]))
 
 
-if len(sys.argv) < 2:
-    print(f"ERROR: {__file__} - Must provide at least 1 input file argument")
-    sys.exit(1)
+def get_qc_mask(nc_obj, field_name, error_max=None, profile_ok=None):
+    """!Get mask of values that pass quality control checks for all
+    profiles (and levels) at once. Values pass the same checks as
+    get_val_check_qc:
+    1) {field_name}_QC is not masked.
+    2) {field_name} is not masked.
+    3) {field_name}_QC value is equal to 1.
+    4) If error_max is set, {field_name}_ERROR is masked or not greater
+    than the error_max value.
 
-is_ok = True
-input_files = []
-for arg in sys.argv[1:]:
-    if arg.endswith('debug'):
-        print('Debugging output turned on')
-        DEBUG = True
-        continue
+    @param nc_obj NetCDF object
+    @param field_name name of field to read
+    @param error_max (optional) value to compare to {field_name}_ERROR
+    @param profile_ok (optional) boolean numpy array of profiles to check.
+    Defaults to None which checks all profiles
+    @returns tuple of boolean numpy array that is True where checks pass
+    and numpy.float64 array of field values
+    """
+    qc = nc_obj.variables[f'{field_name}_QC'][:]
+    field = nc_obj.variables[field_name][:]
 
-    input_file = os.path.expandvars(arg)
-    if not os.path.exists(input_file):
-        print(f'ERROR: Input file does not exist: {input_file}')
-        is_ok = False
-        continue
+    qc_ok = (~numpy.ma.getmaskarray(qc) & ~numpy.ma.getmaskarray(field)
+             & (numpy.ma.getdata(qc) == b'1'))
+    if profile_ok is not None:
+        qc_ok &= profile_ok.reshape((-1,) + (1,) * (qc_ok.ndim - 1))
 
-    input_files.append(input_file)
+    if error_max:
+        err = nc_obj.variables.get(f'{field_name}_ERROR')
+        if err:
+            err = err[:]
+            err_bad = (qc_ok & ~numpy.ma.getmaskarray(err)
+                       & (numpy.ma.getdata(err) > error_max))
+            for idx in zip(*numpy.nonzero(err_bad)):
+                data_str = field_name+''.join(f'[{i}]' for i in idx)
+                print(f"Skip {data_str} {field_name}_ERROR > {error_max}")
+            qc_ok &= ~err_bad
 
-if not is_ok:
-    sys.exit(1)
+    return qc_ok, numpy.ma.getdata(field).astype(numpy.float64)
 
-print(f'Number of input files: {len(input_files)}')
 
-point_data = []
-for input_file in input_files:
-    print(f'Processing file: {input_file}')
+def read_point_data(nc_obj, ref_dt):
+    """!Read observations from all profiles and levels of an ARGO file,
+    reading each variable once as a whole array.
 
-    nc_in = netCDF4.Dataset(input_file, 'r')
+    @param nc_obj NetCDF object
+    @param ref_dt Datetime object of reference date time
+    @returns list of 11-column observations
+    """
+    # check QC and mask of JULD to skip profiles with bad time info
+    juld_ok, _ = get_qc_mask(nc_obj, 'JULD')
+    julian_days = nc_obj.variables['JULD'][:]
+    platform_numbers = nc_obj.variables['PLATFORM_NUMBER'][:]
+    lats = nc_obj.variables['LATITUDE'][:]
+    lons = nc_obj.variables['LONGITUDE'][:]
+
+    # read pressure data to get height in meters of sea water (msw)
+    height_ok, heights = get_qc_mask(nc_obj, 'PRES_ADJUSTED',
+                                     error_max=MAX_PRESSURE_ERROR,
+                                     profile_ok=juld_ok)
+
+    # get temperature and ocean salinity values
+    var_names = ('TEMP', 'PSAL')
+    obs_ok_list = []
+    obs_value_list = []
+    for var_name in var_names:
+        obs_ok, obs_values = get_qc_mask(nc_obj, f'{var_name}_ADJUSTED',
+                                         profile_ok=juld_ok)
+        obs_ok_list.append(obs_ok)
+        obs_value_list.append(obs_values)
+    obs_ok = numpy.stack(obs_ok_list, axis=-1)
+    obs_values = numpy.stack(obs_value_list, axis=-1)
+
+    # keep points ordered by profile, then level, then variable
+    point_ok = height_ok[:, :, None] & obs_ok
+    profile_info = {}
+    point_data = []
+    for index_p, index_l, index_v in zip(*numpy.nonzero(point_ok)):
+        if index_p not in profile_info:
+            day_offset = datetime.timedelta(days=float(julian_days[index_p]))
+            profile_info[index_p] = (
+                get_string_value(platform_numbers[index_p]),
+                (ref_dt + day_offset).strftime('%Y%m%d_%H%M%S'),
+                numpy.float64(lats[index_p]),
+                numpy.float64(lons[index_p]),
+            )
+        station_id, valid_time, lat, lon = profile_info[index_p]
+        point = [
+            MESSAGE_TYPE, station_id, valid_time, lat, lon, ELEVATION,
+            var_names[index_v], LEVEL, heights[index_p, index_l], QC_STRING,
+            obs_values[index_p, index_l, index_v],
+        ]
+        point_data.append(point)
+        if DEBUG:
+            print(', '.join([str(val) for val in point]))
 
-    # get reference date time
-    time_str = get_string_value(nc_in.variables['REFERENCE_DATE_TIME'])
-    reference_date_time = datetime.datetime.strptime(time_str, '%Y%m%d%H%M%S')
+    return point_data
+
+
+def read_point_data_legacy(nc_obj, ref_dt):
+    """!Read observations from all profiles and levels of an ARGO file,
+    reading one value at a time.
 
+    @param nc_obj NetCDF object
+    @param ref_dt Datetime object of reference date time
+    @returns list of 11-column observations
+    """
     # get number of profiles and levels
-    num_profiles = nc_in.dimensions['N_PROF'].size
-    num_levels = nc_in.dimensions['N_LEVELS'].size
+    num_profiles = nc_obj.dimensions['N_PROF'].size
+    num_levels = nc_obj.dimensions['N_LEVELS'].size
 
     new_point_data = []
     for index_p in range(0, num_profiles):
         # check QC and mask of JULD to skip profiles with bad time info
-        if get_val_check_qc(nc_in, 'JULD', index_p) is None:
+        if get_val_check_qc(nc_obj, 'JULD', index_p) is None:
             continue
 
-        valid_time = get_valid_time(reference_date_time, nc_in, index_p)
+        valid_time = get_valid_time(ref_dt, nc_obj, index_p)
         station_id = get_string_value(
-            nc_in.variables['PLATFORM_NUMBER'][index_p]
+            nc_obj.variables['PLATFORM_NUMBER'][index_p]
         )
-        lat, lon = get_lat_lon(nc_in, index_p)
+        lat, lon = get_lat_lon(nc_obj, index_p)
 
         # loop through levels
         for index_l in range(0, num_levels):
             # read pressure data to get height in meters of sea water (msw)
-            height = get_val_check_qc(nc_in, 'PRES_ADJUSTED', index_p, index_l,
-                                      error_max=MAX_PRESSURE_ERROR)
+            height = get_val_check_qc(nc_obj, 'PRES_ADJUSTED', index_p,
+                                      index_l, error_max=MAX_PRESSURE_ERROR)
             if height is None:
                 continue
 
             # get temperature and ocean salinity values
             for var_name in ('TEMP', 'PSAL'):
-                observation_value = get_val_check_qc(nc_in,
+                observation_value = get_val_check_qc(nc_obj,
                                                      f'{var_name}_ADJUSTED',
                                                      index_p, index_l)
                 if observation_value is None:
@@ -201,6 +276,54 @@ for input_file in input_files:
                 if DEBUG:
                     print(', '.join([str(val) for val in point]))
 
+    return new_point_data
+
+
+if len(sys.argv) < 2:
+    print(f"ERROR: {__file__} - Must provide at least 1 input file argument")
+    sys.exit(1)
+
+is_ok = True
+input_files = []
+for arg in sys.argv[1:]:
+    if arg.endswith('debug'):
+        print('Debugging output turned on')
+        DEBUG = True
+        continue
+
+    if arg.endswith('legacy'):
+        print('Reading one value at a time')
+        LEGACY = True
+        continue
+
+    input_file = os.path.expandvars(arg)
+    if not os.path.exists(input_file):
+        print(f'ERROR: Input file does not exist: {input_file}')
+        is_ok = False
+        continue
+
+    input_files.append(input_file)
+
+if not is_ok:
+    sys.exit(1)
+
+print(f'Number of input files: {len(input_files)}')
+
+point_data = []
+for input_file in input_files:
+    print(f'Processing file: {input_file}')
+
+    nc_in = netCDF4.Dataset(input_file, 'r')
+
+    # get reference date time
+    time_str = get_string_value(nc_in.variables['REFERENCE_DATE_TIME'])
+    reference_date_time = datetime.datetime.strptime(time_str, '%Y%m%d%H%M%S')
+
+    if LEGACY:
+        new_point_data = read_point_data_legacy(nc_in, reference_date_time)
+    else:
+        new_point_data = read_point_data(nc_in, reference_date_time)
+
     point_data.extend(new_point_data)
     nc_in.close()
 
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+'''
+Name: subseasonal_stats_grid2grid_create_avgs.py
+Contact(s): Shannon Shields
+Abstract: This script is run by subseasonal_stats_grid2grid_create_job_
+          scripts.py in ush/subseasonal.
+          This script is used to create the daily, weekly, Days 6-10,
+          Weeks 3-4, and monthly averages for variable from netCDF
+          output for all of the average jobs in avg_job_list, which
+          share the same input files. All of the averages are made
+          in one pass over the input files, so an input file used by
+          averages of different lengths is read once.
+'''
+
+import os
+import sys
+import datetime
+import subseasonal_util as sub_util
+
+USHevs = os.environ['USHevs']
+
+# Load global_det modules
+MODULES_DIR = "global_det"
+sys.path.append(os.path.abspath(os.path.join(USHevs, MODULES_DIR)))
+import global_det_atmos_temporal_avg as gda_temporal_avg
+
+print("BEGIN: "+os.path.basename(__file__))
+
+# Read in environment variables
+DATA = os.environ['DATA']
+RUN = os.environ['RUN']
+NET = os.environ['NET']
+VERIF_CASE = os.environ['VERIF_CASE']
+STEP = os.environ['STEP']
+COMPONENT = os.environ['COMPONENT']
+VERIF_TYPE = os.environ['VERIF_TYPE']
+avg_job_list = os.environ['avg_job_list'].split(',')
+MODEL = os.environ['MODEL']
+DATE = os.environ['DATE']
+valid_hr_start = os.environ['valid_hr_start']
+valid_hr_end = os.environ['valid_hr_end']
+valid_hr_inc = os.environ['valid_hr_inc']
+fhr_inc = '12'
+
+# Process run time arguments
+if len(sys.argv) != 4:
+    print("FATAL ERROR: Not given correct number of run time arguments..."
+          +os.path.basename(__file__)+" VARNAME_VARLEVEL DATAROOT_FILE_FORMAT "
+          +"COMIN_FILE_FORMAT")
+    sys.exit(1)
+else:
+    if '_' not in sys.argv[1]:
+        print("FATAL ERROR: variable and level runtime argument formatted "
+              +"incorrectly, be sure to separate variable and level with "
+              +"an underscore (_), example HGT_P500")
+        sys.exit(1)
+    else:
+        var_level = sys.argv[1]
+        print("Using var_level = "+var_level)
+    DATAROOT_file_format = sys.argv[2]
+    COMIN_file_format = sys.argv[3]
+
+# Set input and output directories
+output_dir = os.path.join(DATA, VERIF_CASE+'_'+STEP, 'METplus_output',
+                          RUN+'.'+DATE)
+
+# Averages by job name prefix: output file name prefix, name appended
+# to the averaged variable names, label, length (hours), first and
+# increment of the averaging end day, and number of input files needed
+avg_info_dict = {
+    'DailyAvg': {'file_prefix': 'daily_avg_', 'avg_name': 'DAILYAVG',
+                 'avg_label': 'Daily', 'nhours': 24,
+                 'day_start': 1, 'day_inc': 1, 'expected_nfiles': 3},
+    'WeeklyAvg': {'file_prefix': 'weekly_avg_', 'avg_name': 'WEEKLYAVG',
+                  'avg_label': 'Weekly', 'nhours': 168,
+                  'day_start': 7, 'day_inc': 7, 'expected_nfiles': 12},
+    'Days6_10Avg': {'file_prefix': 'days6_10_avg_',
+                    'avg_name': 'DAYS6_10AVG', 'avg_label': 'Days 6-10',
+                    'nhours': 120, 'day_start': 10, 'day_inc': 1,
+                    'expected_nfiles': 9},
+    'Weeks3_4Avg': {'file_prefix': 'weeks3_4_avg_',
+                    'avg_name': 'WEEKS3_4AVG', 'avg_label': 'Weeks 3-4',
+                    'nhours': 336, 'day_start': 28, 'day_inc': 1,
+                    'expected_nfiles': 23},
+    'MonthlyAvg': {'file_prefix': 'monthly_avg_', 'avg_name': 'MONTHLYAVG',
+                   'avg_label': 'Monthly', 'nhours': 720,
+                   'day_start': 30, 'day_inc': 1, 'expected_nfiles': 49},
+}
+
+# Get average windows of all jobs, skipping those already made
+avg_window_list = []
+for job_name in avg_job_list:
+    avg_type, job_var = job_name.rsplit('_', 1)
+    avg_info = avg_info_dict[avg_type]
+    print(f"\nCreating {avg_info['avg_label']} average files for "
+          +job_name)
+    if job_var in ['GeoHeight', 'Temp2m']:
+        data_name_list = ['FCST', 'OBS', 'CLIMO_MEAN']
+    else:
+        data_name_list = ['FCST', 'OBS']
+    fhr_list = os.environ['fhr_list_'+job_name].split(',')
+    valid_hr = int(valid_hr_start)
+    while valid_hr <= int(valid_hr_end):
+        avg_valid_end = datetime.datetime.strptime(DATE+str(valid_hr),
+                                                   '%Y%m%d%H')
+        avg_valid_start = (avg_valid_end
+                           - datetime.timedelta(hours=avg_info['nhours']))
+        avg_day_end = int(fhr_list[-1])/24
+        avg_day = avg_info['day_start']
+        while avg_day <= avg_day_end:
+            avg_day_fhr_end = int(avg_day * 24)
+            avg_day_fhr_start = avg_day_fhr_end - avg_info['nhours']
+            avg_day_init = avg_valid_end - datetime.timedelta(days=avg_day)
+            output_file = os.path.join(output_dir, MODEL, VERIF_CASE,
+                                       avg_info['file_prefix']
+                                       +VERIF_TYPE+'_'+job_name+'_init'
+                                       +avg_day_init.strftime('%Y%m%d%H')
+                                       +'_valid'
+                                       +avg_valid_start\
+                                       .strftime('%Y%m%d%H')+'to'
+                                       +avg_valid_end\
+                                       .strftime('%Y%m%d%H')+'.nc')
+            avg_day+=avg_info['day_inc']
+            if sub_util.check_file_exists_size(output_file):
+                print("Output File exists: "+output_file)
+                continue
+            avg_window_list.append(gda_temporal_avg.get_avg_window(
+                output_file, avg_day_init, avg_valid_end,
+                list(range(avg_day_fhr_start, avg_day_fhr_end+1,
+                           int(fhr_inc))),
+                DATAROOT_file_format, COMIN_file_format, data_name_list,
+                avg_info['avg_name'], avg_info['avg_label'],
+                avg_info['expected_nfiles'],
+                format_filler=sub_util.format_filler, alert_word='WARNING'
+            ))
+        valid_hr+=int(valid_hr_inc)
+
+# Make the averages of all jobs reading each input file once
+print(f"\nMaking {len(avg_window_list)} average files")
+gda_temporal_avg.create_avg_files(avg_window_list, var_level,
+                                  write_lat_lon=False)
+
+print("END: "+os.path.basename(__file__))
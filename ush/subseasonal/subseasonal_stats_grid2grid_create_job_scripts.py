@@ -7,7 +7,8 @@ Abstract: This script is run by exevs_subseasonal_grid2grid_stats.sh
           This creates multiple independent job scripts. These
           jobs contain all the necessary environment variables
           and commands to needed to run the specific
-          use case.
+          use case. Each assemble_data job makes the averages of
+          all average jobs reading the same input files.
 '''
 
 import sys
@@ -63,628 +64,193 @@ assemble_data_obs_jobs_dict = {
 }
 assemble_data_model_jobs_dict = {
     'temp': {
-        'WeeklyAvg_TempAnom2m': {'env': {'var1_name': 'TMP',
-                                         'var1_levels': 'Z2'},
-                                 'commands': [sub_util.python_command(
-                                                  'subseasonal_'
-                                                  +'stats_grid2grid'
-                                                  +'_create_weekly_avg.py',
-                                                  ['TMP_ANOM_Z2',
-                                                   os.path.join(
-                                                       '$DATA',
-                                                       '${VERIF_CASE}_'
-                                                       +'${STEP}',
-                                                       'METplus_output',
-                                                       '${RUN}.'
-                                                       +'$DATE',
-                                                       '$MODEL',
-                                                       '$VERIF_CASE',
-                                                       'anomaly_'
-                                                       +'${VERIF_TYPE}_'
-                                                       +'TempAnom2m_init'
-                                                       +'{init?fmt=%Y%m%d%H}_'
-                                                       +'fhr{lead?fmt=%3H}.nc'
-                                                   ),
-                                                   os.path.join(
-                                                       '$COMOUT',
-                                                       '${RUN}.'
-                                                       +'$DATE',
-                                                       '$MODEL',
-                                                       '$VERIF_CASE',
-                                                       'anomaly_'
-                                                       +'${VERIF_TYPE}_'
-                                                       +'TempAnom2m_init'
-                                                       +'{init?fmt=%Y%m%d%H}_'
-                                                       +'fhr{lead?fmt=%3H}.nc'
-                                                   )]
-                                              )]},
-        'Days6_10Avg_TempAnom2m': {'env': {'var1_name': 'TMP',
-                                           'var1_levels': 'Z2'},
-                                   'commands': [sub_util.python_command(
-                                                    'subseasonal_'
-                                                    +'stats_grid2grid'
-                                                    +'_create_days6_10_avg.py',
-                                                    ['TMP_ANOM_Z2',
-                                                     os.path.join(
-                                                         '$DATA',
-                                                         '${VERIF_CASE}_'
-                                                         +'${STEP}',
-                                                         'METplus_output',
-                                                         '${RUN}.'
-                                                         +'$DATE',
-                                                         '$MODEL',
-                                                         '$VERIF_CASE',
-                                                         'anomaly_'
-                                                         +'${VERIF_TYPE}_'
-                                                         +'TempAnom2m_init'
-                                                         +'{init?fmt=%Y%m%d%H}_'
-                                                         +'fhr{lead?fmt=%3H}.nc'
-                                                     ),
-                                                     os.path.join(
-                                                         '$COMOUT',
-                                                         '${RUN}.'
-                                                         +'$DATE',
-                                                         '$MODEL',
-                                                         '$VERIF_CASE',
-                                                         'anomaly_'
-                                                         +'${VERIF_TYPE}_'
-                                                         +'TempAnom2m_init'
-                                                         +'{init?fmt=%Y%m%d%H}_'
-                                                         +'fhr{lead?fmt=%3H}.nc'
-                                                     )]
-                                                )]},
-        'Weeks3_4Avg_TempAnom2m': {'env': {'var1_name': 'TMP',
-                                           'var1_levels': 'Z2'},
-                                   'commands': [sub_util.python_command(
-                                                    'subseasonal_'
-                                                    +'stats_grid2grid'
-                                                    +'_create_weeks3_4_avg.py',
-                                                    ['TMP_ANOM_Z2',
-                                                     os.path.join(
-                                                         '$DATA',
-                                                         '${VERIF_CASE}_'
-                                                         +'${STEP}',
-                                                         'METplus_output',
-                                                         '${RUN}.'
-                                                         +'$DATE',
-                                                         '$MODEL',
-                                                         '$VERIF_CASE',
-                                                         'anomaly_'
-                                                         +'${VERIF_TYPE}_'
-                                                         +'TempAnom2m_init'
-                                                         +'{init?fmt=%Y%m%d%H}_'
-                                                         +'fhr{lead?fmt=%3H}.nc'
-                                                     ),
-                                                     os.path.join(
-                                                         '$COMOUT',
-                                                         '${RUN}.'
-                                                         +'$DATE',
-                                                         '$MODEL',
-                                                         '$VERIF_CASE',
-                                                         'anomaly_'
-                                                         +'${VERIF_TYPE}_'
-                                                         +'TempAnom2m_init'
-                                                         +'{init?fmt=%Y%m%d%H}_'
-                                                         +'fhr{lead?fmt=%3H}.nc'
-                                                     )]
-                                                )]},
-        'WeeklyAvg_Temp2m': {'env': {'var1_name': 'TMP',
-                                     'var1_levels': 'Z2'},
-                             'commands': [sub_util.python_command(
-                                              'subseasonal_'
-                                              +'stats_grid2grid'
-                                              +'_create_weekly_avg.py',
-                                              ['TMP_Z2',
-                                               os.path.join(
-                                                   '$DATA',
-                                                   '${VERIF_CASE}_'
-                                                   +'${STEP}',
-                                                   'METplus_output',
-                                                   '${RUN}.'
-                                                   +'$DATE',
-                                                   '$MODEL',
-                                                   '$VERIF_CASE',
-                                                   'grid_stat_'
-                                                   +'${VERIF_TYPE}_'
-                                                   +'TempAnom2m_'
-                                                   +'{lead?fmt=%2H}0000L_'
-                                                   +'{valid?fmt=%Y%m%d}_'
-                                                   +'{valid?fmt=%H}0000V_'
-                                                   +'pairs.nc'
-                                               ),
-                                               os.path.join(
-                                                   '$COMOUT',
-                                                   '${RUN}.'
-                                                   +'$DATE',
-                                                   '$MODEL',
-                                                   '$VERIF_CASE',
-                                                   'grid_stat_'
-                                                   +'${VERIF_TYPE}_'
-                                                   +'TempAnom2m_'
-                                                   +'{lead?fmt=%2H}0000L_'
-                                                   +'{valid?fmt=%Y%m%d}_'
-                                                   +'{valid?fmt=%H}0000V_'
-                                                   +'pairs.nc'
-                                               )]
-                                          )]},
-        'Days6_10Avg_Temp2m': {'env': {'var1_name': 'TMP',
-                                       'var1_levels': 'Z2'},
-                               'commands': [sub_util.python_command(
-                                                'subseasonal_'
-                                                +'stats_grid2grid'
-                                                +'_create_days6_10_avg.py',
-                                                ['TMP_Z2',
-                                                 os.path.join(
-                                                     '$DATA',
-                                                     '${VERIF_CASE}_'
-                                                     +'${STEP}',
-                                                     'METplus_output',
-                                                     '${RUN}.'
-                                                     +'$DATE',
-                                                     '$MODEL',
-                                                     '$VERIF_CASE',
-                                                     'grid_stat_'
-                                                     +'${VERIF_TYPE}_'
-                                                     +'TempAnom2m_'
-                                                     +'{lead?fmt=%2H}0000L_'
-                                                     +'{valid?fmt=%Y%m%d}_'
-                                                     +'{valid?fmt=%H}0000V_'
-                                                     +'pairs.nc'
-                                                 ),
-                                                 os.path.join(
-                                                     '$COMOUT',
-                                                     '${RUN}.'
-                                                     +'$DATE',
-                                                     '$MODEL',
-                                                     '$VERIF_CASE',
-                                                     'grid_stat_'
-                                                     +'${VERIF_TYPE}_'
-                                                     +'TempAnom2m_'
-                                                     +'{lead?fmt=%2H}0000L_'
-                                                     +'{valid?fmt=%Y%m%d}_'
-                                                     +'{valid?fmt=%H}0000V_'
-                                                     +'pairs.nc'
-                                                 )]
-                                            )]},
-        'Weeks3_4Avg_Temp2m': {'env': {'var1_name': 'TMP',
-                                       'var1_levels': 'Z2'},
-                               'commands': [sub_util.python_command(
-                                                'subseasonal_'
-                                                +'stats_grid2grid'
-                                                +'_create_weeks3_4_avg.py',
-                                                ['TMP_Z2',
-                                                 os.path.join(
-                                                     '$DATA',
-                                                     '${VERIF_CASE}_'
-                                                     +'${STEP}',
-                                                     'METplus_output',
-                                                     '${RUN}.'
-                                                     +'$DATE',
-                                                     '$MODEL',
-                                                     '$VERIF_CASE',
-                                                     'grid_stat_'
-                                                     +'${VERIF_TYPE}_'
-                                                     +'TempAnom2m_'
-                                                     +'{lead?fmt=%2H}0000L_'
-                                                     +'{valid?fmt=%Y%m%d}_'
-                                                     +'{valid?fmt=%H}0000V_'
-                                                     +'pairs.nc'
-                                                 ),
-                                                 os.path.join(
-                                                     '$COMOUT',
-                                                     '${RUN}.'
-                                                     +'$DATE',
-                                                     '$MODEL',
-                                                     '$VERIF_CASE',
-                                                     'grid_stat_'
-                                                     +'${VERIF_TYPE}_'
-                                                     +'TempAnom2m_'
-                                                     +'{lead?fmt=%2H}0000L_'
-                                                     +'{valid?fmt=%Y%m%d}_'
-                                                     +'{valid?fmt=%H}0000V_'
-                                                     +'pairs.nc'
-                                                 )]
-                                            )]},
+        'TempAnom2m': {'env': {'var1_name': 'TMP',
+                               'var1_levels': 'Z2'},
+                       'avg_jobs': ['WeeklyAvg_TempAnom2m',
+                                    'Days6_10Avg_TempAnom2m',
+                                    'Weeks3_4Avg_TempAnom2m'],
+                       'commands': [sub_util.python_command(
+                                        'subseasonal_stats_grid2grid'
+                                        +'_create_avgs.py',
+                                        ['TMP_ANOM_Z2',
+                                         os.path.join(
+                                             '$DATA',
+                                             '${VERIF_CASE}_${STEP}',
+                                             'METplus_output',
+                                             '${RUN}.$DATE',
+                                             '$MODEL', '$VERIF_CASE',
+                                             'anomaly_${VERIF_TYPE}_'
+                                             +'TempAnom2m_init'
+                                             +'{init?fmt=%Y%m%d%H}_'
+                                             +'fhr{lead?fmt=%3H}.nc'
+                                         ),
+                                         os.path.join(
+                                             '$COMOUT',
+                                             '${RUN}.$DATE',
+                                             '$MODEL', '$VERIF_CASE',
+                                             'anomaly_${VERIF_TYPE}_'
+                                             +'TempAnom2m_init'
+                                             +'{init?fmt=%Y%m%d%H}_'
+                                             +'fhr{lead?fmt=%3H}.nc'
+                                         )])]},
+        'Temp2m': {'env': {'var1_name': 'TMP',
+                           'var1_levels': 'Z2'},
+                   'avg_jobs': ['WeeklyAvg_Temp2m',
+                                'Days6_10Avg_Temp2m',
+                                'Weeks3_4Avg_Temp2m'],
+                   'commands': [sub_util.python_command(
+                                    'subseasonal_stats_grid2grid'
+                                    +'_create_avgs.py',
+                                    ['TMP_Z2',
+                                     os.path.join(
+                                         '$DATA',
+                                         '${VERIF_CASE}_${STEP}',
+                                         'METplus_output',
+                                         '${RUN}.$DATE',
+                                         '$MODEL', '$VERIF_CASE',
+                                         'grid_stat_${VERIF_TYPE}_'
+                                         +'TempAnom2m_'
+                                         +'{lead?fmt=%2H}0000L_'
+                                         +'{valid?fmt=%Y%m%d}_'
+                                         +'{valid?fmt=%H}0000V_pairs.nc'
+                                     ),
+                                     os.path.join(
+                                         '$COMOUT',
+                                         '${RUN}.$DATE',
+                                         '$MODEL', '$VERIF_CASE',
+                                         'grid_stat_${VERIF_TYPE}_'
+                                         +'TempAnom2m_'
+                                         +'{lead?fmt=%2H}0000L_'
+                                         +'{valid?fmt=%Y%m%d}_'
+                                         +'{valid?fmt=%H}0000V_pairs.nc'
+                                     )])]}
     },
     'pres_lvls': {
-        'WeeklyAvg_GeoHeightAnom': {'env': {'var1_name': 'HGT',
-                                            'var1_levels': 'P500'},
-                                    'commands': [sub_util.python_command(
-                                                     'subseasonal_'
-                                                     +'stats_grid2grid'
-                                                     +'_create_weekly_avg.py',
-                                                     ['HGT_ANOM_P500',
-                                                      os.path.join(
-                                                          '$DATA',
-                                                          '${VERIF_CASE}_'
-                                                          +'${STEP}',
-                                                          'METplus_output',
-                                                          '${RUN}.'
-                                                          +'$DATE',
-                                                          '$MODEL',
-                                                          '$VERIF_CASE',
-                                                          'anomaly_'
-                                                          +'${VERIF_TYPE}_'
-                                                          +'GeoHeightAnom_init'
-                                                          +'{init?fmt=%Y%m%d%H}_'
-                                                          +'fhr{lead?fmt=%3H}.nc'
-                                                      ),
-                                                      os.path.join(
-                                                          '$COMOUT',
-                                                          '${RUN}.'
-                                                          +'$DATE',
-                                                          '$MODEL',
-                                                          '$VERIF_CASE',
-                                                          'anomaly_'
-                                                          +'${VERIF_TYPE}_'
-                                                          +'GeoHeightAnom_init'
-                                                          +'{init?fmt=%Y%m%d%H}_'
-                                                          +'fhr{lead?fmt=%3H}.nc'
-                                                      )]
-                                                 )]},
-        'Days6_10Avg_GeoHeightAnom': {'env': {'var1_name': 'HGT',
-                                              'var1_levels': 'P500'},
-                                      'commands': [sub_util.python_command(
-                                                       'subseasonal_'
-                                                       +'stats_grid2grid'
-                                                       +'_create_days6_10_avg.py',
-                                                       ['HGT_ANOM_P500',
-                                                        os.path.join(
-                                                            '$DATA',
-                                                            '${VERIF_CASE}_'
-                                                            +'${STEP}',
-                                                            'METplus_output',
-                                                            '${RUN}.'
-                                                            +'$DATE',
-                                                            '$MODEL',
-                                                            '$VERIF_CASE',
-                                                            'anomaly_'
-                                                            +'${VERIF_TYPE}_'
-                                                            +'GeoHeightAnom_init'
-                                                            +'{init?fmt=%Y%m%d%H}_'
-                                                            +'fhr{lead?fmt=%3H}.nc'
-                                                        ),
-                                                        os.path.join(
-                                                            '$COMOUT',
-                                                            '${RUN}.'
-                                                            +'$DATE',
-                                                            '$MODEL',
-                                                            '$VERIF_CASE',
-                                                            'anomaly_'
-                                                            +'${VERIF_TYPE}_'
-                                                            +'GeoHeightAnom_init'
-                                                            +'{init?fmt=%Y%m%d%H}_'
-                                                            +'fhr{lead?fmt=%3H}.nc'
-                                                        )]
-                                                   )]},
-        'Weeks3_4Avg_GeoHeightAnom': {'env': {'var1_name': 'HGT',
-                                              'var1_levels': 'P500'},
-                                      'commands': [sub_util.python_command(
-                                                       'subseasonal_'
-                                                       +'stats_grid2grid'
-                                                       +'_create_weeks3_4_avg.py',
-                                                       ['HGT_ANOM_P500',
-                                                        os.path.join(
-                                                            '$DATA',
-                                                            '${VERIF_CASE}_'
-                                                            +'${STEP}',
-                                                            'METplus_output',
-                                                            '${RUN}.'
-                                                            +'$DATE',
-                                                            '$MODEL',
-                                                            '$VERIF_CASE',
-                                                            'anomaly_'
-                                                            +'${VERIF_TYPE}_'
-                                                            +'GeoHeightAnom_init'
-                                                            +'{init?fmt=%Y%m%d%H}_'
-                                                            +'fhr{lead?fmt=%3H}.nc'
-                                                        ),
-                                                        os.path.join(
-                                                            '$COMOUT',
-                                                            '${RUN}.'
-                                                            +'$DATE',
-                                                            '$MODEL',
-                                                            '$VERIF_CASE',
-                                                            'anomaly_'
-                                                            +'${VERIF_TYPE}_'
-                                                            +'GeoHeightAnom_init'
-                                                            +'{init?fmt=%Y%m%d%H}_'
-                                                            +'fhr{lead?fmt=%3H}.nc'
-                                                        )]
-                                                   )]},
-        'WeeklyAvg_GeoHeight': {'env': {'var1_name': 'HGT',
-                                        'var1_levels': 'P500'},
-                                'commands': [sub_util.python_command(
-                                                 'subseasonal_'
-                                                 +'stats_grid2grid'
-                                                 +'_create_weekly_avg.py',
-                                                 ['HGT_P500',
-                                                  os.path.join(
-                                                      '$DATA',
-                                                      '${VERIF_CASE}_'
-                                                      +'${STEP}',
-                                                      'METplus_output',
-                                                      '${RUN}.'
-                                                      +'$DATE',
-                                                      '$MODEL',
-                                                      '$VERIF_CASE',
-                                                      'grid_stat_'
-                                                      +'${VERIF_TYPE}_'
-                                                      +'GeoHeightAnom_'
-                                                      +'{lead?fmt=%2H}0000L_'
-                                                      +'{valid?fmt=%Y%m%d}_'
-                                                      +'{valid?fmt=%H}0000V_'
-                                                      +'pairs.nc'
-                                                  ),
-                                                  os.path.join(
-                                                      '$COMOUT',
-                                                      '${RUN}.'
-                                                      +'$DATE',
-                                                      '$MODEL',
-                                                      '$VERIF_CASE',
-                                                      'grid_stat_'
-                                                      +'${VERIF_TYPE}_'
-                                                      +'GeoHeightAnom_'
-                                                      +'{lead?fmt=%2H}0000L_'
-                                                      +'{valid?fmt=%Y%m%d}_'
-                                                      +'{valid?fmt=%H}0000V_'
-                                                      +'pairs.nc'
-                                                  )]
-                                            )]},
-        'Days6_10Avg_GeoHeight': {'env': {'var1_name': 'HGT',
-                                          'var1_levels': 'P500'},
-                                  'commands': [sub_util.python_command(
-                                                   'subseasonal_'
-                                                   +'stats_grid2grid'
-                                                   +'_create_days6_10_avg.py',
-                                                   ['HGT_P500',
-                                                    os.path.join(
-                                                        '$DATA',
-                                                        '${VERIF_CASE}_'
-                                                        +'${STEP}',
-                                                        'METplus_output',
-                                                        '${RUN}.'
-                                                        +'$DATE',
-                                                        '$MODEL',
-                                                        '$VERIF_CASE',
-                                                        'grid_stat_'
-                                                        +'${VERIF_TYPE}_'
-                                                        +'GeoHeightAnom_'
-                                                        +'{lead?fmt=%2H}0000L_'
-                                                        +'{valid?fmt=%Y%m%d}_'
-                                                        +'{valid?fmt=%H}0000V_'
-                                                        +'pairs.nc'
-                                                    ),
-                                                    os.path.join(
-                                                        '$COMOUT',
-                                                        '${RUN}.'
-                                                        +'$DATE',
-                                                        '$MODEL',
-                                                        '$VERIF_CASE',
-                                                        'grid_stat_'
-                                                        +'${VERIF_TYPE}_'
-                                                        +'GeoHeightAnom_'
-                                                        +'{lead?fmt=%2H}0000L_'
-                                                        +'{valid?fmt=%Y%m%d}_'
-                                                        +'{valid?fmt=%H}0000V_'
-                                                        +'pairs.nc'
-                                                    )]
-                                               )]},
-        'Weeks3_4Avg_GeoHeight': {'env': {'var1_name': 'HGT',
-                                          'var1_levels': 'P500'},
-                                  'commands': [sub_util.python_command(
-                                                   'subseasonal_'
-                                                   +'stats_grid2grid'
-                                                   +'_create_weeks3_4_avg.py',
-                                                   ['HGT_P500',
-                                                    os.path.join(
-                                                        '$DATA',
-                                                        '${VERIF_CASE}_'
-                                                        +'${STEP}',
-                                                        'METplus_output',
-                                                        '${RUN}.'
-                                                        +'$DATE',
-                                                        '$MODEL',
-                                                        '$VERIF_CASE',
-                                                        'grid_stat_'
-                                                        +'${VERIF_TYPE}_'
-                                                        +'GeoHeightAnom_'
-                                                        +'{lead?fmt=%2H}0000L_'
-                                                        +'{valid?fmt=%Y%m%d}_'
-                                                        +'{valid?fmt=%H}0000V_'
-                                                        +'pairs.nc'
-                                                    ),
-                                                    os.path.join(
-                                                        '$COMOUT',
-                                                        '${RUN}.'
-                                                        +'$DATE',
-                                                        '$MODEL',
-                                                        '$VERIF_CASE',
-                                                        'grid_stat_'
-                                                        +'${VERIF_TYPE}_'
-                                                        +'GeoHeightAnom_'
-                                                        +'{lead?fmt=%2H}0000L_'
-                                                        +'{valid?fmt=%Y%m%d}_'
-                                                        +'{valid?fmt=%H}0000V_'
-                                                        +'pairs.nc'
-                                                    )]
-                                               )]},
+        'GeoHeightAnom': {'env': {'var1_name': 'HGT',
+                                  'var1_levels': 'P500'},
+                          'avg_jobs': ['WeeklyAvg_GeoHeightAnom',
+                                       'Days6_10Avg_GeoHeightAnom',
+                                       'Weeks3_4Avg_GeoHeightAnom'],
+                          'commands': [sub_util.python_command(
+                                           'subseasonal_stats_grid2grid'
+                                           +'_create_avgs.py',
+                                           ['HGT_ANOM_P500',
+                                            os.path.join(
+                                                '$DATA',
+                                                '${VERIF_CASE}_${STEP}',
+                                                'METplus_output',
+                                                '${RUN}.$DATE',
+                                                '$MODEL', '$VERIF_CASE',
+                                                'anomaly_${VERIF_TYPE}_'
+                                                +'GeoHeightAnom_init'
+                                                +'{init?fmt=%Y%m%d%H}_'
+                                                +'fhr{lead?fmt=%3H}.nc'
+                                            ),
+                                            os.path.join(
+                                                '$COMOUT',
+                                                '${RUN}.$DATE',
+                                                '$MODEL', '$VERIF_CASE',
+                                                'anomaly_${VERIF_TYPE}_'
+                                                +'GeoHeightAnom_init'
+                                                +'{init?fmt=%Y%m%d%H}_'
+                                                +'fhr{lead?fmt=%3H}.nc'
+                                            )])]},
+        'GeoHeight': {'env': {'var1_name': 'HGT',
+                              'var1_levels': 'P500'},
+                      'avg_jobs': ['WeeklyAvg_GeoHeight',
+                                   'Days6_10Avg_GeoHeight',
+                                   'Weeks3_4Avg_GeoHeight'],
+                      'commands': [sub_util.python_command(
+                                       'subseasonal_stats_grid2grid'
+                                       +'_create_avgs.py',
+                                       ['HGT_P500',
+                                        os.path.join(
+                                            '$DATA',
+                                            '${VERIF_CASE}_${STEP}',
+                                            'METplus_output',
+                                            '${RUN}.$DATE',
+                                            '$MODEL', '$VERIF_CASE',
+                                            'grid_stat_${VERIF_TYPE}_'
+                                            +'GeoHeightAnom_'
+                                            +'{lead?fmt=%2H}0000L_'
+                                            +'{valid?fmt=%Y%m%d}_'
+                                            +'{valid?fmt=%H}0000V_pairs.nc'
+                                        ),
+                                        os.path.join(
+                                            '$COMOUT',
+                                            '${RUN}.$DATE',
+                                            '$MODEL', '$VERIF_CASE',
+                                            'grid_stat_${VERIF_TYPE}_'
+                                            +'GeoHeightAnom_'
+                                            +'{lead?fmt=%2H}0000L_'
+                                            +'{valid?fmt=%Y%m%d}_'
+                                            +'{valid?fmt=%H}0000V_pairs.nc'
+                                        )])]}
     },
     'seaice': {
-        'WeeklyAvg_Concentration': {'env': {'var1_name': 'ICEC',
-                                            'var1_levels': 'Z0',},
-                                    'commands': [sub_util.python_command(
-                                                     'subseasonal_stats_'
-                                                     +'grid2grid_create_'
-                                                     +'weekly_avg.py',
-                                                     ['ICEC_Z0',
-                                                      os.path.join(
-                                                          '$DATA',
-                                                          '${VERIF_CASE}_'
-                                                          +'${STEP}',
-                                                          'METplus_output',
-                                                          '${RUN}.'
-                                                          +'$DATE',
-                                                          '$MODEL',
-                                                          '$VERIF_CASE',
-                                                          'grid_stat_'
-                                                          +'${VERIF_TYPE}_'
-                                                          +'Concentration_'
-                                                          +'{lead?fmt=%2H}0000L_'
-                                                          +'{valid?fmt=%Y%m%d}_'
-                                                          +'{valid?fmt=%H}0000V_'
-                                                          +'pairs.nc'
-                                                      ),
-                                                      os.path.join(
-                                                          '$COMOUT',
-                                                          '${RUN}.'
-                                                          +'$DATE',
-                                                          '$MODEL',
-                                                          '$VERIF_CASE',
-                                                          'grid_stat_'
-                                                          +'${VERIF_TYPE}_'
-                                                          +'Concentration_'
-                                                          +'{lead?fmt=%2H}0000L_'
-                                                          +'{valid?fmt=%Y%m%d}_'
-                                                          +'{valid?fmt=%H}0000V_'
-                                                          +'pairs.nc'
-                                                      )])]},
-        'MonthlyAvg_Concentration': {'env': {'var1_name': 'ICEC',
-                                             'var1_levels': 'Z0',},
-                                     'commands': [sub_util.python_command(
-                                                      'subseasonal_stats_'
-                                                      +'grid2grid_create_'
-                                                      +'monthly_avg.py',
-                                                      ['ICEC_Z0',
-                                                       os.path.join(
-                                                           '$DATA',
-                                                           '${VERIF_CASE}_'
-                                                           +'${STEP}',
-                                                           'METplus_output',
-                                                           '${RUN}.'
-                                                           +'$DATE',
-                                                           '$MODEL',
-                                                           '$VERIF_CASE',
-                                                           'grid_stat_'
-                                                           +'${VERIF_TYPE}_'
-                                                           +'Concentration_'
-                                                           +'{lead?fmt=%2H}0000L_'
-                                                           +'{valid?fmt=%Y%m%d}_'
-                                                           +'{valid?fmt=%H}0000V_'
-                                                           +'pairs.nc'
-                                                       ),
-                                                       os.path.join(
-                                                           '$COMOUT',
-                                                           '${RUN}.'
-                                                           +'$DATE',
-                                                           '$MODEL',
-                                                           '$VERIF_CASE',
-                                                           'grid_stat_'
-                                                           +'${VERIF_TYPE}_'
-                                                           +'Concentration_'
-                                                           +'{lead?fmt=%2H}0000L_'
-                                                           +'{valid?fmt=%Y%m%d}_'
-                                                           +'{valid?fmt=%H}0000V_'
-                                                           +'pairs.nc'
-                                                       )])]},
-    },
-    'sst': {
-        'DailyAvg_SST': {'env': {'var1_name': 'TMP',
-                                 'var1_levels': 'Z0'},
-                         'commands': [sub_util.python_command(
-                                          'subseasonal_'
-                                          +'stats_grid2grid'
-                                          +'_create_daily_avg.py',
-                                          ['TMP_Z0',
-                                           os.path.join(
-                                              '$DATA',
-                                              '${VERIF_CASE}_${STEP}',
-                                              'METplus_output',
-                                              '${RUN}.$DATE',
-                                              '$MODEL', '$VERIF_CASE',
-                                              'grid_stat_${VERIF_TYPE}_'
-                                              +'SST_'
-                                              +'{lead?fmt=%2H}0000L_'
-                                              +'{valid?fmt=%Y%m%d}_'
-                                              +'{valid?fmt=%H}0000V_pairs.nc'
-                                          ),
-                                          os.path.join(
-                                               '$COMOUT',
-                                               '${RUN}.$DATE',
-                                               '$MODEL', '$VERIF_CASE',
-                                               'grid_stat_${VERIF_TYPE}_'
-                                               +'SST_'
-                                               +'{lead?fmt=%2H}0000L_'
-                                               +'{valid?fmt=%Y%m%d}_'
-                                               +'{valid?fmt=%H}0000V_pairs.nc'
-                                           )])]},
-        'WeeklyAvg_SST': {'env': {'var1_name': 'TMP',
-                                  'var1_levels': 'Z0',},
+        'Concentration': {'env': {'var1_name': 'ICEC',
+                                  'var1_levels': 'Z0'},
+                          'avg_jobs': ['WeeklyAvg_Concentration',
+                                       'MonthlyAvg_Concentration'],
                           'commands': [sub_util.python_command(
-                                           'subseasonal_stats_'
-                                           +'grid2grid_create_'
-                                           +'weekly_avg.py',
-                                           ['TMP_Z0',
+                                           'subseasonal_stats_grid2grid'
+                                           +'_create_avgs.py',
+                                           ['ICEC_Z0',
                                             os.path.join(
                                                 '$DATA',
-                                                '${VERIF_CASE}_'
-                                                +'${STEP}',
+                                                '${VERIF_CASE}_${STEP}',
                                                 'METplus_output',
-                                                '${RUN}.'
-                                                +'$DATE',
-                                                '$MODEL',
-                                                '$VERIF_CASE',
-                                                'grid_stat_'
-                                                +'${VERIF_TYPE}_'
-                                                +'SST_'
+                                                '${RUN}.$DATE',
+                                                '$MODEL', '$VERIF_CASE',
+                                                'grid_stat_${VERIF_TYPE}_'
+                                                +'Concentration_'
                                                 +'{lead?fmt=%2H}0000L_'
                                                 +'{valid?fmt=%Y%m%d}_'
-                                                +'{valid?fmt=%H}0000V_'
-                                                +'pairs.nc'
+                                                +'{valid?fmt=%H}0000V_pairs.nc'
                                             ),
                                             os.path.join(
                                                 '$COMOUT',
-                                                '${RUN}.'
-                                                +'$DATE',
-                                                '$MODEL',
-                                                '$VERIF_CASE',
-                                                'grid_stat_'
-                                                +'${VERIF_TYPE}_'
-                                                +'SST_'
+                                                '${RUN}.$DATE',
+                                                '$MODEL', '$VERIF_CASE',
+                                                'grid_stat_${VERIF_TYPE}_'
+                                                +'Concentration_'
                                                 +'{lead?fmt=%2H}0000L_'
                                                 +'{valid?fmt=%Y%m%d}_'
-                                                +'{valid?fmt=%H}0000V_'
-                                                +'pairs.nc'
-                                            )])]},
-        'MonthlyAvg_SST': {'env': {'var1_name': 'TMP',
-                                   'var1_levels': 'Z0'},
-                           'commands': [sub_util.python_command(
-                                            'subseasonal_'
-                                            +'stats_grid2grid'
-                                            +'_create_monthly_avg.py',
-                                            ['TMP_Z0',
-                                             os.path.join(
-                                                 '$DATA',
-                                                 '${VERIF_CASE}_${STEP}',
-                                                 'METplus_output',
-                                                 '${RUN}.$DATE',
-                                                 '$MODEL', '$VERIF_CASE',
-                                                 'grid_stat_${VERIF_TYPE}_'
-                                                 +'SST_'
-                                                 +'{lead?fmt=%2H}0000L_'
-                                                 +'{valid?fmt=%Y%m%d}_'
-                                                 +'{valid?fmt=%H}0000V_pairs.nc'
-                                             ),
-                                             os.path.join(
-                                                 '$COMOUT',
-                                                 '${RUN}.$DATE',
-                                                 '$MODEL', '$VERIF_CASE',
-                                                 'grid_stat_${VERIF_TYPE}_'
-                                                 +'SST_'
-                                                 +'{lead?fmt=%2H}0000L_'
-                                                 +'{valid?fmt=%Y%m%d}_'
-                                                 +'{valid?fmt=%H}0000V_pairs.nc'
-                                             )])]}
+                                                +'{valid?fmt=%H}0000V_pairs.nc'
+                                            )])]}
+    },
+    'sst': {
+        'SST': {'env': {'var1_name': 'TMP',
+                        'var1_levels': 'Z0'},
+                'avg_jobs': ['DailyAvg_SST',
+                             'WeeklyAvg_SST',
+                             'MonthlyAvg_SST'],
+                'commands': [sub_util.python_command(
+                                 'subseasonal_stats_grid2grid'
+                                 +'_create_avgs.py',
+                                 ['TMP_Z0',
+                                  os.path.join(
+                                      '$DATA',
+                                      '${VERIF_CASE}_${STEP}',
+                                      'METplus_output',
+                                      '${RUN}.$DATE',
+                                      '$MODEL', '$VERIF_CASE',
+                                      'grid_stat_${VERIF_TYPE}_'
+                                      +'SST_'
+                                      +'{lead?fmt=%2H}0000L_'
+                                      +'{valid?fmt=%Y%m%d}_'
+                                      +'{valid?fmt=%H}0000V_pairs.nc'
+                                  ),
+                                  os.path.join(
+                                      '$COMOUT',
+                                      '${RUN}.$DATE',
+                                      '$MODEL', '$VERIF_CASE',
+                                      'grid_stat_${VERIF_TYPE}_'
+                                      +'SST_'
+                                      +'{lead?fmt=%2H}0000L_'
+                                      +'{valid?fmt=%Y%m%d}_'
+                                      +'{valid?fmt=%H}0000V_pairs.nc'
+                                  )])]}
     },
 }
 
@@ -911,7 +477,31 @@ if JOB_GROUP in ['assemble_data', 'generate_stats']:
                     model_files_exist = False
                     write_job_cmds = False
                     check_model_files = True
-                    if check_model_files:
+                    if check_model_files and JOB_GROUP == 'assemble_data':
+                        # One job makes the averages of all of its average
+                        # jobs, so input files they share are read once
+                        avg_job_list = []
+                        for avg_job in (JOB_GROUP_jobs_dict[verif_type]\
+                                        [verif_type_job]['avg_jobs']):
+                            job_env_dict['job_name'] = avg_job
+                            (avg_job_files_exist, valid_date_fhr_list,
+                             model_copy_output_DATA2COMOUT_list) = (
+                                sub_util.check_model_files(job_env_dict)
+                            )
+                            if avg_job_files_exist:
+                                avg_job_list.append(avg_job)
+                                job_env_dict['fhr_list_'+avg_job] = (
+                                    '"'+','.join(valid_date_fhr_list)+'"'
+                                )
+                        job_env_dict['job_name'] = verif_type_job
+                        job_env_dict['avg_job_list'] = (
+                            '"'+','.join(avg_job_list)+'"'
+                        )
+                        model_files_exist = len(avg_job_list) != 0
+                        job_env_dict.pop('fhr_start')
+                        job_env_dict.pop('fhr_end')
+                        job_env_dict.pop('fhr_inc')
+                    elif check_model_files:
                         (model_files_exist, valid_date_fhr_list,
                          model_copy_output_DATA2COMOUT_list) = (
                             sub_util.check_model_files(job_env_dict)
@@ -952,7 +542,10 @@ if JOB_GROUP in ['assemble_data', 'generate_stats']:
                             job.write(cmd+'\n')
                             job.write('export err=$?; err_chk'+'\n')
                     job.close()
-                    job_env_dict.pop('fhr_list')
+                    for name in list(job_env_dict):
+                        if name.startswith('fhr_list') \
+                                or name == 'avg_job_list':
+                            job_env_dict.pop(name)
                     job_env_dict['fhr_start'] = fhr_start
                     job_env_dict['fhr_end'] = fhr_end
                     job_env_dict['fhr_inc'] = fhr_inc
@@ -1132,4 +725,7 @@ if USE_CFP == 'YES':
        iproc+=1
     poe_file.close()
 
+print(f"Path index: {sub_util.path_index_count_dict['hits']} hits, "
+      +f"{sub_util.path_index_count_dict['misses']} misses")
+
 print("END: "+os.path.basename(__file__))
@@ -6,13 +6,14 @@ Abstract: This contains many functions used across subseasonal.
 '''
 
 import os
+import re
+import functools
 import datetime
 import numpy as np
 import subprocess
 import shutil
 import sys
 import netCDF4 as netcdf
-import numpy as np
 import glob
 import pandas as pd
 import logging
@@ -93,11 +94,109 @@ def python_command(python_script_name, script_arg_list):
         python_cmd = python_cmd+' '+script_arg
     return python_cmd
 
-def check_file_exists_size(file_name):
+# Directory listings taken by get_path_index_dir, by directory path, and
+# how many existence and size queries were answered from a listing
+# already taken (hits) or had to list the directory first (misses)
+path_index_dict = {}
+path_index_count_dict = {'hits': 0, 'misses': 0}
+
+def get_path_index_dir(dir_path):
+    """! Get the listing of a directory, taking it with one os.scandir
+         the first time the directory is asked for and keeping it for
+         the rest of the job
+
+         Args:
+             dir_path - path of the directory (string)
+
+         Returns:
+             dir_entry_dict - entries in the directory by name, empty
+                              if the directory does not exist, None if
+                              it can not be listed (dictionary of
+                              os.DirEntry)
+    """
+    if not os.path.isabs(dir_path):
+        dir_path = os.path.abspath(dir_path)
+    if dir_path in path_index_dict:
+        path_index_count_dict['hits']+=1
+    else:
+        path_index_count_dict['misses']+=1
+        try:
+            with os.scandir(dir_path) as dir_entries:
+                path_index_dict[dir_path] = {
+                    dir_entry.name: dir_entry for dir_entry in dir_entries
+                }
+        except PermissionError:
+            path_index_dict[dir_path] = None
+        except OSError:
+            path_index_dict[dir_path] = {}
+    return path_index_dict[dir_path]
+
+def forget_path_index(path):
+    """! Forget the directory listings a new file or directory
+         makes out of date
+
+         Args:
+             path - path of the new file or directory (string)
+
+         Returns:
+    """
+    path = os.path.abspath(path)
+    while path not in ['', os.sep]:
+        path_index_dict.pop(path, None)
+        path = os.path.dirname(path)
+
+def path_exists(path):
+    """! Check if a path exists, like os.path.exists, from the
+         listing of its directory
+
+         Args:
+             path - path to check (string)
+
+         Returns:
+             path_exists - if path exists or not (boolean)
+    """
+    dir_path, path_name = os.path.split(path)
+    if path_name in ['', '.', '..']:
+        return os.path.exists(path)
+    dir_entry_dict = get_path_index_dir(dir_path)
+    if dir_entry_dict is None:
+        return os.path.exists(path)
+    if path_name not in dir_entry_dict:
+        return False
+    if dir_entry_dict[path_name].is_symlink():
+        try:
+            dir_entry_dict[path_name].stat()
+        except OSError:
+            return False
+    return True
+
+def path_getsize(path):
+    """! Get the size of a path, like os.path.getsize, from the
+         listing of its directory
+
+         Args:
+             path - path to get size of (string)
+
+         Returns:
+             path_size - size of path in bytes (integer)
+    """
+    dir_path, path_name = os.path.split(path)
+    if path_name in ['', '.', '..']:
+        return os.path.getsize(path)
+    dir_entry_dict = get_path_index_dir(dir_path)
+    if dir_entry_dict is None or path_name not in dir_entry_dict:
+        return os.path.getsize(path)
+    return dir_entry_dict[path_name].stat().st_size
+
+def check_file_exists_size(file_name, use_path_index=False):
     """! Checks to see if file exists and has size greater than 0
 
          Args:
-             file_name - file path (string)
+             file_name      - file path (string)
+             use_path_index - answer from directory listings kept
+                              for the job, see get_path_index_dir,
+                              instead of checking the file system
+                              (boolean)
 
          Returns:
              file_good - boolean
@@ -109,8 +208,16 @@ def check_file_exists_size(file_name):
         alert_word = 'WARNING'
     else:
         alert_word = 'NOTE'
-    if os.path.exists(file_name):
-        if os.path.getsize(file_name) > 0:
+    if use_path_index:
+        file_exists = path_exists(file_name)
+    else:
+        file_exists = os.path.exists(file_name)
+    if file_exists:
+        if use_path_index:
+            file_size = path_getsize(file_name)
+        else:
+            file_size = os.path.getsize(file_name)
+        if file_size > 0:
             file_good = True
         else:
             print(f"{alert_word}: {file_name} empty, 0 sized")
@@ -187,6 +294,7 @@ def copy_file(source_file, dest_file):
     if check_file_exists_size(source_file):
         print("Copying "+source_file+" to "+dest_file)
         shutil.copy2(source_file, dest_file)
+        forget_path_index(dest_file)
 
 def convert_grib1_grib2(grib1_file, grib2_file):
     """! Converts GRIB1 data to GRIB2
@@ -386,6 +494,230 @@ def get_valid_hour(init_hour, forecast_hour):
         valid_hour = valid_hour - 24
     return valid_hour
 
+class FileFormat:
+    """! File naming convention parsed once into literal strings and
+         {option?fmt=} fields, see compile_file_format
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+    """
+    # Time information fields are filled from, as index into
+    # (valid time, initialization time, forecast hour), and if
+    # the field takes a shift
+    option_dict = {
+        'lead': (2, False), 'lead_shift': (2, True),
+        'valid': (0, False), 'valid_shift': (0, True),
+        'init': (1, False), 'init_shift': (1, True)
+    }
+    option_regex = re.compile(r'\{([^{}?/]+)\?fmt=([^}/]*)\}')
+
+    def __init__(self, unfilled_file_format):
+        self.unfilled_file_format = unfilled_file_format
+        self.chunk_list = []
+        for file_format_chunk in unfilled_file_format.split('/'):
+            token_list = []
+            literal_start = 0
+            filled_shift_field_list = self.get_filled_shift_fields(
+                file_format_chunk
+            )
+            for option_match in self.option_regex.finditer(file_format_chunk):
+                token_list.append(
+                    file_format_chunk[literal_start:option_match.start()]
+                )
+                field, option, fmt = option_match.group(0, 1, 2)
+                if self.option_dict.get(option, (None, False))[1] \
+                        and field not in filled_shift_field_list:
+                    token_list.append(field)
+                else:
+                    token_list.append(self.parse_field(field, option, fmt))
+                literal_start = option_match.end()
+            token_list.append(file_format_chunk[literal_start:])
+            self.chunk_list.append(
+                [token for token in token_list if token != '']
+            )
+
+    def get_filled_shift_fields(self, file_format_chunk):
+        """! Get the shift fields of a chunk that are filled. This
+             util's format_filler always read a shift from the chunk's
+             first "shift=" and its format up to the chunk's last "?",
+             filling the options in option_dict order, so a shift field
+             is only filled when those make up the field; any other
+             shift field is left as is
+
+             Args:
+                 file_format_chunk - file naming convention between
+                                     slashes (string)
+             Returns:
+                 filled_shift_field_list - shift fields to fill
+                                           (list of strings)
+        """
+        filled_shift_field_list = []
+        for option, (time_idx, takes_shift) in self.option_dict.items():
+            option_start = '{'+option+'?fmt='
+            for noption in range(file_format_chunk.count(option_start)):
+                fmt = file_format_chunk.partition(option_start)[2]
+                if takes_shift:
+                    shift = (file_format_chunk.partition('shift=')[2]
+                             .partition('}')[0])
+                    field = (option_start+fmt.rpartition('?')[0]
+                             +'?shift='+shift+'}')
+                    if field in file_format_chunk:
+                        filled_shift_field_list.append(field)
+                else:
+                    field = option_start+fmt.partition('}')[0]+'}'
+                # Filled fields have no "?" or "shift=" left in them
+                file_format_chunk = file_format_chunk.replace(field, '\0')
+        return filled_shift_field_list
+
+    def parse_field(self, field, option, fmt):
+        """! Parse one {option?fmt=} field
+
+             Args:
+                 field  - full field text (string)
+                 option - field option name (string)
+                 fmt    - field format, including shift (string)
+             Returns:
+                 parsed_field - field text if it is left as is
+                                (string), or time information index,
+                                option, format, shift, field text
+                                (tuple)
+        """
+        if option not in self.option_dict:
+            return (None, option, fmt, 0, field)
+        time_idx, takes_shift = self.option_dict[option]
+        if not takes_shift:
+            return (time_idx, option, fmt, 0, field)
+        shift = fmt.partition('shift=')[2]
+        fmt = fmt.rpartition('?')[0]
+        if field != '{'+option+'?fmt='+fmt+'?shift='+shift+'}':
+            return field
+        return (time_idx, option, fmt, int(shift), field)
+
+    def fill_field(self, parsed_field, time_info_value):
+        """! Fill one parsed field from its time information
+
+             Args:
+                 parsed_field    - field from parse_field (tuple)
+                 time_info_value - valid time, initialization time
+                                   (datetime) or forecast hour (string)
+             Returns:
+                 filled_field - filled field (string)
+        """
+        time_idx, option, fmt, shift, field = parsed_field
+        if time_idx == 2:
+            forecast_hour = time_info_value
+            if option == 'lead_shift':
+                forecast_hour = str(int(forecast_hour) + shift)
+            if fmt == '%1H':
+                if int(forecast_hour) < 10:
+                    return forecast_hour[1]
+                else:
+                    return forecast_hour
+            elif fmt == '%2H':
+                return forecast_hour.zfill(2)
+            elif fmt == '%3H':
+                return forecast_hour.zfill(3)
+            else:
+                return forecast_hour
+        if shift != 0:
+            time_info_value = time_info_value + datetime.timedelta(hours=shift)
+        return time_info_value.strftime(fmt)
+
+    def fill(self, valid_time_dt, init_time_dt, forecast_hour,
+             str_sub_dict={}):
+        """! Fill in the file naming convention
+
+             Args:
+                 valid_time_dt - valid time (datetime)
+                 init_time_dt  - initialization time (datetime)
+                 forecast_hour - forecast hour (string)
+                 str_sub_dict  - other strings to substitue (dictionary)
+             Returns:
+                 filled_file_format - file_format filled in with verifying
+                                      time information (string)
+        """
+        time_info = (valid_time_dt, init_time_dt, forecast_hour)
+        filled_chunk_list = []
+        for token_list in self.chunk_list:
+            filled_token_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    filled_token_list.append(token)
+                elif token[0] is None:
+                    filled_token_list.append(
+                        str_sub_dict.get(token[1], token[4])
+                    )
+                else:
+                    filled_token_list.append(
+                        self.fill_field(token, time_info[token[0]])
+                    )
+            filled_chunk_list.append(''.join(filled_token_list))
+        return os.path.join('/', *filled_chunk_list)
+
+    def fill_many(self, valid_time_dt_list, init_time_dt_list,
+                  forecast_hour_list, str_sub_dict={}):
+        """! Fill in the file naming convention for many times at once,
+             filling each field once per unique time
+
+             Args:
+                 valid_time_dt_list - valid times (list of datetimes)
+                 init_time_dt_list  - initialization times
+                                      (list of datetimes)
+                 forecast_hour_list - forecast hours (list of strings)
+                 str_sub_dict       - other strings to substitue
+                                      (dictionary)
+             Returns:
+                 filled_file_format_list - file_format filled in with
+                                           verifying time information
+                                           (list of strings)
+        """
+        time_info_list = [
+            list(valid_time_dt_list), list(init_time_dt_list),
+            list(forecast_hour_list)
+        ]
+        nfiles = len(time_info_list[2])
+        filled_chunk_column_list = []
+        for token_list in self.chunk_list:
+            token_column_list = []
+            for token in token_list:
+                if isinstance(token, str):
+                    token_column_list.append([token]*nfiles)
+                elif token[0] is None:
+                    token_column_list.append(
+                        [str_sub_dict.get(token[1], token[4])]*nfiles
+                    )
+                else:
+                    filled_field_dict = {}
+                    for time_info_value in time_info_list[token[0]]:
+                        if time_info_value not in filled_field_dict:
+                            filled_field_dict[time_info_value] = (
+                                self.fill_field(token, time_info_value)
+                            )
+                    token_column_list.append(
+                        [filled_field_dict[time_info_value]
+                         for time_info_value in time_info_list[token[0]]]
+                    )
+            filled_chunk_column_list.append(
+                [''.join(filled_tokens)
+                 for filled_tokens in zip(*token_column_list)]
+                if len(token_column_list) != 0 else ['']*nfiles
+            )
+        return [os.path.join('/', *filled_chunks)
+                for filled_chunks in zip(*filled_chunk_column_list)]
+
+@functools.lru_cache(maxsize=None)
+def compile_file_format(unfilled_file_format):
+    """! Parse a file naming convention once, cached by the
+         file naming convention
+
+         Args:
+             unfilled_file_format - file naming convention (string)
+         Returns:
+             file_format - parsed file naming convention with fill
+                           and fill_many methods (FileFormat)
+    """
+    return FileFormat(unfilled_file_format)
+
 def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
                   forecast_hour, str_sub_dict):
     """! Creates a filled file path from a format
@@ -400,118 +732,9 @@ def format_filler(unfilled_file_format, valid_time_dt, init_time_dt,
              filled_file_format - file_format filled in with verifying
                                   time information (string)
     """
-    filled_file_format = '/'
-    format_opt_list = ['lead', 'lead_shift', 'valid', 'valid_shift',
-                       'init', 'init_shift']
-    if len(list(str_sub_dict.keys())) != 0:
-        format_opt_list = format_opt_list+list(str_sub_dict.keys())
-    for filled_file_format_chunk in unfilled_file_format.split('/'):
-        for format_opt in format_opt_list:
-            nformat_opt = (
-                filled_file_format_chunk.count('{'+format_opt+'?fmt=')
-            )
-            if nformat_opt > 0:
-               format_opt_count = 1
-               while format_opt_count <= nformat_opt:
-                   if format_opt in ['lead_shift', 'valid_shift',
-                                     'init_shift']:
-                       shift = (filled_file_format_chunk \
-                                .partition('shift=')[2] \
-                                .partition('}')[0])
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .rpartition('?')[0]
-                       )
-                   else:
-                       format_opt_count_fmt = (
-                           filled_file_format_chunk \
-                           .partition('{'+format_opt+'?fmt=')[2] \
-                           .partition('}')[0]
-                       )
-                   if format_opt == 'valid':
-                       replace_format_opt_count = valid_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'lead':
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour) < 10:
-                               replace_format_opt_count = forecast_hour[1]
-                           else:
-                               replace_format_opt_count = forecast_hour
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = forecast_hour.zfill(2)
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = forecast_hour.zfill(3)
-                       else:
-                           replace_format_opt_count = forecast_hour
-                   elif format_opt == 'init':
-                       replace_format_opt_count = init_time_dt.strftime(
-                           format_opt_count_fmt
-                       ) 
-                   elif format_opt == 'lead_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       forecast_hour_shift = str(int(forecast_hour)
-                                                 + int(shift))
-                       if format_opt_count_fmt == '%1H':
-                           if int(forecast_hour_shift) < 10:
-                               replace_format_opt_count = (
-                                   forecast_hour_shift[1]
-                               )
-                           else:
-                               replace_format_opt_count = forecast_hour_shift
-                       elif format_opt_count_fmt == '%2H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(2)
-                           )
-                       elif format_opt_count_fmt == '%3H':
-                           replace_format_opt_count = (
-                               forecast_hour_shift.zfill(3)
-                           )
-                       else:
-                           replace_format_opt_count = forecast_hour_shift
-                   elif format_opt == 'init_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       init_shift_time_dt = (
-                           init_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = init_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   elif format_opt == 'valid_shift':
-                       shift = (filled_file_format_chunk.partition('shift=')[2]\
-                                .partition('}')[0])
-                       valid_shift_time_dt = (
-                           valid_time_dt + datetime.timedelta(hours=int(shift))
-                       )
-                       replace_format_opt_count = valid_shift_time_dt.strftime(
-                           format_opt_count_fmt
-                       )
-                   else:
-                       replace_format_opt_count = str_sub_dict[format_opt]
-                   if format_opt in ['lead_shift', 'valid_shift', 'init_shift']:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt
-                               +'?shift='+shift+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   else:
-                       filled_file_format_chunk = (
-                           filled_file_format_chunk.replace(
-                               '{'+format_opt+'?fmt='
-                               +format_opt_count_fmt+'}',
-                               replace_format_opt_count
-                           )
-                       )
-                   format_opt_count+=1
-        filled_file_format = os.path.join(filled_file_format,
-                                          filled_file_format_chunk)
-    return filled_file_format
+    return compile_file_format(unfilled_file_format).fill(
+        valid_time_dt, init_time_dt, forecast_hour, str_sub_dict
+    )
 
 def prep_prod_gefs_file(source_afile, source_bfile, prepped_file, dest_file, 
                         init_dt, forecast_hour, prep_method,
@@ -1236,7 +1459,7 @@ def check_gefs_prep_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 fhr_key_output_files_exist_list.append(True)
                 print("COMOUT files "+fhr_fileN_restart+" exist and will not"
                       +" be generated in prep restart")
@@ -1287,7 +1510,7 @@ def check_ccpa_prep_files(DATA, STEP, INITDATE):
         nf+=1
     ccpa_files_exist_list = []
     for ccpa_file in ccpa_file_list:
-        if os.path.exists(ccpa_file):
+        if path_exists(ccpa_file):
             ccpa_files_exist_list.append(True)
         else:
             ccpa_files_exist_list.append(False)
@@ -1381,7 +1604,7 @@ def check_daily_model_files(job_dict):
                 fhr_check_input_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN):
+            if path_exists(fhr_fileN):
                 fhr_key_input_files_exist_list.append(True)
                 if job_dict['JOB_GROUP'] == 'reformat_data' \
                         and job_dict['job_name'] == 'SST':
@@ -1416,7 +1639,7 @@ def check_daily_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 # to be used in restart and remove from fhr_list
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
@@ -1627,8 +1850,8 @@ def check_weekly_model_files(job_dict):
                     ['anl'],
                     {}
                 )
-                if os.path.exists(fhr_fileN) \
-                        and os.path.exists(truth_file):
+                if path_exists(fhr_fileN) \
+                        and path_exists(truth_file):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -1640,7 +1863,7 @@ def check_weekly_model_files(job_dict):
                     and job_dict['job_name'] in ['Concentration',
                                                  'SST',
                                                  'GenEnsProd']:
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -1650,7 +1873,7 @@ def check_weekly_model_files(job_dict):
                     fhr_key_input_files_exist_list.append(False)
             elif job_dict['JOB_GROUP'] == 'assemble_data' \
                     and job_dict['job_name'] == 'TempAnom2m':
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -1683,7 +1906,7 @@ def check_weekly_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 # to be used in restart and remove from fhr_list
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
@@ -1797,7 +2020,7 @@ def check_monthly_model_files(job_dict):
                 fhr_check_input_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN):
+            if path_exists(fhr_fileN):
                 fhr_key_input_files_exist_list.append(True)
                 if job_dict['JOB_GROUP'] == 'reformat_data' \
                         and job_dict['job_name'] in ['Concentration',
@@ -1833,7 +2056,7 @@ def check_monthly_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 # to be used in restart and remove from fhr_list
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
@@ -2041,8 +2264,8 @@ def check_days6_10_model_files(job_dict):
                     ['anl'],
                     {}
                 )
-                if os.path.exists(fhr_fileN) \
-                        and os.path.exists(truth_file):
+                if path_exists(fhr_fileN) \
+                        and path_exists(truth_file):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2052,7 +2275,7 @@ def check_days6_10_model_files(job_dict):
                     fhr_key_input_files_exist_list.append(False)
             elif job_dict['JOB_GROUP'] == 'reformat_data' \
                     and job_dict['job_name'] == 'GenEnsProd':
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2062,7 +2285,7 @@ def check_days6_10_model_files(job_dict):
                     fhr_key_input_files_exist_list.append(False)
             elif job_dict['JOB_GROUP'] == 'assemble_data' \
                     and job_dict['job_name'] == 'TempAnom2m':
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2095,7 +2318,7 @@ def check_days6_10_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 # to be used in restart and remove from fhr_list
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
@@ -2305,8 +2528,8 @@ def check_weeks3_4_model_files(job_dict):
                     ['anl'],
                     {}
                 )
-                if os.path.exists(fhr_fileN) \
-                        and os.path.exists(truth_file):
+                if path_exists(fhr_fileN) \
+                        and path_exists(truth_file):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2316,7 +2539,7 @@ def check_weeks3_4_model_files(job_dict):
                     fhr_key_input_files_exist_list.append(False)
             elif job_dict['JOB_GROUP'] == 'reformat_data' \
                     and job_dict['job_name'] == 'GenEnsProd':
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2326,7 +2549,7 @@ def check_weeks3_4_model_files(job_dict):
                     fhr_key_input_files_exist_list.append(False)
             elif job_dict['JOB_GROUP'] == 'assemble_data' \
                     and job_dict['job_name'] == 'TempAnom2m':
-                if os.path.exists(fhr_fileN):
+                if path_exists(fhr_fileN):
                     fhr_key_input_files_exist_list.append(True)
                     fhr_list.append(
                         fhr_check_input_dict[fhr_key][fhr_fileN_key]\
@@ -2359,7 +2582,7 @@ def check_weeks3_4_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 # to be used in restart and remove from fhr_list
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
@@ -3424,7 +3647,7 @@ def check_model_files(job_dict):
                 fhr_check_input_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN):
+            if path_exists(fhr_fileN):
                 fhr_key_input_files_exist_list.append(True)
                 if job_dict['JOB_GROUP'] == 'reformat_data' \
                         and job_dict['job_name'] in ['GeoHeightAnom',
@@ -3475,7 +3698,7 @@ def check_model_files(job_dict):
                 fhr_check_output_dict[fhr_key][fhr_fileN_key]['forecast_hour'],
                 {}
             )
-            if os.path.exists(fhr_fileN_COMOUT):
+            if path_exists(fhr_fileN_COMOUT):
                 # Copy restart files from COMOUT to DATA dir
                 copy_file(fhr_fileN_COMOUT,fhr_fileN_DATA)
             else:
@@ -3619,7 +3842,7 @@ def check_weekly_truth_files(job_dict):
     truth_output_files_exist_list = []
     truth_copy_output_DATA2COMOUT_list = truth_output_file_list
     for truth_file_tuple in truth_output_file_list:
-        if os.path.exists(truth_file_tuple[1]):
+        if path_exists(truth_file_tuple[1]):
             truth_output_files_exist_list.append(True)
             truth_copy_output_DATA2COMOUT_list.remove(truth_file_tuple)
         else:
@@ -3630,7 +3853,7 @@ def check_weekly_truth_files(job_dict):
     else:
         truth_input_files_exist_list = []
         for truth_file in truth_input_file_list:
-            if os.path.exists(truth_file):
+            if path_exists(truth_file):
                 truth_input_files_exist_list.append(True)
             else:
                 truth_input_files_exist_list.append(False)
@@ -3767,7 +3990,7 @@ def check_days6_10_truth_files(job_dict):
     truth_output_files_exist_list = []
     truth_copy_output_DATA2COMOUT_list = truth_output_file_list
     for truth_file_tuple in truth_output_file_list:
-        if os.path.exists(truth_file_tuple[1]):
+        if path_exists(truth_file_tuple[1]):
             truth_output_files_exist_list.append(True)
             truth_copy_output_DATA2COMOUT_list.remove(truth_file_tuple)
         else:
@@ -3778,7 +4001,7 @@ def check_days6_10_truth_files(job_dict):
     else:
         truth_input_files_exist_list = []
         for truth_file in truth_input_file_list:
-            if os.path.exists(truth_file):
+            if path_exists(truth_file):
                 truth_input_files_exist_list.append(True)
             else:
                 truth_input_files_exist_list.append(False)
@@ -3918,7 +4141,7 @@ def check_weeks3_4_truth_files(job_dict):
     truth_output_files_exist_list = []
     truth_copy_output_DATA2COMOUT_list = truth_output_file_list
     for truth_file_tuple in truth_output_file_list:
-        if os.path.exists(truth_file_tuple[1]):
+        if path_exists(truth_file_tuple[1]):
             truth_output_files_exist_list.append(True)
             # Copy restart files from COMOUT to DATA dir
             copy_file(truth_file_tuple[1], truth_file_tuple[0])
@@ -3931,7 +4154,7 @@ def check_weeks3_4_truth_files(job_dict):
     else:
         truth_input_files_exist_list = []
         for truth_file in truth_input_file_list:
-            if os.path.exists(truth_file):
+            if path_exists(truth_file):
                 truth_input_files_exist_list.append(True)
             else:
                 truth_input_files_exist_list.append(False)
@@ -4130,7 +4353,7 @@ def check_truth_files(job_dict):
                 truth_file_list.append(pb2nc_file)
     truth_files_exist_list = []
     for truth_file in truth_file_list:
-        if os.path.exists(truth_file):
+        if path_exists(truth_file):
             truth_files_exist_list.append(True)
         else:
             truth_files_exist_list.append(False)
@@ -4157,7 +4380,11 @@ def check_stat_files(job_dict):
         'METplus_output', job_dict['RUN']+'.'+job_dict['DATE'],
         job_dict['MODEL'], job_dict['VERIF_CASE']
     )
-    stat_file_list = glob.glob(os.path.join(model_stat_file_dir, '*.stat'))
+    stat_file_list = [
+        stat_file for stat_file in (get_path_index_dir(model_stat_file_dir)
+                                    or {})
+        if stat_file.endswith('.stat') and not stat_file.startswith('.')
+    ]
     if len(stat_file_list) != 0:
         stat_files_exist = True
     else: